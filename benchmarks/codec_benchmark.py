@@ -0,0 +1,246 @@
+import argparse
+import gc
+import importlib
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pyfix.codec import Codec
+from pyfix.journaler import Journaler
+from pyfix.message import FIXMessage, FIXContext, MessageDirection
+from pyfix.session import FIXSession
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "codec_baseline.json")
+
+# the nested group AllocationInstruction from tests/codec_tests.py
+ALLOCATION_INSTRUCTION = b'8=FIX.4.4\x019=817\x0135=J\x0134=953\x0149=FIX_ALAUDIT\x0156=BFUT_ALAUDIT\x0143=N\x0152=20150615-09:21:42.459\x0170=00000002664ASLO1001\x01626=2\x0110626=5\x0171=0\x0160=20150615-10:21:42\x01857=1\x0173=1\x0111=00000006321ORLO1\x0138=100.0\x01800=100.0\x01124=1\x0132=100.0\x0117=00000009758TRLO1\x0131=484.50\x0154=2\x0153=100.0\x0155=FTI\x01207=XEUE\x01454=1\x01455=EOM5\x01456=A\x01200=201506\x01541=20150619\x01461=FXXXXX\x016=484.50\x0174=2\x0175=20150615\x0178=2\x0179=TEST123\x0130009=12345\x01467=00000014901CALO1001\x019520=00000014898CALO1\x0180=33.0\x01366=484.50\x0181=0\x01153=484.50\x0110626=5\x0179=TEST124\x0130009=12345\x01467=00000014903CALO1001\x019520=00000014899CALO1\x0180=67.0\x01366=484.50\x0181=0\x01153=484.50\x0110626=5\x01453=3\x01448=TEST1\x01447=D\x01452=3\x01802=2\x01523=12345\x01803=3\x01523=TEST1\x01803=19\x01448=TEST1WA\x01447=D\x01452=38\x01802=4\x01523=Test1 Wait\x01803=10\x01523= \x01803=26\x01523=\x01803=3\x01523=TestWaCRF2\x01803=28\x01448=hagap\x01447=D\x01452=11\x01802=2\x01523=GB\x01803=25\x01523=BarCapFutures.FETService\x01803=24\x0110=033\x01'
+
+# header & trailer tags the codec adds itself
+SESSION_TAGS = ("8", "9", "35", "34", "49", "56", "52", "10")
+
+class Benchmark(object):
+    def __init__(self, name, op, fields, msgsPerOp=1):
+        self.name = name
+        self.op = op
+        self.fields = fields
+        self.msgsPerOp = msgsPerOp
+
+def newOrderSingle(protocol, clOrdID="abcdefg"):
+    fixtags = protocol.fixtags
+    msg = FIXMessage(protocol.msgtype.NEWORDERSINGLE)
+    msg.setField(fixtags.Price, "123.45")
+    msg.setField(fixtags.OrderQty, 9876)
+    msg.setField(fixtags.Symbol, "VOD.L")
+    msg.setField(fixtags.SecurityID, "GB00BH4HKS39")
+    msg.setField(fixtags.SecurityIDSource, "4")
+    msg.setField(fixtags.Account, "TEST")
+    msg.setField(fixtags.HandlInst, "1")
+    msg.setField(fixtags.ExDestination, "XLON")
+    msg.setField(fixtags.Side, 1)
+    msg.setField(fixtags.ClOrdID, clOrdID)
+    msg.setField(fixtags.Currency, "GBP")
+    return msg
+
+def executionReport(protocol):
+    fixtags = protocol.fixtags
+    msg = FIXMessage(protocol.msgtype.EXECUTIONREPORT)
+    msg.setField(fixtags.OrderID, "ORD00012345")
+    msg.setField(fixtags.ClOrdID, "abcdefg")
+    msg.setField(fixtags.ExecID, "EXEC0009876")
+    msg.setField(fixtags.ExecType, "F")
+    msg.setField(fixtags.OrdStatus, "1")
+    msg.setField(fixtags.Symbol, "VOD.L")
+    msg.setField(fixtags.Side, 1)
+    msg.setField(fixtags.OrderQty, 9876)
+    msg.setField(fixtags.LastQty, 100)
+    msg.setField(fixtags.LastPx, "123.45")
+    msg.setField(fixtags.LeavesQty, 9776)
+    msg.setField(fixtags.CumQty, 100)
+    msg.setField(fixtags.AvgPx, "123.45")
+    msg.setField(fixtags.TransactTime, "20150619-11:08:54.000")
+    return msg
+
+def marketDataIncrementalRefresh(protocol, entries=50):
+    fixtags = protocol.fixtags
+    msg = FIXMessage(protocol.msgtype.MARKETDATAINCREMENTALREFRESH)
+    msg.setField(fixtags.MDReqID, "MD1")
+    for i in range(0, entries):
+        entry = FIXContext()
+        entry.setField(fixtags.MDUpdateAction, "1")
+        entry.setField(fixtags.MDEntryType, str(i % 2))
+        entry.setField(fixtags.Symbol, "VOD.L")
+        entry.setField(fixtags.MDEntryPx, "%0.2f" % (123.45 + i * 0.01, ))
+        entry.setField(fixtags.MDEntrySize, 100 * (i + 1))
+        msg.addRepeatingGroup(fixtags.NoMDEntries, entry)
+    return msg
+
+def allocationInstruction(codec):
+    # strip the header so it can be re-encoded
+    msg, length = codec.decode(ALLOCATION_INSTRUCTION)
+    for tag in SESSION_TAGS:
+        msg.removeField(tag)
+    return msg
+
+def fieldCount(encodedMsg):
+    return encodedMsg.count(b'\x01')
+
+def buildBenchmarks(protocol):
+    codec = Codec(protocol)
+    session = FIXSession(1, "TARGET", "SENDER")
+    encode = lambda msg: codec.encode(msg, session).encode('utf-8')
+    benchmarks = []
+
+    msgs = [("NewOrderSingle", newOrderSingle(protocol)),
+            ("ExecutionReport", executionReport(protocol)),
+            ("MarketDataIncrementalRefresh", marketDataIncrementalRefresh(protocol)),
+            ("AllocationInstruction", allocationInstruction(codec))]
+    for (name, msg) in msgs:
+        encoded = encode(msg)
+        fields = fieldCount(encoded)
+        benchmarks.append(Benchmark("encode.%s" % (name, ), lambda msg=msg: codec.encode(msg, session), fields))
+        benchmarks.append(Benchmark("decode.%s" % (name, ), lambda encoded=encoded: codec.decode(encoded), fields))
+
+    def construct():
+        msg = newOrderSingle(protocol)
+        return (msg[protocol.fixtags.ClOrdID], msg[protocol.fixtags.Price], protocol.fixtags.Symbol in msg)
+    benchmarks.append(Benchmark("message.NewOrderSingle", construct, 11))
+
+    journal = Journaler()
+    journalSession = journal.createSession("TARGET", "SENDER")
+    decodedOrder, length = codec.decode(encode(newOrderSingle(protocol)))
+    seqNos = [0]
+    def persist():
+        seqNos[0] += 1
+        decodedOrder.setField(protocol.fixtags.MsgSeqNum, str(seqNos[0]))
+        journal.persistMsg(decodedOrder, journalSession, MessageDirection.OUTBOUND)
+    fields = fieldCount(encode(newOrderSingle(protocol)))
+    benchmarks.append(Benchmark("journal.persistMsg", persist, fields))
+
+    recoverRange = 10
+    def recover():
+        end = max(seqNos[0], recoverRange)
+        return journal.recoverMsgs(journalSession, MessageDirection.OUTBOUND, end - recoverRange + 1, end)
+    benchmarks.append(Benchmark("journal.recoverMsgs", recover, fields, recoverRange))
+    return benchmarks
+
+def timeBenchmark(benchmark, duration, repeat):
+    # calibrate the number of iterations to run in each repeat
+    iterations = 1
+    while True:
+        start = time.perf_counter_ns()
+        for i in range(0, iterations):
+            benchmark.op()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= duration * 1e9 / (repeat * 10):
+            break
+        iterations *= 2
+    iterations = max(1, int(iterations * (duration * 1e9 / repeat) / max(elapsed, 1)))
+
+    # the fastest repeat is the least disturbed by everything else on the machine
+    best = None
+    gc.collect()
+    for r in range(0, repeat):
+        start = time.perf_counter_ns()
+        for i in range(0, iterations):
+            benchmark.op()
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / float(iterations * benchmark.msgsPerOp)
+
+def allocationsPerMsg(benchmark, samples=50):
+    # tracemalloc tracks memory rather than counting allocations, so we report the bytes
+    # allocated by an operation (the peak traced memory during the call)
+    benchmark.op()
+    tracemalloc.start()
+    size = 0
+    try:
+        for i in range(0, samples):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            result = benchmark.op()
+            size += tracemalloc.get_traced_memory()[1] - before
+            del result
+    finally:
+        tracemalloc.stop()
+    return size / float(samples * benchmark.msgsPerOp)
+
+def runBenchmarks(benchmarks, duration, repeat, measureAllocations):
+    results = {}
+    for benchmark in benchmarks:
+        nsPerMsg = timeBenchmark(benchmark, duration, repeat)
+        result = {"msgsPerSec": 1e9 / nsPerMsg,
+                  "nsPerMsg": nsPerMsg,
+                  "nsPerField": nsPerMsg / benchmark.fields,
+                  "fields": benchmark.fields}
+        if measureAllocations:
+            result["allocBytesPerMsg"] = allocationsPerMsg(benchmark)
+        results[benchmark.name] = result
+        logging.debug("%s: %s" % (benchmark.name, result))
+    return results
+
+def compareBaseline(results, baseline, tolerance):
+    regressions = []
+    for (name, result) in sorted(results.items()):
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        change = result["msgsPerSec"] / previous["msgsPerSec"] - 1.0
+        if change < -tolerance:
+            regressions.append((name, change))
+    return regressions
+
+def printResults(results, baseline):
+    row_format = "{:<38}{:>14}{:>12}{:>12}{:>16}{:>10}"
+    print(row_format.format("Benchmark", "msgs/s", "ns/msg", "ns/field", "alloc bytes/msg", "change"))
+    for (name, result) in sorted(results.items()):
+        previous = baseline.get("results", {}).get(name) if baseline else None
+        change = "" if previous is None else "%+0.1f%%" % ((result["msgsPerSec"] / previous["msgsPerSec"] - 1.0) * 100.0, )
+        print(row_format.format(name, "%0.0f" % result["msgsPerSec"], "%0.0f" % result["nsPerMsg"], "%0.1f" % result["nsPerField"],
+                                "%0.0f" % result.get("allocBytesPerMsg", float("nan")), change))
+
+def main():
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the codec, messages and journal.')
+    parser.add_argument('-p', '--protocol', dest='protocol', action='store', default='pyfix.FIX44', help='protocol module to benchmark')
+    parser.add_argument('-k', '--filter', dest='filter', action='store', help='only run benchmarks whose name contains this')
+    parser.add_argument('-d', '--duration', dest='duration', type=float, action='store', default=1.0, help='seconds to spend timing each benchmark')
+    parser.add_argument('-r', '--repeat', dest='repeat', type=int, action='store', default=5, help='number of timed repeats, the fastest is reported')
+    parser.add_argument('--no-allocations', dest='allocations', action='store_false', help="don't measure allocations (which is slow)")
+    parser.add_argument('-b', '--baseline', dest='baseline', action='store', default=DEFAULT_BASELINE, help='baseline file to compare against')
+    parser.add_argument('--save-baseline', dest='saveBaseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('-t', '--tolerance', dest='tolerance', type=float, action='store', default=0.10, help='fractional slow down which is flagged as a regression')
+
+    args = parser.parse_args()
+
+    protocol = importlib.import_module(args.protocol)
+    benchmarks = buildBenchmarks(protocol)
+    if args.filter is not None:
+        benchmarks = [b for b in benchmarks if args.filter in b.name]
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = runBenchmarks(benchmarks, args.duration, args.repeat, args.allocations)
+    printResults(results, baseline)
+
+    if args.saveBaseline:
+        merged = {} if baseline is None else baseline.get("results", {})
+        merged.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": merged}, f, indent=2, sort_keys=True)
+        logging.info("Saved baseline to %s" % (args.baseline, ))
+    elif baseline is not None:
+        regressions = compareBaseline(results, baseline, args.tolerance)
+        for (name, change) in regressions:
+            logging.error("Regression in %s: %0.1f%% slower than the baseline" % (name, -change * 100.0))
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
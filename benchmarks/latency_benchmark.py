@@ -0,0 +1,193 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pyfix.client_connection import FIXClient
+from pyfix.connection import ConnectionState, MessageDirection
+from pyfix.engine import FIXEngine
+from pyfix.event import TimerEventRegistration
+from pyfix.histogram import Histogram
+from pyfix.message import FIXMessage
+from pyfix.server_connection import FIXServer
+
+PROTOCOL = "pyfix.FIX44"
+
+def runEchoServer(host, port, journalfile, ready, stop):
+    # acknowledges every NewOrderSingle (and Cancel/Replace) with an ExecutionReport, run in its own process
+    logging.basicConfig(format='%(asctime)s [server] %(message)s', level=logging.WARNING)
+    engine = FIXEngine(journalfile)
+    server = FIXServer(engine, PROTOCOL)
+
+    def onOrder(connection, request):
+        protocol = connection.codec.protocol
+        # New, Canceled or Replaced
+        execType = {protocol.msgtype.NEWORDERSINGLE: "0", protocol.msgtype.ORDERCANCELREQUEST: "4", protocol.msgtype.ORDERCANCELREPLACEREQUEST: "5"}[request.msgType]
+        msg = FIXMessage(protocol.msgtype.EXECUTIONREPORT)
+        msg.setField(protocol.fixtags.ClOrdID, request[protocol.fixtags.ClOrdID])
+        if protocol.fixtags.OrigClOrdID in request:
+            msg.setField(protocol.fixtags.OrigClOrdID, request[protocol.fixtags.OrigClOrdID])
+        msg.setField(protocol.fixtags.OrderID, request[protocol.fixtags.ClOrdID])
+        msg.setField(protocol.fixtags.ExecID, request[protocol.fixtags.ClOrdID])
+        msg.setField(protocol.fixtags.ExecType, execType)
+        msg.setField(protocol.fixtags.OrdStatus, execType)
+        msg.setField(protocol.fixtags.Symbol, request[protocol.fixtags.Symbol])
+        msg.setField(protocol.fixtags.Side, request[protocol.fixtags.Side])
+        msg.setField(protocol.fixtags.LeavesQty, "0" if execType == "4" else request[protocol.fixtags.OrderQty])
+        msg.setField(protocol.fixtags.CumQty, "0")
+        msg.setField(protocol.fixtags.AvgPx, "0")
+        connection.sendMsg(msg)
+
+    def onConnection(connection):
+        protocol = connection.codec.protocol
+        for msgType in (protocol.msgtype.NEWORDERSINGLE, protocol.msgtype.ORDERCANCELREQUEST, protocol.msgtype.ORDERCANCELREPLACEREQUEST):
+            connection.addMessageHandler(onOrder, MessageDirection.INBOUND, msgType)
+
+    server.addConnectionListener(onConnection, ConnectionState.CONNECTED)
+    server.start(host, port)
+    ready.set()
+    while not stop.is_set():
+        engine.eventManager.waitForEventWithTimeout(0.1)
+    server.stop()
+
+class LatencyClient(object):
+    def __init__(self, engine, rate, count, warmup):
+        self.engine = engine
+        self.rate = rate
+        self.count = count
+        self.warmup = warmup
+        self.histogram = Histogram(3)
+        self.connection = None
+        self.sendTimes = {}
+        self.sent = 0
+        self.acked = 0
+        self.startTime = None
+        self.startTimeNs = None
+        self.measureStart = None
+        self.measureEnd = None
+        # we work out how many orders are due on every tick, rather than a timer per order
+        self.timer = TimerEventRegistration(lambda type, closure: self.sendDue(), 0.0005)
+
+    def onLoggedIn(self, connection):
+        self.connection = connection
+        connection.addMessageHandler(self.onExecutionReport, MessageDirection.INBOUND, connection.codec.protocol.msgtype.EXECUTIONREPORT)
+        self.startTime = time.perf_counter()
+        self.startTimeNs = time.perf_counter_ns()
+        self.engine.eventManager.registerHandler(self.timer)
+
+    def isComplete(self):
+        return self.acked >= self.warmup + self.count
+
+    def outstanding(self):
+        return self.sent - self.acked
+
+    def sendDue(self):
+        total = self.warmup + self.count
+        due = min(total, int((time.perf_counter() - self.startTime) * self.rate) + 1)
+        protocol = self.connection.codec.protocol
+        while self.sent < due:
+            msg = FIXMessage(protocol.msgtype.NEWORDERSINGLE)
+            clOrdID = str(self.sent)
+            msg.setField(protocol.fixtags.ClOrdID, clOrdID)
+            msg.setField(protocol.fixtags.Symbol, "VOD.L")
+            msg.setField(protocol.fixtags.Side, "1")
+            msg.setField(protocol.fixtags.OrderQty, "100")
+            msg.setField(protocol.fixtags.OrdType, "2")
+            msg.setField(protocol.fixtags.Price, "123.45")
+            msg.setField(protocol.fixtags.HandlInst, "1")
+            # latency is measured from when the order should have been sent, so we don't hide
+            # any stalls on our side (i.e. no coordinated omission)
+            self.sendTimes[clOrdID] = self.startTimeNs + int(self.sent * 1e9 / self.rate)
+            self.connection.sendMsg(msg)
+            self.sent += 1
+        if self.sent >= total:
+            self.engine.eventManager.unregisterHandler(self.timer)
+
+    def onExecutionReport(self, connection, msg):
+        now = time.perf_counter_ns()
+        sendTime = self.sendTimes.pop(msg[connection.codec.protocol.fixtags.ClOrdID], None)
+        if sendTime is None:
+            return
+        self.acked += 1
+        if self.acked == self.warmup:
+            self.measureStart = time.perf_counter()
+        elif self.acked > self.warmup:
+            self.histogram.record(now - sendTime)
+            if self.isComplete():
+                self.measureEnd = time.perf_counter()
+
+def printReport(client, rate):
+    histogram = client.histogram
+    if histogram.totalCount == 0:
+        return
+    elapsed = (client.measureEnd or time.perf_counter()) - (client.measureStart or client.startTime)
+    print("Target rate:      %0.0f msgs/s" % (rate, ))
+    print("Sustained rate:   %0.0f round trips/s (%s in %0.2fs)" % (histogram.totalCount / elapsed, histogram.totalCount, elapsed))
+    print("Round trip latency (us):")
+    print("  min      %10.1f" % (histogram.min / 1000.0, ))
+    print("  mean     %10.1f" % (histogram.mean() / 1000.0, ))
+    for (percentile, value) in histogram.percentiles((50.0, 90.0, 99.0, 99.9)):
+        print("  p%-7s %10.1f" % (percentile, value / 1000.0))
+    print("  max      %10.1f" % (histogram.max / 1000.0, ))
+
+def main():
+    parser = argparse.ArgumentParser(description='Round trip (NewOrderSingle -> ExecutionReport) latency over loopback.')
+    parser.add_argument('-r', '--rate', dest='rate', type=float, action='store', default=1000.0, help='orders per second to send')
+    parser.add_argument('-n', '--count', dest='count', type=int, action='store', default=10000, help='number of round trips to measure')
+    parser.add_argument('-w', '--warmup', dest='warmup', type=int, action='store', default=1000, help='round trips to run before measuring')
+    parser.add_argument('-p', '--port', dest='port', type=int, action='store', default=9899, help='port for the server to listen on')
+    parser.add_argument('-j', '--journal', dest='journal', choices=['file', 'memory'], action='store', default='file', help='journal to a fresh file, or to memory')
+    parser.add_argument('--timeout', dest='timeout', type=float, action='store', default=30.0, help='seconds to wait for acks, beyond the time the orders take to send')
+    parser.add_argument('-t', '--trace', dest='trace', action='store_true', help='also report where the client spends its time, by stage')
+    parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', help='log engine activity')
+
+    args = parser.parse_args()
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO if args.verbose else logging.WARNING)
+
+    directory = tempfile.mkdtemp(prefix="pyfix-latency-")
+    timedOut = False
+    try:
+        serverJournal = None if args.journal == 'memory' else os.path.join(directory, "server.store")
+        clientJournal = None if args.journal == 'memory' else os.path.join(directory, "client.store")
+
+        ready = multiprocessing.Event()
+        stop = multiprocessing.Event()
+        server = multiprocessing.Process(target=runEchoServer, args=("127.0.0.1", args.port, serverJournal, ready, stop))
+        server.start()
+        try:
+            if not ready.wait(10.0):
+                raise RuntimeError("Server failed to start")
+
+            engine = FIXEngine(clientJournal)
+            if args.trace:
+                engine.traceCapacity = args.count
+            client = FIXClient(engine, PROTOCOL, "TARGET", "SENDER")
+            latencyClient = LatencyClient(engine, args.rate, args.count, args.warmup)
+            client.addConnectionListener(latencyClient.onLoggedIn, ConnectionState.LOGGED_IN)
+            client.start("127.0.0.1", args.port)
+            # so we don't wait forever if the acks stop arriving, e.g. the server died
+            deadline = time.monotonic() + (args.warmup + args.count) / args.rate + args.timeout
+            while not latencyClient.isComplete():
+                if time.monotonic() >= deadline:
+                    timedOut = True
+                    break
+                engine.eventManager.waitForEventWithTimeout(0.1)
+            if timedOut:
+                print("Timed out:        %s of %s acked, %s outstanding" % (latencyClient.acked, args.warmup + args.count, latencyClient.outstanding()))
+            printReport(latencyClient, args.rate)
+            if args.trace:
+                print(latencyClient.connection.tracer.report())
+            client.stop()
+        finally:
+            stop.set()
+            server.join(10.0)
+    finally:
+        shutil.rmtree(directory)
+    if timedOut:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
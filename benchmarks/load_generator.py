@@ -0,0 +1,380 @@
+import argparse
+import importlib
+import logging
+import math
+import multiprocessing
+import random
+import time
+from pyfix.client_connection import FIXClient
+from pyfix.connection import ConnectionState, MessageDirection
+from pyfix.engine import FIXEngine
+from pyfix.event import TimerEventRegistration
+from pyfix.histogram import Histogram
+from pyfix.journaler import Journaler
+from pyfix.message import FIXMessage
+from pyfix.scheduler import ConnectionScheduler
+from latency_benchmark import runEchoServer
+
+PROTOCOL = "pyfix.FIX44"
+
+def parseWeights(text):
+    # "VOD.L:5,BARC.L:3" -> ([VOD.L, BARC.L], [5.0, 3.0]), a missing weight is 1
+    values = []
+    weights = []
+    for item in text.split(","):
+        if ":" in item:
+            value, weight = item.rsplit(":", 1)
+        else:
+            value, weight = item, 1.0
+        values.append(value.strip())
+        weights.append(float(weight))
+    return (values, weights)
+
+class FlowShape(object):
+    # the target rate at a point in the run, 'steady', 'burst' (rate * multiplier for burstLength
+    # seconds out of every burstPeriod) or 'sine' (between rate / multiplier and rate * multiplier)
+    def __init__(self, rate, shape="steady", multiplier=5.0, burstLength=1.0, burstPeriod=10.0):
+        self.rate = rate
+        self.shape = shape
+        self.multiplier = multiplier
+        self.burstLength = burstLength
+        self.burstPeriod = burstPeriod
+
+    def rateAt(self, elapsed):
+        if self.shape == "burst":
+            return self.rate * self.multiplier if elapsed % self.burstPeriod < self.burstLength else self.rate
+        elif self.shape == "sine":
+            return self.rate * math.pow(self.multiplier, math.sin(2.0 * math.pi * elapsed / self.burstPeriod))
+        return self.rate
+
+    def meanRate(self, duration, steps=10000):
+        # the configured rate averaged over a run of 'duration' seconds
+        step = float(duration) / steps
+        return sum([self.rateAt((i + 0.5) * step) for i in range(0, steps)]) / steps
+
+class LoadSession(object):
+    def __init__(self, generator, client):
+        self.generator = generator
+        self.client = client
+        self.connection = None
+        self.nextId = 0
+        # acked orders we can cancel/replace: clOrdID -> (symbol, side, qty, price)
+        self.openOrders = {}
+        self.openIds = []
+        # clOrdID -> (msgType, send time, order)
+        self.pending = {}
+
+    def onLoggedIn(self, connection):
+        self.connection = connection
+        protocol = connection.codec.protocol
+        for msgType in (protocol.msgtype.EXECUTIONREPORT, protocol.msgtype.ORDERCANCELREJECT, protocol.msgtype.REJECT, protocol.msgtype.BUSINESSMESSAGEREJECT):
+            connection.addMessageHandler(self.onResponse, MessageDirection.INBOUND, msgType)
+
+    def onDisconnect(self, connection):
+        if self.connection is not None:
+            self.generator.errors["disconnects"] += 1
+        self.connection = None
+
+    def isReady(self):
+        return self.connection is not None and self.connection.connectionState == ConnectionState.LOGGED_IN
+
+    def newClOrdID(self):
+        self.nextId += 1
+        return "%s-%s" % (self.client.senderCompId, self.nextId)
+
+    def _addOpen(self, clOrdID, order):
+        self.openOrders[clOrdID] = order
+        self.openIds.append(clOrdID)
+
+    def _takeOpen(self, rand):
+        # swap remove, so picking a random order is O(1)
+        index = rand.randrange(len(self.openIds))
+        self.openIds[index], self.openIds[-1] = self.openIds[-1], self.openIds[index]
+        clOrdID = self.openIds.pop()
+        return (clOrdID, self.openOrders.pop(clOrdID))
+
+    def send(self, msg, order=None):
+        protocol = self.connection.codec.protocol
+        self.pending[msg[protocol.fixtags.ClOrdID]] = (msg.msgType, time.perf_counter_ns(), order)
+        self.connection.sendMsg(msg)
+        self.generator.sent[msg.msgType] = self.generator.sent.get(msg.msgType, 0) + 1
+
+    def onResponse(self, connection, msg):
+        protocol = connection.codec.protocol
+        generator = self.generator
+        if msg.msgType == protocol.msgtype.REJECT:
+            generator.errors["session_rejects"] += 1
+            return
+        elif msg.msgType == protocol.msgtype.BUSINESSMESSAGEREJECT:
+            generator.errors["business_rejects"] += 1
+            return
+
+        now = time.perf_counter_ns()
+        clOrdID = msg[protocol.fixtags.ClOrdID] if protocol.fixtags.ClOrdID in msg else None
+        pending = self.pending.pop(clOrdID, None)
+        if pending is None:
+            return
+        (msgType, sendTime, order) = pending
+        generator.latency(msgType).record(now - sendTime)
+        generator.acked += 1
+
+        if msg.msgType == protocol.msgtype.ORDERCANCELREJECT:
+            generator.errors["cancel_rejects"] += 1
+            if order is not None and protocol.fixtags.OrigClOrdID in msg:
+                # the original order is still live
+                self._addOpen(msg[protocol.fixtags.OrigClOrdID], order)
+        elif msg[protocol.fixtags.ExecType] == "8":
+            generator.errors["order_rejects"] += 1
+        elif msgType != protocol.msgtype.ORDERCANCELREQUEST and order is not None:
+            self._addOpen(clOrdID, order)
+
+class LoadGenerator(object):
+    def __init__(self, engine, sessions, tickInterval=0.001):
+        self.engine = engine
+        self.sessions = sessions
+        self.sent = {}
+        self.acked = 0
+        self.errors = {"order_rejects": 0, "cancel_rejects": 0, "session_rejects": 0, "business_rejects": 0, "disconnects": 0}
+        self.histograms = {}
+        self.startTime = None
+        self.endTime = None
+        self.timer = TimerEventRegistration(lambda type, closure: self.tick(), tickInterval)
+
+    def latency(self, msgType):
+        try:
+            return self.histograms[msgType]
+        except KeyError:
+            histogram = self.histograms[msgType] = Histogram(3)
+            return histogram
+
+    def totalSent(self):
+        return sum(self.sent.values())
+
+    def outstanding(self):
+        return sum([len(session.pending) for session in self.sessions])
+
+    def start(self):
+        self.startTime = time.perf_counter()
+        self.engine.eventManager.registerHandler(self.timer)
+
+    def finish(self):
+        self.endTime = time.perf_counter()
+        self.engine.eventManager.unregisterHandler(self.timer)
+
+    def isFinished(self):
+        return self.endTime is not None
+
+    def tick(self):
+        pass
+
+class SyntheticFlow(LoadGenerator):
+    # NewOrderSingle/Cancel/Replace drawn from the given mixes, spread round robin over the ready sessions
+    def __init__(self, engine, sessions, shape, duration, msgMix, symbolMix, qtyRange, priceRange, seed=None):
+        LoadGenerator.__init__(self, engine, sessions)
+        self.shape = shape
+        self.duration = duration
+        self.msgTypes, self.msgWeights = msgMix
+        self.symbols, self.symbolWeights = symbolMix
+        self.qtyRange = qtyRange
+        self.priceRange = priceRange
+        self.random = random.Random(seed)
+        self.budget = 0.0
+        self.lastTick = None
+        self.nextSession = 0
+
+    def tick(self):
+        now = time.perf_counter()
+        elapsed = now - self.startTime
+        if elapsed >= self.duration:
+            self.finish()
+            return
+        if self.lastTick is not None:
+            self.budget += self.shape.rateAt(elapsed) * (now - self.lastTick)
+        self.lastTick = now
+
+        ready = [session for session in self.sessions if session.isReady()]
+        if not ready:
+            return
+        while self.budget >= 1.0:
+            self.budget -= 1.0
+            session = ready[self.nextSession % len(ready)]
+            self.nextSession += 1
+            self.sendOne(session)
+
+    def sendOne(self, session):
+        rand = self.random
+        protocol = session.connection.codec.protocol
+        msgType = rand.choices(self.msgTypes, self.msgWeights)[0]
+        if msgType != protocol.msgtype.NEWORDERSINGLE and not session.openIds:
+            msgType = protocol.msgtype.NEWORDERSINGLE
+
+        msg = FIXMessage(msgType)
+        msg.setField(protocol.fixtags.ClOrdID, session.newClOrdID())
+        if msgType == protocol.msgtype.NEWORDERSINGLE:
+            symbol = rand.choices(self.symbols, self.symbolWeights)[0]
+            order = (symbol, rand.choice(("1", "2")), rand.randint(*self.qtyRange), round(rand.uniform(*self.priceRange), 2))
+            msg.setField(protocol.fixtags.HandlInst, "1")
+            msg.setField(protocol.fixtags.OrdType, "2")
+        else:
+            (origClOrdID, order) = session._takeOpen(rand)
+            msg.setField(protocol.fixtags.OrigClOrdID, origClOrdID)
+            if msgType == protocol.msgtype.ORDERCANCELREPLACEREQUEST:
+                (symbol, side, qty, price) = order
+                order = (symbol, side, rand.randint(*self.qtyRange), round(rand.uniform(*self.priceRange), 2))
+                msg.setField(protocol.fixtags.HandlInst, "1")
+                msg.setField(protocol.fixtags.OrdType, "2")
+
+        (symbol, side, qty, price) = order
+        msg.setField(protocol.fixtags.Symbol, symbol)
+        msg.setField(protocol.fixtags.Side, side)
+        msg.setField(protocol.fixtags.OrderQty, str(qty))
+        if msgType != protocol.msgtype.ORDERCANCELREQUEST:
+            msg.setField(protocol.fixtags.Price, str(price))
+        session.send(msg, order)
+
+class JournalReplay(LoadGenerator):
+    # replays the orders captured in a journal store, at their recorded timing divided by 'speed'.
+    # Each session in the journal is mapped onto one of our sessions.
+    def __init__(self, engine, sessions, journalfile, direction, speed=1.0, chunkSize=1000):
+        LoadGenerator.__init__(self, engine, sessions)
+        self.speed = speed
+        self.journal = Journaler(journalfile)
+        self.protocol = importlib.import_module(PROTOCOL)
+        self.msgs = self._iterMsgs(direction, chunkSize)
+        self.sessionMap = {}
+        self.firstTimestamp = None
+        self.nextMsg = next(self.msgs, None)
+
+    def _iterMsgs(self, direction, chunkSize):
+        msgType = self.protocol.msgtype
+        for chunk in self.journal.iterMsgs(chunkSize, direction=direction, msgTypes=[msgType.NEWORDERSINGLE, msgType.ORDERCANCELREQUEST, msgType.ORDERCANCELREPLACEREQUEST]):
+            for (seqNo, msg, msgDirection, session, timestamp) in chunk:
+                yield (timestamp, session, msg)
+
+    def _session(self, journalSession):
+        try:
+            return self.sessionMap[journalSession]
+        except KeyError:
+            session = self.sessionMap[journalSession] = self.sessions[len(self.sessionMap) % len(self.sessions)]
+            return session
+
+    def tick(self):
+        if self.nextMsg is None:
+            self.finish()
+            return
+        if self.firstTimestamp is None:
+            self.firstTimestamp = self.nextMsg[0]
+        elapsed = (time.perf_counter() - self.startTime) * self.speed
+        fixtags = self.protocol.fixtags
+        while self.nextMsg is not None and self.nextMsg[0] - self.firstTimestamp <= elapsed:
+            (timestamp, journalSession, msg) = self.nextMsg
+            session = self._session(journalSession)
+            if session.isReady():
+                for tag in (fixtags.BeginString, fixtags.BodyLength, fixtags.MsgSeqNum, fixtags.SendingTime, fixtags.SenderCompID, fixtags.TargetCompID, fixtags.CheckSum):
+                    msg.removeField(tag)
+                session.send(msg)
+            else:
+                self.errors["disconnects"] += 1
+            self.nextMsg = next(self.msgs, None)
+
+def printReport(generator, sessions):
+    elapsed = generator.endTime - generator.startTime
+    sent = generator.totalSent()
+    print("Sessions:         %s of %s logged in" % (len([session for session in sessions if session.isReady()]), len(sessions)))
+    print("Sent:             %s in %0.2fs (%s)" % (sent, elapsed, ", ".join(["%s %s" % x for x in sorted(generator.sent.items())])))
+    if isinstance(generator, SyntheticFlow):
+        # the target is what was asked for, so a loop which falls behind shows up as a shortfall
+        target = generator.shape.meanRate(generator.duration)
+        print("Achieved rate:    %0.0f msgs/s (target %0.0f, %0.1f%%)" % (sent / elapsed, target, 100.0 * sent / elapsed / target))
+    else:
+        print("Achieved rate:    %0.0f msgs/s" % (sent / elapsed, ))
+    print("Acked:            %s, %s outstanding" % (generator.acked, generator.outstanding()))
+    print("Errors:           %s" % (", ".join(["%s %s" % x for x in sorted(generator.errors.items())]), ))
+    print("Ack latency (us):")
+    print("  %-4s %10s %10s %10s %10s %10s %10s %10s" % ("type", "count", "min", "p50", "p90", "p99", "p99.9", "max"))
+    for (msgType, histogram) in sorted(generator.histograms.items()):
+        percentiles = [value / 1000.0 for (percentile, value) in histogram.percentiles((50.0, 90.0, 99.0, 99.9))]
+        print("  %-4s %10s %10.1f %10.1f %10.1f %10.1f %10.1f %10.1f" % tuple([msgType, histogram.totalCount, histogram.min / 1000.0] + percentiles + [histogram.max / 1000.0]))
+
+def main():
+    parser = argparse.ArgumentParser(description='Soak test a FIX gateway with synthetic (or replayed) order flow.')
+    parser.add_argument('--host', dest='host', action='store', default='127.0.0.1', help='gateway host')
+    parser.add_argument('-p', '--port', dest='port', type=int, action='store', default=9898, help='gateway port')
+    parser.add_argument('--echo', dest='echo', action='store_true', help='run a local server which acks every order, instead of using a gateway')
+    parser.add_argument('-s', '--sessions', dest='sessions', type=int, action='store', default=1, help='number of sessions to open')
+    parser.add_argument('--sender', dest='sender', action='store', default='LOAD', help='SenderCompID prefix, each session appends its number')
+    parser.add_argument('--target', dest='target', action='store', default='TARGET', help='TargetCompID')
+    parser.add_argument('-r', '--rate', dest='rate', type=float, action='store', default=1000.0, help='messages per second across all sessions')
+    parser.add_argument('-d', '--duration', dest='duration', type=float, action='store', default=10.0, help='seconds to send for')
+    parser.add_argument('--shape', dest='shape', choices=['steady', 'burst', 'sine'], action='store', default='steady', help='how the rate varies over the run')
+    parser.add_argument('--burst-multiplier', dest='multiplier', type=float, action='store', default=5.0, help='peak rate as a multiple of --rate')
+    parser.add_argument('--burst-length', dest='burstLength', type=float, action='store', default=1.0, help='seconds each burst lasts')
+    parser.add_argument('--burst-period', dest='burstPeriod', type=float, action='store', default=10.0, help='seconds between bursts (or the period of the sine)')
+    parser.add_argument('--mix', dest='mix', action='store', default='D:6,F:2,G:2', help='MsgType weights, e.g. D:6,F:2,G:2')
+    parser.add_argument('--symbols', dest='symbols', action='store', default='VOD.L:5,BARC.L:3,HSBA.L:2', help='symbol weights')
+    parser.add_argument('--qty', dest='qty', action='store', default='100-1000', help='order quantity range')
+    parser.add_argument('--price', dest='price', action='store', default='100-200', help='order price range')
+    parser.add_argument('--seed', dest='seed', type=int, action='store', default=None, help='random seed, for a repeatable flow')
+    parser.add_argument('--replay', dest='replay', action='store', default=None, help='replay the orders in this journal store instead')
+    parser.add_argument('--replay-direction', dest='replayDirection', choices=['inbound', 'outbound'], action='store', default='inbound', help='replay the orders the store received (a gateway store) or sent (a client store)')
+    parser.add_argument('--speed', dest='speed', type=float, action='store', default=1.0, help='replay at this multiple of the recorded timing')
+    parser.add_argument('--record', dest='record', action='store', default=None, help='journal our sessions to this store, so the flow can be replayed later')
+    parser.add_argument('--drain', dest='drain', type=float, action='store', default=5.0, help='seconds to wait for outstanding acks')
+    parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', help='log engine activity')
+
+    args = parser.parse_args()
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO if args.verbose else logging.WARNING)
+
+    server = None
+    stop = multiprocessing.Event()
+    if args.echo:
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=runEchoServer, args=(args.host, args.port, None, ready, stop))
+        server.start()
+        if not ready.wait(10.0):
+            raise RuntimeError("Server failed to start")
+
+    try:
+        engine = FIXEngine(args.record)
+        sessions = []
+        if args.replay is not None:
+            direction = MessageDirection.INBOUND if args.replayDirection == 'inbound' else MessageDirection.OUTBOUND
+            generator = JournalReplay(engine, sessions, args.replay, direction, args.speed)
+        else:
+            shape = FlowShape(args.rate, args.shape, args.multiplier, args.burstLength, args.burstPeriod)
+            qtyRange = tuple([int(x) for x in args.qty.split("-")])
+            priceRange = tuple([float(x) for x in args.price.split("-")])
+            generator = SyntheticFlow(engine, sessions, shape, args.duration, parseWeights(args.mix), parseWeights(args.symbols), qtyRange, priceRange, args.seed)
+
+        scheduler = ConnectionScheduler(engine)
+        for i in range(0, args.sessions):
+            client = FIXClient(engine, PROTOCOL, args.target, "%s%s" % (args.sender, i + 1))
+            session = LoadSession(generator, client)
+            client.addConnectionListener(session.onLoggedIn, ConnectionState.LOGGED_IN)
+            client.addConnectionListener(session.onDisconnect, ConnectionState.DISCONNECTED)
+            scheduler.add(client, args.host, args.port)
+            sessions.append(session)
+
+        scheduler.start()
+        while not scheduler.isComplete():
+            engine.eventManager.waitForEventWithTimeout(0.1)
+        if not any([session.isReady() for session in sessions]):
+            raise RuntimeError("No sessions logged in")
+
+        generator.start()
+        while not generator.isFinished():
+            engine.eventManager.waitForEventWithTimeout(0.1)
+        drainEnd = time.monotonic() + args.drain
+        while generator.outstanding() and time.monotonic() < drainEnd:
+            engine.eventManager.waitForEventWithTimeout(0.1)
+
+        printReport(generator, sessions)
+        for session in sessions:
+            session.client.stop()
+    finally:
+        if server is not None:
+            stop.set()
+            server.join(10.0)
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,31 @@
 import argparse
+import calendar
+import datetime
 import logging
+from pyfix.export import JournalExporter
 from pyfix.journaler import Journaler
 from pyfix.message import MessageDirection
 
 
+def parseTime(value):
+    # accepts 'YYYYMMDD-HH:MM[:SS]' or 'HH:MM[:SS]' (today), all times are UTC
+    for fmt in ("%Y%m%d-%H:%M:%S", "%Y%m%d-%H:%M", "%H:%M:%S", "%H:%M"):
+        try:
+            t = datetime.datetime.strptime(value, fmt)
+            if t.year == 1900:
+                t = datetime.datetime.combine(datetime.datetime.utcnow().date(), t.time())
+            return calendar.timegm(t.timetuple())
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError("invalid time '%s'" % (value, ))
+
+def parseTag(value):
+    try:
+        tag, tagValue = value.split('=', 1)
+        return (tag, tagValue)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected TAG=VALUE, got '%s'" % (value, ))
+
 def main():
     logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
 
@@ -13,6 +35,15 @@ def main():
     group.add_argument('-s', '--sessions', dest='sessions', nargs='+', action='store', metavar=('s1', 's2'), help='session to examine')
     parser.add_argument('filename', action='store', help='filename of the store file')
     parser.add_argument('-d', '--direction', dest='direction', choices=['in', 'out', 'both'], action='store', default="both", help='filename of the store file')
+    parser.add_argument('-m', '--msgtype', dest='msgTypes', nargs='+', action='store', help='only show messages of these MsgTypes (e.g. 8 3)')
+    parser.add_argument('-c', '--clordid', dest='clOrdID', action='store', help='only show messages for this ClOrdID')
+    parser.add_argument('-t', '--tag', dest='tags', type=parseTag, action='append', metavar='TAG=VALUE', help='only show messages with this indexed tag value')
+    parser.add_argument('--from', dest='startTime', type=parseTime, action='store', help='only show messages journaled at or after this time (UTC)')
+    parser.add_argument('--to', dest='endTime', type=parseTime, action='store', help='only show messages journaled at or before this time (UTC)')
+    parser.add_argument('-e', '--export', dest='export', action='store', metavar='PATH', help='export the selected messages to PATH instead of printing them')
+    parser.add_argument('--format', dest='format', choices=['columnar', 'parquet'], action='store', default='columnar', help='export format (parquet requires pyarrow)')
+    parser.add_argument('--columns', dest='columns', nargs='+', action='store', default=[], metavar='TAG', help='tags to export as columns')
+    parser.add_argument('--numeric', dest='numeric', nargs='+', action='store', default=[], metavar='TAG', help='exported tags to store as numeric columns')
 
     args = parser.parse_args()
 
@@ -30,9 +61,21 @@ def main():
     else:
         # list all messages in that stream
         direction = None if args.direction == 'both' else MessageDirection.INBOUND if args.direction == "in" else MessageDirection.OUTBOUND
-        for (seqNo, msg, msgDirection, session) in journal.getAllMsgs(args.sessions, direction):
-            d = "---->" if msgDirection == MessageDirection.OUTBOUND.value else "<----"
-            print("{:>3} {:^5} [{:>5}] {}".format(session, d, seqNo, msg))
+        tags = dict(args.tags or [])
+        if args.clOrdID is not None:
+            tags["11"] = args.clOrdID
+        if args.export is not None:
+            exporter = JournalExporter(journal, args.columns + [t for t in args.numeric if t not in args.columns], args.numeric)
+            filters = {"sessions": args.sessions, "direction": direction, "msgTypes": args.msgTypes, "startTime": args.startTime, "endTime": args.endTime, "tags": tags}
+            if args.format == 'parquet':
+                rows = exporter.exportParquet(args.export, **filters)
+            else:
+                rows = exporter.exportColumnar(args.export, **filters)
+            logging.info("Exported %s messages to %s" % (rows, args.export))
+        else:
+            for (seqNo, msg, msgDirection, session) in journal.findMsgs(args.sessions, direction, args.msgTypes, args.startTime, args.endTime, tags):
+                d = "---->" if msgDirection == MessageDirection.OUTBOUND.value else "<----"
+                print("{:>3} {:^5} [{:>5}] {}".format(session, d, seqNo, msg))
 
 if __name__ == '__main__':
     main()
@@ -1,6 +1,7 @@
-from pyfix.FIX44 import msgtype, messages
+from pyfix.FIX44 import fixtags, msgtype, messages
 
 __author__ = 'tom'
 
-beginstring = 'FIX.4.4'
-
+# the tables shared by every codec/endpoint using this protocol
+dictionary = fixtags.dictionary
+beginstring = dictionary.beginstring
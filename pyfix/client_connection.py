@@ -1,10 +1,13 @@
+import errno
 import logging
+import os
+import random
 import socket
 from pyfix.journaler import DuplicateSeqNoError
 from pyfix.message import FIXMessage
 from pyfix.session import FIXSession
 from pyfix.connection import FIXEndPoint, ConnectionState, MessageDirection, FIXConnectionHandler
-from pyfix.event import TimerEventRegistration
+from pyfix.event import FileDescriptorEventRegistration, EventType, TimerEventRegistration
 
 class FIXClientConnectionHandler(FIXConnectionHandler):
     def __init__(self, engine, protocol, targetCompId, senderCompId, sock=None, addr=None, observer=None, targetSubId = None, senderSubId = None, heartbeatTimeout = 30):
@@ -20,6 +23,7 @@ class FIXClientConnectionHandler(FIXConnectionHandler):
         self.session = self.engine.getOrCreateSessionFromCompIds(self.targetCompId, self.senderCompId)
         if self.session is None:
             raise RuntimeError("Failed to create client session")
+        self.engine.acquireSession(self.session)
 
         self.sendMsg(protocol.messages.Messages.logon())
 
@@ -59,7 +63,7 @@ class FIXClientConnectionHandler(FIXConnectionHandler):
             elif msgType == protocol.msgtype.TESTREQUEST:
                 responses.append(protocol.messages.Messages.heartbeat())
             elif msgType == protocol.msgtype.RESENDREQUEST:
-                responses.extend(self._handleResendRequest(msg))
+                self._handleResendRequest(msg)
             elif msgType == protocol.msgtype.SEQUENCERESET:
                 # we can treat GapFill and SequenceReset in the same way
                 # in both cases we will just reset the seq number to the
@@ -68,7 +72,8 @@ class FIXClientConnectionHandler(FIXConnectionHandler):
                 if msg[protocol.fixtags.GapFillFlag] == "Y":
                     logging.info("Received SequenceReset(GapFill) filling gap from %s to %s" % (recvSeqNo, newSeqNo))
                 self.session.setRecvSeqNo(int(newSeqNo) - 1)
-                recvSeqNo = newSeqNo
+                # the next message we expect is NewSeqNo
+                recvSeqNo = int(newSeqNo) - 1
         else:
             logging.warning("Can't process message, counterparty is not logged in")
 
@@ -77,39 +82,89 @@ class FIXClientConnectionHandler(FIXConnectionHandler):
 
 
 class FIXClient(FIXEndPoint):
-    def __init__(self, engine, protocol, targetCompId, senderCompId, targetSubId = None, senderSubId = None, heartbeatTimeout = 30):
+    def __init__(self, engine, protocol, targetCompId, senderCompId, targetSubId = None, senderSubId = None, heartbeatTimeout = 30,
+                 reconnectInterval = 1.0, maxReconnectInterval = 60.0, connectTimeout = 10.0):
         self.targetCompId = targetCompId
         self.senderCompId = senderCompId
         self.targetSubId = targetSubId
         self.senderSubId = senderSubId
         self.heartbeatTimeout = heartbeatTimeout
 
+        # retries back off exponentially (with jitter, so many clients don't retry in lock step)
+        self.reconnectInterval = reconnectInterval
+        self.maxReconnectInterval = maxReconnectInterval
+        self.connectTimeout = connectTimeout
+        self.connectAttempts = 0
+        self.running = False
+        self.socket = None
+        self.connectRegistration = None
+        self.connectTimer = None
+        self.connectionRetryTimer = None
+
         FIXEndPoint.__init__(self, engine, protocol)
 
+    def retryDelay(self):
+        delay = min(self.maxReconnectInterval, self.reconnectInterval * (2 ** self.connectAttempts))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _cancelTimers(self):
+        for registration in (self.connectRegistration, self.connectTimer, self.connectionRetryTimer):
+            if registration is not None:
+                self.engine.eventManager.unregisterHandler(registration)
+        self.connectRegistration = None
+        self.connectTimer = None
+        self.connectionRetryTimer = None
+
     def tryConnecting(self, type, closure):
-        try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            logging.debug("Attempting Connection to " + self.host + ":" + str(self.port))
-            self.socket.connect((self.host, self.port))
-            if self.connectionRetryTimer is not None:
-                self.engine.eventManager.unregisterHandler(self.connectionRetryTimer)
-                self.connectionRetryTimer = None
+        self._cancelTimers()
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setblocking(False)
+        logging.debug("Attempting Connection to " + self.host + ":" + str(self.port))
+        result = self.socket.connect_ex((self.host, self.port))
+        if result == 0:
+            self.connected()
+        elif result in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            # the socket becomes writable once the connect completes (or fails)
+            self.connectRegistration = FileDescriptorEventRegistration(self.handle_connect, self.socket, EventType.WRITE)
+            self.engine.eventManager.registerHandler(self.connectRegistration)
+            self.connectTimer = TimerEventRegistration(lambda type, closure: self.connectFailed(errno.ETIMEDOUT), self.connectTimeout)
+            self.engine.eventManager.registerHandler(self.connectTimer)
+        else:
+            self.connectFailed(result)
+
+    def handle_connect(self, type, closure):
+        self._cancelTimers()
+        result = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if result == 0:
             self.connected()
-        except socket.error as why:
-            logging.error("Connection failed, trying again in 5s")
-            if self.connectionRetryTimer is None:
-                self.connectionRetryTimer = TimerEventRegistration(self.tryConnecting, 5.0)
-                self.engine.eventManager.registerHandler(self.connectionRetryTimer)
+        else:
+            self.connectFailed(result)
+
+    def connectFailed(self, result):
+        self._cancelTimers()
+        self.socket.close()
+        self.scheduleRetry("Connection to %s:%s failed (%s)" % (self.host, self.port, os.strerror(result)))
+
+    def scheduleRetry(self, reason):
+        if not self.running:
+            return
+        delay = self.retryDelay()
+        self.connectAttempts += 1
+        logging.error("%s, trying again in %0.1fs" % (reason, delay))
+        self.connectionRetryTimer = TimerEventRegistration(self.tryConnecting, delay)
+        self.engine.eventManager.registerHandler(self.connectionRetryTimer)
 
     def start(self, host, port):
         self.host = host
         self.port = port
         self.connections = []
-        self.connectionRetryTimer = None
+        self.connectAttempts = 0
+        self.running = True
 
         self.tryConnecting(None, None)
 
     def connected(self):
+        self.connectAttempts = 0
         self.addr = (self.host, self.port)
         logging.info("Connected to %s" % repr(self.addr))
         connection = FIXClientConnectionHandler(self.engine, self.protocol, self.targetCompId, self.senderCompId, self.socket, self.addr, self, self.targetSubId, self.senderSubId, self.heartbeatTimeout)
@@ -119,11 +174,13 @@ class FIXClient(FIXEndPoint):
 
     def notifyDisconnect(self, connection):
         FIXEndPoint.notifyDisconnect(self, connection)
-        self.tryConnecting(None, None)
+        self.scheduleRetry("Disconnected from %s:%s" % (self.host, self.port))
 
     def stop(self):
         logging.info("Stopping client connections")
-        for connection in self.connections:
+        self.running = False
+        self._cancelTimers()
+        for connection in list(self.connections):
             connection.disconnect()
-        self.socket.close()
-
+        if self.socket is not None:
+            self.socket.close()
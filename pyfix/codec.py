@@ -19,6 +19,12 @@ class Codec(object):
     def __init__(self, protocol):
         self.protocol = protocol
         self.SOH = '\x01'
+        self.repeatingGroupTags = protocol.fixtags.repeatingGroupIdentifiers()
+        # where the dictionary has message layouts, a message is decoded with just its own groups
+        dictionary = getattr(protocol, "dictionary", None)
+        self.messageGroups = {} if dictionary is None else dict([(msgType, layout["groups"]) for (msgType, layout) in dictionary.messages.items()])
+        self.checksumErrors = 0
+        self.decodeErrors = 0
 
     @staticmethod
     def current_datetime():
@@ -91,6 +97,28 @@ class Codec(object):
 
         return fixmsg + SEP
 
+    def encodeResend(self, encodedMsg):
+        # Re-stamps a previously encoded message (bytes) for a resend, without a full
+        # encode. We flag it as a PossDup, carry the original SendingTime over to
+        # OrigSendingTime and then fix up the BodyLength & CheckSum
+        SOH = self.SOH.encode('utf-8')
+        fixtags = self.protocol.fixtags
+
+        bodyStart = encodedMsg.index(SOH, encodedMsg.index(SOH) + 1) + 1
+        trailerStart = encodedMsg.rindex(SOH + fixtags.CheckSum.encode('utf-8') + b'=') + 1
+
+        sendingTimeTag = SOH + fixtags.SendingTime.encode('utf-8') + b'='
+        sendingTimeStart = encodedMsg.index(sendingTimeTag, bodyStart - 1) + len(sendingTimeTag)
+        sendingTimeEnd = encodedMsg.index(SOH, sendingTimeStart)
+        origSendingTime = encodedMsg[sendingTimeStart:sendingTimeEnd]
+
+        resentFields = ("%s=Y%s%s=%s%s%s=" % (fixtags.PossDupFlag, self.SOH, fixtags.SendingTime, self.current_datetime(), self.SOH, fixtags.OrigSendingTime)).encode('utf-8')
+        body = encodedMsg[bodyStart:sendingTimeStart - len(sendingTimeTag) + 1] + resentFields + origSendingTime + encodedMsg[sendingTimeEnd:trailerStart]
+
+        fixmsg = encodedMsg[:encodedMsg.index(SOH) + 1] + ("%s=%i" % (fixtags.BodyLength, len(body))).encode('utf-8') + SOH + body
+        cksum = sum(fixmsg) % 256
+        return fixmsg + ("%s=%0.3i" % (fixtags.CheckSum, cksum)).encode('utf-8') + SOH
+
     def decode(self, rawmsg):
         #msg = rawmsg.rstrip(os.linesep).split(SOH)
         try:
@@ -129,7 +157,7 @@ class Codec(object):
                 # logging.debug("\t" + "|".join(msg))
 
                 repeatingGroups = []
-                repeatingGroupTags = self.protocol.fixtags.repeatingGroupIdentifiers()
+                repeatingGroupTags = self.repeatingGroupTags
                 currentContext = decodedMsg
 
                 for m in msg:
@@ -144,11 +172,13 @@ class Codec(object):
                     if tag == self.protocol.fixtags.CheckSum:
                         cksum = ((sum([ord(i) for i in list(self.SOH.join(msg[:-1]))]) + 1) % 256)
                         if cksum != int(value):
+                            self.checksumErrors += 1
                             logging.warning("\tCheckSum: %s (INVALID) expecting %s" % (int(value), cksum))
                     elif tag == self.protocol.fixtags.MsgType:
                         try:
                             msgType =  self.protocol.msgtype.msgTypeToName(value)
                             decodedMsg.setMsgType(value)
+                            repeatingGroupTags = self.messageGroups.get(value, repeatingGroupTags)
                         except KeyError:
                             logging.error('*** MsgType "%s" not supported ***')
 
@@ -184,5 +214,6 @@ class Codec(object):
 
                 return (decodedMsg, remainingMsgFragment)
         except UnicodeDecodeError as why:
+            self.decodeErrors += 1
             logging.error("Failed to parse message %s" % (why, ))
             return (None, 0)
@@ -0,0 +1,280 @@
+import argparse
+import json
+import logging
+import os
+import xml.etree.ElementTree as ElementTree
+from pyfix.dictionary import loadDictionary
+
+# what the session layer (and the codec) use, so every protocol must define them
+_SESSION_TAGS = ("BeginString", "BodyLength", "MsgType", "SenderCompID", "TargetCompID", "MsgSeqNum", "SendingTime", "CheckSum",
+                 "PossDupFlag", "OrigSendingTime", "GapFillFlag", "NewSeqNo", "BeginSeqNo", "EndSeqNo", "TestReqID", "HeartBtInt", "EncryptMethod")
+_SESSION_MSGTYPES = ("HEARTBEAT", "TESTREQUEST", "RESENDREQUEST", "SEQUENCERESET", "LOGOUT", "LOGON")
+
+class DictionaryError(Exception):
+    pass
+
+def _versionName(root):
+    # e.g. FIX42, FIX50SP2, FIXT11
+    name = "%s%s%s" % (root.get("type", "FIX"), root.get("major"), root.get("minor"))
+    servicePack = root.get("servicepack", "0")
+    return name if servicePack == "0" else "%sSP%s" % (name, servicePack)
+
+def _mergeMembers(groups, name, members):
+    # the same group can have different members in different places, we keep all of them (in the order first seen)
+    try:
+        existing = groups[name]
+    except KeyError:
+        groups[name] = list(members)
+        return
+    existing.extend([member for member in members if member not in existing])
+
+class XMLDictionary(object):
+    # One or more QuickFIX format XML data dictionaries, e.g. FIX42.xml, or FIXT11.xml and FIX50SP2.xml
+    # (the transport dictionary first). Custom fields are just fields in the dictionary.
+    def __init__(self, filenames):
+        self.filenames = filenames
+        self.roots = [ElementTree.parse(filename).getroot() for filename in filenames]
+        self.fields = {}
+        self.fieldTypes = {}
+        self.msgTypeValues = {}
+        self.components = {}
+        self.messages = []
+        self.header = []
+        self.trailer = []
+
+        for root in self.roots:
+            for field in root.iterfind("fields/field"):
+                name = field.get("name")
+                number = field.get("number")
+                if self.fields.get(name, number) != number:
+                    raise DictionaryError("Field %s is defined as both %s and %s" % (name, self.fields[name], number))
+                self.fields[name] = number
+                if field.get("type") is not None:
+                    self.fieldTypes[name] = field.get("type")
+                if name == "MsgType":
+                    for value in field.iterfind("value"):
+                        self.msgTypeValues.setdefault(value.get("enum"), value.get("description"))
+            for component in root.iterfind("components/component"):
+                self.components[component.get("name")] = component
+            self.messages.extend(root.iterfind("messages/message"))
+            self.header.extend(root.iterfind("header"))
+            self.trailer.extend(root.iterfind("trailer"))
+
+    def beginString(self):
+        # FIXT when there's a transport dictionary, otherwise the version of the (only) application dictionary
+        for root in self.roots:
+            if root.get("type") == "FIXT":
+                return "FIXT.%s.%s" % (root.get("major"), root.get("minor"))
+        root = self.roots[0]
+        return "FIX.%s.%s" % (root.get("major"), root.get("minor"))
+
+    def versionName(self):
+        return _versionName(self.roots[-1])
+
+    def defaultApplVerID(self):
+        # over FIXT the Logon says which application version we speak
+        if not self.beginString().startswith("FIXT") or self.roots[-1].get("type") == "FIXT":
+            return None
+        versionName = self.versionName()
+        for root in self.roots:
+            for value in root.iterfind("fields/field[@name='ApplVerID']/value"):
+                if value.get("description") == versionName:
+                    return value.get("enum")
+        return None
+
+    def _members(self, element, groups, required=None, isRequired=True):
+        # the fields of element in order, with components expanded. Each group found is added to 'groups'
+        # and, outside of groups, required fields are added to 'required'
+        members = []
+        for child in element:
+            name = child.get("name")
+            childRequired = isRequired and child.get("required") == "Y"
+            if child.tag in ("field", "group"):
+                if name not in self.fields:
+                    raise DictionaryError("Field %s isn't defined" % (name, ))
+                members.append(name)
+                if required is not None and childRequired:
+                    required.append(name)
+                if child.tag == "group":
+                    _mergeMembers(groups, name, self._members(child, groups))
+            elif child.tag == "component":
+                try:
+                    component = self.components[name]
+                except KeyError:
+                    raise DictionaryError("Component %s isn't defined" % (name, ))
+                members.extend(self._members(component, groups, required, childRequired))
+        return members
+
+    def compile(self):
+        # -> the JSON dictionary loaded by pyfix.dictionary
+        headerGroups = {}
+        for element in self.header + self.trailer:
+            self._members(element, headerGroups)
+
+        msgTypes = {}
+        sessionMessageTypes = []
+        repeatingGroups = dict([(name, list(members)) for (name, members) in headerGroups.items()])
+        messages = {}
+        for message in self.messages:
+            name = message.get("name").upper()
+            msgTypes[name] = message.get("msgtype")
+            if message.get("msgcat") == "admin":
+                sessionMessageTypes.append(name)
+
+            # the header and trailer groups can appear in any message
+            groups = dict([(group, list(members)) for (group, members) in headerGroups.items()])
+            required = []
+            self._members(message, groups, required)
+            for (group, members) in groups.items():
+                _mergeMembers(repeatingGroups, group, members)
+            messages[name] = {"required": required, "groups": groups}
+
+        # MsgType values without a message layout, e.g. the application messages for a transport dictionary
+        for (value, description) in sorted(self.msgTypeValues.items()):
+            if value not in msgTypes.values():
+                msgTypes.setdefault(description.replace("_", "").upper(), value)
+
+        missing = [tag for tag in _SESSION_TAGS if tag not in self.fields] + [msgType for msgType in _SESSION_MSGTYPES if msgType not in msgTypes]
+        if missing:
+            raise DictionaryError("%s isn't defined, the session layer needs it (FIX 5.0 dictionaries also need the FIXT transport dictionary)" % (", ".join(missing), ))
+
+        tags = {}
+        for (name, number) in sorted(self.fields.items(), key=lambda field: int(field[1])):
+            tags[name] = {"tag": number, "values": msgTypes} if name == "MsgType" else number
+        return {
+            "beginstring": self.beginString(),
+            "sessionMessageTypes": sessionMessageTypes,
+            "tags": tags,
+            "repeatingGroupIdentifiers": repeatingGroups,
+            "fieldTypes": self.fieldTypes,
+            "messages": messages,
+        }
+
+_FIXTAGS = '''import os
+from pyfix.dictionary import loadDictionary
+
+# generated by pyfix.compiler from %(sources)s, the tables are compiled from %(name)s.json (and cached)
+dictionary = loadDictionary(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "%(name)s.json"))
+globals().update(dictionary.tags)
+
+beginstring = dictionary.beginstring
+
+# tag -> name
+tags = dictionary.tagNames
+
+def tagToName(n):
+    try:
+        return tags[n]
+    except KeyError:
+        return str(n)
+
+def repeatingGroupIdentifiers():
+    return dictionary.repeatingGroups
+'''
+
+_MSGTYPE = '''from .fixtags import dictionary
+
+globals().update(dictionary.msgTypes)
+
+sessionMessageTypes = dictionary.sessionMessageTypes
+
+# value -> name
+tags = dictionary.msgTypeNames
+
+def msgTypeToName(n):
+    try:
+        return tags[n]
+    except KeyError:
+        return str(n)
+'''
+
+_MESSAGES = '''from . import msgtype, fixtags
+from pyfix.message import FIXMessage
+
+class Messages(object):
+
+    @staticmethod
+    def logon():
+        msg = FIXMessage(msgtype.LOGON)
+        msg.setField(fixtags.EncryptMethod, 0)
+        msg.setField(fixtags.HeartBtInt, 30)%(logonFields)s
+        return msg
+
+    @staticmethod
+    def logout():
+        msg = FIXMessage(msgtype.LOGOUT)
+        return msg
+
+    @staticmethod
+    def heartbeat():
+        msg = FIXMessage(msgtype.HEARTBEAT)
+        return msg
+
+    @staticmethod
+    def test_request():
+        msg = FIXMessage(msgtype.TESTREQUEST)
+        return msg
+
+    @staticmethod
+    def sequence_reset(respondingTo, isGapFill):
+        msg = FIXMessage(msgtype.SEQUENCERESET)
+        msg.setField(fixtags.GapFillFlag, 'Y' if isGapFill else 'N')
+        msg.setField(fixtags.MsgSeqNum, respondingTo[fixtags.BeginSeqNo])
+        return msg
+
+    @staticmethod
+    def resend_request(beginSeqNo, endSeqNo = '0'):
+        msg = FIXMessage(msgtype.RESENDREQUEST)
+        msg.setField(fixtags.BeginSeqNo, str(beginSeqNo))
+        msg.setField(fixtags.EndSeqNo, str(endSeqNo))
+        return msg
+'''
+
+_INIT = '''from . import fixtags, msgtype, messages
+
+# the tables shared by every codec/endpoint using this protocol
+dictionary = fixtags.dictionary
+beginstring = dictionary.beginstring
+'''
+
+def generate(filenames, directory, name=None):
+    # Writes <directory>/<name>.json and the protocol package <directory>/<name>/, which can be used
+    # like pyfix.FIX44 (e.g. FIXEndPoint(engine, "pyfix.FIX42")). Returns the package's directory.
+    xmlDictionary = XMLDictionary(filenames)
+    source = xmlDictionary.compile()
+    if name is None:
+        name = xmlDictionary.versionName()
+
+    jsonFilename = os.path.join(directory, "%s.json" % (name, ))
+    with open(jsonFilename, "w") as f:
+        json.dump(source, f, indent=2)
+        f.write("\n")
+
+    package = os.path.join(directory, name)
+    os.makedirs(package, exist_ok=True)
+    defaultApplVerID = xmlDictionary.defaultApplVerID()
+    parameters = {
+        "name": name,
+        "sources": ", ".join([os.path.basename(filename) for filename in filenames]),
+        "logonFields": "" if defaultApplVerID is None else "\n        msg.setField(fixtags.DefaultApplVerID, '%s')" % (defaultApplVerID, ),
+    }
+    for (module, template) in (("__init__", _INIT), ("fixtags", _FIXTAGS), ("msgtype", _MSGTYPE), ("messages", _MESSAGES)):
+        with open(os.path.join(package, "%s.py" % (module, )), "w") as f:
+            f.write(template % parameters)
+
+    # compile the tables now, rather than on the first import
+    loadDictionary(jsonFilename)
+    logging.info("Generated %s (%s tags, %s message types) in %s" % (name, len(source["tags"]), len(source["tags"]["MsgType"]["values"]), package))
+    return package
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a protocol package from QuickFIX format XML data dictionaries.')
+    parser.add_argument('dictionaries', nargs='+', help='the XML dictionaries, the FIXT transport dictionary first for FIX 5.0')
+    parser.add_argument('-o', '--output', dest='output', action='store', default='.', help='the directory to write the package to')
+    parser.add_argument('-n', '--name', dest='name', action='store', default=None, help='the package name (by default the version, e.g. FIX42)')
+    args = parser.parse_args()
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.INFO)
+    generate(args.dictionaries, args.output, args.name)
+
+if __name__ == '__main__':
+    main()
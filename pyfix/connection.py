@@ -1,10 +1,16 @@
 import importlib
 import sys
+import time
+import types
 from pyfix.codec import Codec
 from pyfix.journaler import DuplicateSeqNoError
 from pyfix.message import FIXMessage, MessageDirection
+from pyfix.resend import ResendReplay
+from pyfix.transaction import MessagePriority, PriorityResourceQueue, Transaction, TransactionResource
 
 from pyfix.session import *
+from pyfix.throttle import TokenBucket
+from pyfix.trace import MessageTracer, TraceStage
 from enum import Enum
 from pyfix.event import FileDescriptorEventRegistration, EventType, TimerEventRegistration
 
@@ -31,8 +37,52 @@ class SessionWarning(Exception):
 class SessionError(Exception):
     pass
 
-class FIXConnectionHandler(object):
+class QueuedSend(TransactionResource):
+    def __init__(self, action, priority, count=1):
+        TransactionResource.__init__(self, action)
+        self.priority = priority
+        self.count = count
+        self.queuedTime = time.monotonic()
+
+class MessageDispatcher(object):
+    # message handlers, registered by direction and/or msgType (None matches everything)
+    def __init__(self):
+        self.msgHandlers = []
+        self.msgDispatch = {}
+
+    def handlersFor(self, direction, msgType):
+        try:
+            return self.msgDispatch[(direction, msgType)]
+        except KeyError:
+            # nobody registered for this msgType specifically, so only the wildcard handlers apply
+            return self.msgDispatch.get((direction, None), ())
+
+    def _rebuildDispatchTable(self):
+        # wildcard handlers are merged into every bucket here, rather than on every message,
+        # each bucket keeps handlers in the order they were registered
+        msgTypes = set([x[2] for x in self.msgHandlers if x[2] is not None])
+        msgTypes.add(None)
+        dispatch = {}
+        for direction in MessageDirection:
+            for msgType in msgTypes:
+                handlers = tuple([x[0] for x in self.msgHandlers if (x[1] is None or x[1] == direction) and (x[2] is None or x[2] == msgType)])
+                if handlers:
+                    dispatch[(direction, msgType)] = handlers
+        self.msgDispatch = dispatch
+
+    def addMessageHandler(self, handler, direction = None, msgType = None):
+        self.msgHandlers.append((handler, direction, msgType))
+        self._rebuildDispatchTable()
+
+    def removeMessageHandler(self, handler, direction = None, msgType = None):
+        self.msgHandlers = [x for x in self.msgHandlers if not (x[0] == handler and
+                                                                (x[1] == direction or direction is None) and
+                                                                (x[2] == msgType or msgType is None))]
+        self._rebuildDispatchTable()
+
+class FIXConnectionHandler(MessageDispatcher):
     def __init__(self, engine, protocol, sock=None, addr=None, observer=None):
+        MessageDispatcher.__init__(self)
         self.codec = Codec(protocol)
         self.engine = engine
         self.connectionState = ConnectionState.CONNECTED
@@ -41,10 +91,46 @@ class FIXConnectionHandler(object):
         self.observer = observer
         self.msgBuffer = b''
         self.heartbeatPeriod = 30.0
-        self.msgHandlers = []
         self.sock = sock
-        self.heartbeatTimerRegistration = None
-        self.expectedHeartbeatRegistration = None
+        self.heartbeatSlot = None
+        self.resendReplay = None
+        self.reorderBuffer = InboundReorderBuffer()
+        self.reorderTimerRegistration = None
+        self.resendBatchSize = 100
+        self.resendRate = None
+
+        # outbound messages are only queued once the socket stops accepting data, and are then
+        # written highest priority first so the session (and cancels) survive a congested link
+        self.sendQueue = PriorityResourceQueue()
+        self.writeBuffer = bytearray()
+        # the session's own rate limit (the engine may impose another across all sessions), messages
+        # of the bypass priorities are never held back by it
+        self.throttle = None
+        self.throttleBypass = frozenset([MessagePriority.SESSION])
+        self.throttleTimer = TimerEventRegistration(lambda type, closure: self._throttleTimeout(), 0.0)
+        self.queuedMsgs = 0
+        self.queueWaitTotal = 0.0
+        self.queueWaitMax = 0.0
+        self.transaction = None
+        self.transactionMsgs = None
+        self.transactionPriority = None
+
+        # per message timings, only collected when tracing is switched on
+        self.tracer = None if engine.traceCapacity is None else MessageTracer(engine.traceCapacity)
+        self.currentTrace = None
+        self.heartbeatMisses = 0
+        self.metrics = engine.metrics
+        if self.metrics is not None:
+            self.metrics.addConnection(self)
+        # in sequence Heartbeats and TestRequests are only journaled as a marker, and are only
+        # decoded/dispatched if someone has a handler for them
+        self.adminFastPathTypes = frozenset([protocol.msgtype.HEARTBEAT, protocol.msgtype.TESTREQUEST])
+        # only the ones this protocol has, e.g. FIX 4.2 has no OrderMassCancelRequest
+        urgentMsgTypes = [getattr(protocol.msgtype, name, None) for name in ("ORDERCANCELREQUEST", "ORDERCANCELREPLACEREQUEST", "ORDERMASSCANCELREQUEST")]
+        self.urgentMsgTypes = frozenset([msgType for msgType in urgentMsgTypes if msgType is not None])
+        if sock is not None:
+            sock.setblocking(False)
+        self.writeEvent = FileDescriptorEventRegistration(self.handle_write, sock, EventType.WRITE)
         self.socketEvent = FileDescriptorEventRegistration(self.handle_read, sock, EventType.READ)
         self.engine.eventManager.registerHandler(self.socketEvent)
 
@@ -54,110 +140,98 @@ class FIXConnectionHandler(object):
     def disconnect(self):
         self.handle_close()
 
-    def _notifyMessageObservers(self, msg, direction, persistMessage=True):
+    def _notifyMessageObservers(self, msg, direction, persistMessage=True, trace=None):
         if persistMessage is True:
             self.engine.journaller.persistMsg(msg, self.session, direction)
-        for handler in filter(lambda x: (x[1] is None or x[1] == direction) and (x[2] is None or x[2] == msg.msgType), self.msgHandlers):
-            handler[0](self, msg)
-
-    def addMessageHandler(self, handler, direction = None, msgType = None):
-        self.msgHandlers.append((handler, direction, msgType))
-
-    def removeMessageHandler(self, handler, direction = None, msgType = None):
-        remove = filter(lambda x: x[0] == handler and
-                                  (x[1] == direction or direction is None) and
-                                  (x[2] == msgType or msgType is None), self.msgHandlers)
-        for h in remove:
-            self.msgHandlers.remove(h)
+            if trace is not None:
+                trace.stamp(TraceStage.PERSISTED)
+        if trace is None:
+            for handler in self.handlersFor(direction, msg.msgType):
+                handler(self, msg)
+        else:
+            for handler in self.handlersFor(direction, msg.msgType):
+                name = getattr(handler, "__qualname__", str(handler))
+                trace.stamp(TraceStage.HANDLER_START, name)
+                handler(self, msg)
+                trace.stamp(TraceStage.HANDLER_END, name)
+
+    def enableTracing(self, capacity=1024):
+        self.tracer = MessageTracer(capacity)
+
+    def disableTracing(self):
+        self.tracer = None
+        self.currentTrace = None
+
+    def _traceInbound(self, msg, readTime, framedTime):
+        protocol = self.codec.protocol
+        trace = self.tracer.begin(MessageDirection.INBOUND, msg.msgType, msg.tags.get(protocol.fixtags.MsgSeqNum))
+        trace.stamp(TraceStage.READ, when=readTime)
+        trace.stamp(TraceStage.FRAMED, when=framedTime)
+        trace.stamp(TraceStage.DECODED)
+        return trace
 
-    def _sendHeartbeat(self):
+    def sendHeartbeat(self):
         self.sendMsg(self.codec.protocol.messages.Messages.heartbeat())
 
-    def _expectedHeartbeat(self, type, closure):
-        logging.warning("Expected heartbeat from peer %s" % (self.expectedHeartbeatRegistration ,))
+    def sendTestRequest(self):
         self.sendMsg(self.codec.protocol.messages.Messages.test_request())
 
     def registerLoggedIn(self):
-        self.heartbeatTimerRegistration = TimerEventRegistration(lambda type, closure: self._sendHeartbeat(), self.heartbeatPeriod)
-        self.engine.eventManager.registerHandler(self.heartbeatTimerRegistration)
-        # register timeout for 10% more than we expect
-        self.expectedHeartbeatRegistration = TimerEventRegistration(self._expectedHeartbeat, self.heartbeatPeriod * 1.10)
-        self.engine.eventManager.registerHandler(self.expectedHeartbeatRegistration)
-
+        # the engine tracks when we last sent & received, and sends heartbeats/test requests for us
+        if self.heartbeatSlot is None:
+            self.heartbeatSlot = self.engine.heartbeatManager.register(self, self.heartbeatPeriod)
+            if self.observer is not None:
+                self.observer.notifyLoggedIn(self)
 
     def registerLoggedOut(self):
-        if self.heartbeatTimerRegistration is not None:
-            self.engine.eventManager.unregisterHandler(self.heartbeatTimerRegistration)
-            self.heartbeatTimerRegistration = None
-        if self.expectedHeartbeatRegistration is not None:
-            self.engine.eventManager.unregisterHandler(self.expectedHeartbeatRegistration)
-            self.expectedHeartbeatRegistration = None
+        if self.heartbeatSlot is not None:
+            self.engine.heartbeatManager.unregister(self.heartbeatSlot)
+            self.heartbeatSlot = None
 
     def _handleResendRequest(self, msg):
         protocol = self.codec.protocol
-        responses = []
 
         beginSeqNo = msg[protocol.fixtags.BeginSeqNo]
         endSeqNo = msg[protocol.fixtags.EndSeqNo]
         if int(endSeqNo) == 0:
             endSeqNo = sys.maxsize
         logging.info("Received resent request from %s to %s", beginSeqNo, endSeqNo)
-        replayMsgs = self.engine.journaller.recoverMsgs(self.session, MessageDirection.OUTBOUND, beginSeqNo, endSeqNo)
-        gapFillBegin = int(beginSeqNo)
-        gapFillEnd = int(beginSeqNo)
-        for replayMsg in replayMsgs:
-            msgSeqNum = int(replayMsg[protocol.fixtags.MsgSeqNum])
-            if replayMsg[protocol.fixtags.MsgType] in protocol.msgtype.sessionMessageTypes:
-                gapFillEnd = msgSeqNum + 1
-            else:
-                if self.engine.shouldResendMessage(self.session, replayMsg):
-                    if gapFillBegin < gapFillEnd:
-                        # we need to send a gap fill message
-                        gapFillMsg = FIXMessage(protocol.msgtype.SEQUENCERESET)
-                        gapFillMsg.setField(protocol.fixtags.GapFillFlag, 'Y')
-                        gapFillMsg.setField(protocol.fixtags.MsgSeqNum, gapFillBegin)
-                        gapFillMsg.setField(protocol.fixtags.NewSeqNo, str(gapFillEnd))
-                        responses.append(gapFillMsg)
-
-                    # and then resent the replayMsg
-                    replayMsg.removeField(protocol.fixtags.BeginString)
-                    replayMsg.removeField(protocol.fixtags.BodyLength)
-                    replayMsg.removeField(protocol.fixtags.SendingTime)
-                    replayMsg.removeField(protocol.fixtags.SenderCompID)
-                    replayMsg.removeField(protocol.fixtags.TargetCompID)
-                    replayMsg.removeField(protocol.fixtags.CheckSum)
-                    replayMsg.setField(protocol.fixtags.PossDupFlag, "Y")
-                    responses.append(replayMsg)
-
-                    gapFillBegin = msgSeqNum + 1
-                else:
-                    gapFillEnd = msgSeqNum + 1
-                    responses.append(replayMsg)
-
-        if gapFillBegin < gapFillEnd:
-            # we need to send a gap fill message
-            gapFillMsg = FIXMessage(protocol.msgtype.SEQUENCERESET)
-            gapFillMsg.setField(protocol.fixtags.GapFillFlag, 'Y')
-            gapFillMsg.setField(protocol.fixtags.MsgSeqNum, gapFillBegin)
-            gapFillMsg.setField(protocol.fixtags.NewSeqNo, str(gapFillEnd))
-            responses.append(gapFillMsg)
-
-        return responses
+        if self.metrics is not None:
+            self.metrics.resendRequestServed(self)
+
+        # the replay is run from the event loop in batches, so we keep servicing
+        # heartbeats (and everything else) while a large resend is in progress
+        if self.resendReplay is not None:
+            self.resendReplay.cancel()
+        self.resendReplay = ResendReplay(self, beginSeqNo, endSeqNo, self.resendBatchSize, self.resendRate)
+        self.resendReplay.start()
 
     def handle_read(self, type, closure):
         protocol = self.codec.protocol
         try:
             msg = self.sock.recv(8192)
             if msg:
+                tracer = self.tracer
+                metrics = self.metrics
+                if tracer is not None:
+                    readTime = framedTime = time.perf_counter_ns()
                 self.msgBuffer = self.msgBuffer + msg
                 (decodedMsg, parsedLength) = self.codec.decode(self.msgBuffer)
                 self.msgBuffer = self.msgBuffer[parsedLength:]
                 while decodedMsg is not None and self.connectionState != ConnectionState.DISCONNECTED:
+                    if tracer is not None:
+                        self.currentTrace = self._traceInbound(decodedMsg, readTime, framedTime)
                     self.processMessage(decodedMsg)
+                    self.currentTrace = None
+                    if metrics is not None:
+                        # after processing, so a Logon is counted against its session
+                        metrics.messageReceived(self, decodedMsg.msgType, parsedLength)
+                    if tracer is not None:
+                        framedTime = time.perf_counter_ns()
                     (decodedMsg, parsedLength) = self.codec.decode(self.msgBuffer)
                     self.msgBuffer = self.msgBuffer[parsedLength:]
-                if self.expectedHeartbeatRegistration is not None:
-                    self.expectedHeartbeatRegistration.reset()
+                if self.heartbeatSlot is not None:
+                    self.engine.heartbeatManager.touchReceived(self.heartbeatSlot)
             else:
                 logging.debug("Connection has been closed")
                 self.disconnect()
@@ -168,6 +242,111 @@ class FIXConnectionHandler(object):
     def handleSessionMessage(self, msg):
         return -1
 
+    def _isGapFill(self, msg):
+        protocol = self.codec.protocol
+        return msg[protocol.fixtags.MsgType] == protocol.msgtype.SEQUENCERESET and protocol.fixtags.GapFillFlag in msg and msg[protocol.fixtags.GapFillFlag] == "Y"
+
+    def _requestFullResend(self, responses):
+        # fall back to asking for everything, anything we have queued will be resent
+        expectedSeqNo = self.session.nextExpectedMsgSeqNum
+        self.reorderBuffer.requestedAll()
+        self._cancelReorderTimer()
+        logging.info("Requesting resend of messages: %s to %s" % (expectedSeqNo, 0))
+        responses.append(self.codec.protocol.messages.Messages.resend_request(expectedSeqNo, 0))
+
+    def _queueOutOfSequence(self, msg, recvSeqNo, handled, responses):
+        if len(self.reorderBuffer) >= self.reorderBuffer.maxSize:
+            logging.warning("Inbound reorder buffer full, discarding message (MsgSeqNum: %s)" % (recvSeqNo, ))
+            self._requestFullResend(responses)
+            return
+
+        missing = self.reorderBuffer.add(recvSeqNo, msg, handled, self.session.nextExpectedMsgSeqNum)
+        if missing is not None:
+            # only ask for what we haven't received
+            logging.info("Requesting resend of messages: %s to %s" % missing)
+            responses.append(self.codec.protocol.messages.Messages.resend_request(missing[0], missing[1]))
+
+        if self.reorderTimerRegistration is None:
+            self.reorderTimerRegistration = TimerEventRegistration(lambda type, closure: self._reorderTimeout(), self.reorderBuffer.timeout)
+            self.engine.eventManager.registerHandler(self.reorderTimerRegistration)
+
+    def _cancelReorderTimer(self):
+        if self.reorderTimerRegistration is not None:
+            self.engine.eventManager.unregisterHandler(self.reorderTimerRegistration)
+            self.reorderTimerRegistration = None
+
+    def _reorderTimeout(self):
+        logging.warning("Sequence gap from %s not filled within %ss" % (self.session.nextExpectedMsgSeqNum, self.reorderBuffer.timeout))
+        responses = []
+        self._requestFullResend(responses)
+        for m in responses:
+            self.sendMsg(m)
+
+    def _deliverInboundMsg(self, msg, recvSeqNo, notify=True):
+        self.session.setRecvSeqNo(recvSeqNo)
+        if notify:
+            self._notifyMessageObservers(msg, MessageDirection.INBOUND, True, self.currentTrace)
+        else:
+            self.engine.journaller.persistMsg(msg, self.session, MessageDirection.INBOUND)
+
+    def _drainReorderBuffer(self):
+        # the trace is for the message which has just arrived, not the ones we've been holding
+        self.currentTrace = None
+        progress = False
+        while len(self.reorderBuffer) != 0 and self.connectionState != ConnectionState.DISCONNECTED:
+            # anything before our next expected seq no has been covered by a gap fill
+            self.reorderBuffer.discardBefore(self.session.nextExpectedMsgSeqNum)
+            entry = self.reorderBuffer.pop(self.session.nextExpectedMsgSeqNum)
+            if entry is None:
+                break
+            (msg, handled) = entry
+            recvSeqNo = self.session.nextExpectedMsgSeqNum
+            responses = []
+            if not handled:
+                # a GapFill we held back until the messages before it had arrived, its comp ids
+                # haven't been checked yet either
+                result = self.handleSessionMessage(msg)
+                if result is None:
+                    return
+                (recvSeqNo, responses) = result
+            # observers were told about a Logon when it arrived
+            self._deliverInboundMsg(msg, recvSeqNo, msg.msgType != self.codec.protocol.msgtype.LOGON)
+            for m in responses:
+                self.sendMsg(m)
+            progress = True
+
+        if len(self.reorderBuffer) == 0:
+            self.reorderBuffer.clear()
+            self._cancelReorderTimer()
+        elif progress and self.reorderTimerRegistration is not None:
+            self.reorderTimerRegistration.reset()
+
+    def _handleAdminMsg(self, msg, msgType, recvSeqNo):
+        protocol = self.codec.protocol
+        if self.connectionState != ConnectionState.LOGGED_IN or len(self.reorderBuffer) != 0 or int(recvSeqNo) != self.session.nextExpectedMsgSeqNum:
+            # anything unusual goes through the full path
+            return False
+
+        # compids are reversed here
+        if not self.session.validateCompIds(msg[protocol.fixtags.SenderCompID], msg[protocol.fixtags.TargetCompID]):
+            logging.error("Received message with unexpected comp ids")
+            self.disconnect()
+            return True
+
+        self.session.setRecvSeqNo(recvSeqNo)
+        self.engine.journaller.persistMarker(int(recvSeqNo), msgType, self.session, MessageDirection.INBOUND)
+        if self.currentTrace is not None:
+            self.currentTrace.stamp(TraceStage.PERSISTED)
+        for handler in self.handlersFor(MessageDirection.INBOUND, msgType):
+            handler(self, msg)
+
+        if msgType == protocol.msgtype.TESTREQUEST:
+            heartbeat = protocol.messages.Messages.heartbeat()
+            if protocol.fixtags.TestReqID in msg:
+                heartbeat.setField(protocol.fixtags.TestReqID, msg[protocol.fixtags.TestReqID])
+            self.sendMsg(heartbeat)
+        return True
+
     def processMessage(self, decodedMsg):
         protocol = self.codec.protocol
 
@@ -178,28 +357,40 @@ class FIXConnectionHandler(object):
             return
 
         msgType = decodedMsg[protocol.fixtags.MsgType]
+        recvSeqNo = decodedMsg[protocol.fixtags.MsgSeqNum]
 
         try:
+            if msgType in self.adminFastPathTypes and self._handleAdminMsg(decodedMsg, msgType, recvSeqNo):
+                return
+
+            if self.session is not None and msgType != protocol.msgtype.LOGON and int(recvSeqNo) < self.session.nextExpectedMsgSeqNum:
+                if protocol.fixtags.PossDupFlag in decodedMsg and decodedMsg[protocol.fixtags.PossDupFlag] == "Y":
+                    logging.debug("Ignoring duplicate message with PossDupFlag set (MsgSeqNum: %s)" % (recvSeqNo, ))
+                    return
+
             responses = []
-            if msgType in protocol.msgtype.sessionMessageTypes:
-                (recvSeqNo, responses) = self.handleSessionMessage(decodedMsg)
-            else:
-                recvSeqNo = decodedMsg[protocol.fixtags.MsgSeqNum]
+            handled = False
+            # a GapFill is only applied once everything before it has arrived
+            outOfSequenceGapFill = self.session is not None and self._isGapFill(decodedMsg) and self.session.validateRecvSeqNo(recvSeqNo)[0] is False
+            if msgType in protocol.msgtype.sessionMessageTypes and not outOfSequenceGapFill:
+                result = self.handleSessionMessage(decodedMsg)
+                if result is None:
+                    return
+                (recvSeqNo, responses) = result
+                handled = True
 
             # validate the seq number
             (seqNoState, lastKnownSeqNo) = self.session.validateRecvSeqNo(recvSeqNo)
 
             if seqNoState is False:
-                # We should send a resend request
-                logging.info("Requesting resend of messages: %s to %s" % (lastKnownSeqNo, 0))
-                responses.append(protocol.messages.Messages.resend_request(lastKnownSeqNo, 0))
+                # hold on to the message until the gap before it has been filled
+                self._queueOutOfSequence(decodedMsg, int(recvSeqNo), handled, responses)
                 # we still need to notify if we are processing Logon message
                 if msgType == protocol.msgtype.LOGON:
                     self._notifyMessageObservers(decodedMsg, MessageDirection.INBOUND, False)
             else:
-                self.session.setRecvSeqNo(recvSeqNo)
-                self._notifyMessageObservers(decodedMsg, MessageDirection.INBOUND)
-
+                self._deliverInboundMsg(decodedMsg, recvSeqNo)
+                self._drainReorderBuffer()
 
             for m in responses:
                 self.sendMsg(m)
@@ -210,41 +401,275 @@ class FIXConnectionHandler(object):
             logging.error(se)
             self.disconnect()
         except DuplicateSeqNoError:
-            try:
-                if decodedMsg[protocol.fixtags.PossDupFlag] == "Y":
-                    logging.debug("Received duplicate message with PossDupFlag set")
-            except KeyError:
-                pass
-            finally:
-                logging.error("Failed to process message with duplicate seq no (MsgSeqNum: %s) (and no PossDupFlag='Y') - disconnecting" % (recvSeqNo, ))
-                self.disconnect()
+            logging.error("Failed to process message with duplicate seq no (MsgSeqNum: %s) (and no PossDupFlag='Y') - disconnecting" % (recvSeqNo, ))
+            self.disconnect()
 
 
     def handle_close(self):
         if self.connectionState != ConnectionState.DISCONNECTED:
             logging.info("Client disconnected")
             self.registerLoggedOut()
+            if self.resendReplay is not None:
+                self.resendReplay.cancel()
+                self.resendReplay = None
+            self._cancelReorderTimer()
+            self.reorderBuffer.clear()
+            self.sendQueue.clear()
+            self.writeBuffer.clear()
+            self.transaction = None
+            self.engine.eventManager.unregisterHandler(self.writeEvent)
+            self.engine.eventManager.unregisterHandler(self.throttleTimer)
+            if self.metrics is not None:
+                self.metrics.removeConnection(self)
             self.sock.close()
             self.connectionState = ConnectionState.DISCONNECTED
             self.msgHandlers.clear()
+            self.msgDispatch = {}
+            if self.session is not None:
+                self.engine.releaseSession(self.session)
             if self.observer is not None:
                 self.observer.notifyDisconnect(self)
             self.engine.eventManager.unregisterHandler(self.socketEvent)
 
 
-    def sendMsg(self, msg):
+    def msgPriority(self, msgType):
+        if msgType in self.codec.protocol.msgtype.sessionMessageTypes:
+            return MessagePriority.SESSION
+        elif msgType in self.urgentMsgTypes:
+            return MessagePriority.URGENT
+        return MessagePriority.NORMAL
+
+    def isCongested(self):
+        return len(self.writeBuffer) != 0 or len(self.sendQueue) != 0
+
+    def _write(self, data):
+        if len(self.writeBuffer) != 0:
+            self.writeBuffer += data
+        else:
+            try:
+                sent = self.sock.send(data)
+            except BlockingIOError:
+                sent = 0
+            if sent < len(data):
+                self.writeBuffer += data[sent:]
+                # never twice, or unregistering it once leaves the socket being polled for writes
+                if not self.engine.eventManager.isRegistered(self.writeEvent):
+                    self.engine.eventManager.registerHandler(self.writeEvent)
+
+        if self.heartbeatSlot is not None:
+            self.engine.heartbeatManager.touchSent(self.heartbeatSlot)
+
+    def handle_write(self, type, closure):
+        try:
+            sent = self.sock.send(self.writeBuffer)
+        except BlockingIOError:
+            return
+        except ConnectionError as why:
+            logging.debug("Connection has been closed %s" % (why, ))
+            self.disconnect()
+            return
+        del self.writeBuffer[:sent]
+
+        if len(self.writeBuffer) == 0:
+            self.engine.eventManager.unregisterHandler(self.writeEvent)
+            self._drainSendQueue()
+
+    def setThrottle(self, rate, burst=None):
+        self.throttle = None if rate is None else TokenBucket(rate, burst)
+
+    def _throttleBuckets(self):
+        return [bucket for bucket in (self.throttle, self.engine.throttle) if bucket is not None]
+
+    def _acquireTokens(self, priority, count):
+        if priority in self.throttleBypass:
+            return True
+        buckets = self._throttleBuckets()
+        for bucket in buckets:
+            if not bucket.ready():
+                return False
+        for bucket in buckets:
+            bucket.consume(count)
+        return True
+
+    def _submit(self, action, priority, count=1):
+        if not self.isCongested() and self._acquireTokens(priority, count):
+            action()
+        else:
+            self.sendQueue.addResource(QueuedSend(action, priority, count), priority)
+            self.queuedMsgs += 1
+            if len(self.writeBuffer) == 0:
+                # we may be waiting on the throttle, which this message can bypass
+                self._drainSendQueue()
+
+    def _drainSendQueue(self):
+        while len(self.writeBuffer) == 0 and len(self.sendQueue) != 0 and self.connectionState != ConnectionState.DISCONNECTED:
+            queued = self.sendQueue.peek()
+            if not self._acquireTokens(queued.priority, queued.count):
+                # try again when the throttle allows
+                waitTime = max([bucket.waitTime() for bucket in self._throttleBuckets()])
+                self.throttleTimer.timeLeft = waitTime
+                if not self.engine.eventManager.isRegistered(self.throttleTimer):
+                    self.engine.eventManager.registerHandler(self.throttleTimer)
+                return
+            waited = time.monotonic() - queued.queuedTime
+            self.queueWaitTotal += waited
+            self.queueWaitMax = max(self.queueWaitMax, waited)
+            self.sendQueue.commitNext()
+
+    def _throttleTimeout(self):
+        self.engine.eventManager.unregisterHandler(self.throttleTimer)
+        self._drainSendQueue()
+
+    def sendQueueStats(self):
+        depth = dict([(priority.name, self.sendQueue.depth(priority)) for priority in MessagePriority])
+        return {"depth": len(self.sendQueue),
+                "depthByPriority": depth,
+                "queued": self.queuedMsgs,
+                "waitTotal": self.queueWaitTotal,
+                "waitMax": self.queueWaitMax}
+
+    def sendEncodedMsg(self, encodedMsg, priority=MessagePriority.NORMAL):
+        # write an already encoded message, nothing is journaled
         if self.connectionState != ConnectionState.CONNECTED and self.connectionState != ConnectionState.LOGGED_IN:
             raise FIXException(FIXException.FIXExceptionReason.NOT_CONNECTED)
 
-        encodedMsg = self.codec.encode(msg, self.session).encode('utf-8')
-        self.sock.send(encodedMsg)
-        if self.heartbeatTimerRegistration is not None:
-            self.heartbeatTimerRegistration.reset()
+        self._submit(lambda: self._writeEncoded(encodedMsg), priority)
+
+    def _writeEncoded(self, encodedMsg):
+        self._write(encodedMsg)
+        if self.metrics is not None:
+            msgType = encodedMsg.split(b'\x0135=', 1)[1].split(b'\x01', 1)[0].decode('utf-8')
+            self.metrics.messageSent(self, msgType, len(encodedMsg))
+
+    def beginTransaction(self):
+        # messages sent until commitTransaction are journaled together and written with a single send
+        if self.transaction is not None:
+            raise RuntimeError("A transaction is already in progress")
+        self.transaction = Transaction()
+        self.transactionMsgs = []
+        self.transactionPriority = MessagePriority.BULK
+
+    def commitTransaction(self):
+        if self.transaction is None:
+            raise RuntimeError("No transaction in progress")
+        transaction = self.transaction
+        msgs = self.transactionMsgs
+        self.transaction = None
+        if not transaction.resources:
+            return
+
+        self._submit(lambda: self._commitTransaction(transaction, msgs), self.transactionPriority, len(transaction.resources))
+
+    def abortTransaction(self):
+        # nothing has been encoded yet, so there are no seq nos to give back
+        self.transaction = None
+        self.transactionMsgs = None
 
+    def _commitTransaction(self, transaction, msgs):
+        sndSeqNum = self.session.sndSeqNum
+        journaller = self.engine.journaller
+        journaller.beginBatch()
+        try:
+            transaction.commit()
+            journaller.commitBatch()
+        except Exception:
+            journaller.rollbackBatch()
+            self.session.sndSeqNum = sndSeqNum
+            raise
+
+        self._write(b''.join([encodedMsg for (encodedMsg, decodedMsg) in msgs]))
+        for (encodedMsg, decodedMsg) in msgs:
+            self._msgSent(encodedMsg, decodedMsg, False)
+
+    def _journalMsg(self, msg, msgs):
+        (encodedMsg, decodedMsg) = self._encodeMsg(msg)
+        if decodedMsg.msgType in self.adminFastPathTypes:
+            self.engine.journaller.persistMarker(self.session.sndSeqNum, decodedMsg.msgType, self.session, MessageDirection.OUTBOUND)
+        elif not self._isPossDup(decodedMsg):
+            self.engine.journaller.persistMsg(decodedMsg, self.session, MessageDirection.OUTBOUND)
+        msgs.append((encodedMsg, decodedMsg))
+
+    def sendMsg(self, msg, priority=None):
+        if self.connectionState != ConnectionState.CONNECTED and self.connectionState != ConnectionState.LOGGED_IN:
+            raise FIXException(FIXException.FIXExceptionReason.NOT_CONNECTED)
+
+        if priority is None:
+            priority = self.msgPriority(msg.msgType)
+
+        if self.transaction is not None:
+            msgs = self.transactionMsgs
+            self.transaction.addResource(TransactionResource(lambda: self._journalMsg(msg, msgs)))
+            self.transactionPriority = max(self.transactionPriority, priority, key=lambda x: x.value)
+        else:
+            # messages are only encoded (and so given a seq no) as they are written, so
+            # a message which jumps the queue still goes out in sequence
+            self._submit(lambda: self._sendMsg(msg), priority)
+
+    def _encodeMsg(self, msg):
+        encodedMsg = self.codec.encode(msg, self.session).encode('utf-8')
         decodedMsg, junk = self.codec.decode(encodedMsg)
+        return (encodedMsg, decodedMsg)
 
+    def _isPossDup(self, msg):
+        protocol = self.codec.protocol
+        return protocol.fixtags.PossDupFlag in msg and msg[protocol.fixtags.PossDupFlag] == "Y"
+
+    def _sendAdminMsg(self, msg):
+        trace = None if self.tracer is None else self.tracer.begin(MessageDirection.OUTBOUND, msg.msgType)
+        if trace is not None:
+            trace.stamp(TraceStage.SENDING)
+        encodedMsg = self.codec.encode(msg, self.session).encode('utf-8')
+        if trace is not None:
+            trace.seqNo = str(self.session.sndSeqNum)
+            trace.stamp(TraceStage.ENCODED)
+        self._write(encodedMsg)
+        if trace is not None:
+            trace.stamp(TraceStage.SENT)
+        if self.metrics is not None:
+            self.metrics.messageSent(self, msg.msgType, len(encodedMsg))
+
+        seqNo = self.session.sndSeqNum
+        self.session.outboundCache.add(seqNo, msg.msgType, encodedMsg)
         try:
-            self._notifyMessageObservers(decodedMsg, MessageDirection.OUTBOUND)
+            self.engine.journaller.persistMarker(seqNo, msg.msgType, self.session, MessageDirection.OUTBOUND)
+            if trace is not None:
+                trace.stamp(TraceStage.PERSISTED)
+        except DuplicateSeqNoError:
+            logging.error("We have sent a message with a duplicate seq no, failed to persist it (MsgSeqNum: %s)" % (seqNo, ))
+
+        handlers = self.handlersFor(MessageDirection.OUTBOUND, msg.msgType)
+        if handlers:
+            decodedMsg, junk = self.codec.decode(encodedMsg)
+            for handler in handlers:
+                handler(self, decodedMsg)
+
+    def _sendMsg(self, msg):
+        if msg.msgType in self.adminFastPathTypes:
+            self._sendAdminMsg(msg)
+            return
+
+        trace = None if self.tracer is None else self.tracer.begin(MessageDirection.OUTBOUND, msg.msgType)
+        if trace is not None:
+            trace.stamp(TraceStage.SENDING)
+        (encodedMsg, decodedMsg) = self._encodeMsg(msg)
+        if trace is not None:
+            trace.seqNo = decodedMsg[self.codec.protocol.fixtags.MsgSeqNum]
+            trace.stamp(TraceStage.ENCODED)
+        self._write(encodedMsg)
+        if trace is not None:
+            trace.stamp(TraceStage.SENT)
+        self._msgSent(encodedMsg, decodedMsg, True, trace)
+
+    def _msgSent(self, encodedMsg, decodedMsg, persistMessage, trace=None):
+        # a PossDup is a resend of a message we have already journaled and cached
+        possDup = self._isPossDup(decodedMsg)
+        if self.metrics is not None:
+            self.metrics.messageSent(self, decodedMsg.msgType, len(encodedMsg))
+        if not possDup:
+            self.session.outboundCache.add(int(decodedMsg[self.codec.protocol.fixtags.MsgSeqNum]), decodedMsg.msgType, encodedMsg)
+
+        try:
+            self._notifyMessageObservers(decodedMsg, MessageDirection.OUTBOUND, persistMessage and not possDup, trace)
         except DuplicateSeqNoError:
             logging.error("We have sent a message with a duplicate seq no, failed to persist it (MsgSeqNum: %s)" % (decodedMsg[self.codec.protocol.fixtags.MsgSeqNum]))
 
@@ -252,7 +677,8 @@ class FIXConnectionHandler(object):
 class FIXEndPoint(object):
     def __init__(self, engine, protocol):
         self.engine = engine
-        self.protocol = importlib.import_module(protocol)
+        # a protocol module, or its name
+        self.protocol = protocol if isinstance(protocol, types.ModuleType) else importlib.import_module(protocol)
 
         self.connections = []
         self.connectionHandlers = []
@@ -274,6 +700,10 @@ class FIXEndPoint(object):
             if s == (handler, filter):
                 self.connectionHandlers.remove(s)
 
+    def notifyLoggedIn(self, connection):
+        for handler in filter(lambda x: x[1] == ConnectionState.LOGGED_IN, self.connectionHandlers):
+                handler[0](connection)
+
     def notifyDisconnect(self, connection):
         self.connections.remove(connection)
         for handler in filter(lambda x: x[1] == ConnectionState.DISCONNECTED, self.connectionHandlers):
@@ -0,0 +1,104 @@
+import marshal
+import os
+from types import MappingProxyType
+try:
+    # hashlib's own, without hashlib (and OpenSSL) having to be imported
+    from _blake2 import blake2b
+except ImportError:
+    from hashlib import blake2b
+
+# bump when the layout of the compiled tables changes
+FORMAT_VERSION = 2
+
+class ProtocolDictionary(object):
+    # The tables for a FIX version, loaded once and shared (read only) by every codec and endpoint:
+    #   tags: name -> tag, tagNames: tag -> name
+    #   msgTypes: name -> value, msgTypeNames: value -> name
+    #   repeatingGroups: NoXXX tag -> (member tags, in order)
+    #   fieldTypes: tag -> type (e.g. "PRICE"), where the dictionary has them
+    #   messages: msgType -> {"required": (tags), "groups": {NoXXX tag: (member tags)}}, where the dictionary has them
+    def __init__(self, tables, contentHash):
+        (version, beginstring, tags, tagNames, msgTypes, msgTypeNames, sessionMessageTypes, repeatingGroups, fieldTypes, messages) = tables
+        self.contentHash = contentHash
+        self.beginstring = beginstring
+        self.tags = MappingProxyType(tags)
+        self.tagNames = MappingProxyType(tagNames)
+        self.msgTypes = MappingProxyType(msgTypes)
+        self.msgTypeNames = MappingProxyType(msgTypeNames)
+        self.sessionMessageTypes = frozenset(sessionMessageTypes)
+        self.repeatingGroups = MappingProxyType(repeatingGroups)
+        self.fieldTypes = MappingProxyType(fieldTypes)
+        self.messages = MappingProxyType(dict([(msgType, MappingProxyType({"required": layout["required"], "groups": MappingProxyType(layout["groups"])}))
+                                              for (msgType, layout) in messages.items()]))
+
+def compileTables(source):
+    # the JSON dictionary (as loaded) -> plain dicts/tuples, which marshal can store
+    tags = {}
+    msgTypes = {}
+    for (name, value) in source["tags"].items():
+        if isinstance(value, dict):
+            tags[name] = value["tag"]
+            if name == "MsgType":
+                msgTypes = dict(value["values"])
+        else:
+            tags[name] = value
+
+    repeatingGroups = dict([(tags[name], tuple([tags[member] for member in members])) for (name, members) in source.get("repeatingGroupIdentifiers", {}).items()])
+    sessionMessageTypes = tuple([msgTypes[name] for name in source.get("sessionMessageTypes", ())])
+    fieldTypes = dict([(tags[name], fieldType) for (name, fieldType) in source.get("fieldTypes", {}).items()])
+    messages = {}
+    for (name, layout) in source.get("messages", {}).items():
+        groups = dict([(tags[group], tuple([tags[member] for member in members])) for (group, members) in layout.get("groups", {}).items()])
+        messages[msgTypes[name]] = {"required": tuple([tags[field] for field in layout.get("required", ())]), "groups": groups}
+    # the reverse maps are built here too, so loading is just unmarshalling
+    tagNames = dict([(tag, name) for (name, tag) in sorted(tags.items())])
+    msgTypeNames = dict([(value, name) for (name, value) in sorted(msgTypes.items())])
+    return (FORMAT_VERSION, source["beginstring"], tags, tagNames, msgTypes, msgTypeNames, sessionMessageTypes, repeatingGroups, fieldTypes, messages)
+
+def _cacheFilename(path, contentHash):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, "__pycache__", "%s.%s.dict" % (os.path.splitext(filename)[0], contentHash))
+
+def _readCache(filename):
+    try:
+        with open(filename, "rb") as f:
+            tables = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return tables if isinstance(tables, tuple) and len(tables) > 0 and tables[0] == FORMAT_VERSION else None
+
+def _writeCache(filename, tables):
+    # written to a temporary file first, so a concurrent reader never sees half of it
+    temporary = "%s.%s" % (filename, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(temporary, "wb") as f:
+            marshal.dump(tables, f)
+        os.replace(temporary, filename)
+    except OSError:
+        # e.g. installed somewhere read only, we just compile it every time
+        pass
+
+_dictionaries = {}
+
+def loadDictionary(path):
+    # The compiled tables are cached next to the dictionary (in __pycache__) keyed by a hash of its
+    # content, so they are rebuilt whenever it changes. Every caller in a process shares one instance.
+    with open(path, "rb") as f:
+        content = f.read()
+    contentHash = blake2b(content, digest_size=16).hexdigest()
+    try:
+        return _dictionaries[contentHash]
+    except KeyError:
+        pass
+
+    filename = _cacheFilename(path, contentHash)
+    tables = _readCache(filename)
+    if tables is None:
+        # json is only imported (it's slow to) when we have to compile
+        import json
+        tables = compileTables(json.loads(content.decode('utf-8')))
+        _writeCache(filename, tables)
+
+    dictionary = _dictionaries[contentHash] = ProtocolDictionary(tables, contentHash)
+    return dictionary
@@ -1,15 +1,38 @@
 from pyfix.event import EventManager
-from pyfix.journaler import Journaler
+from pyfix.heartbeat import HeartbeatManager
+from pyfix.journaler import Journaler, DEFAULT_INDEXED_TAGS
+from pyfix.metrics import EngineMetrics, MetricsServer
+from pyfix.session import FIXSessionRegistry
+from pyfix.throttle import TokenBucket
 
 class FIXEngine(object):
-    def __init__(self, journalfile = None):
+    def __init__(self, journalfile = None, indexedTags = DEFAULT_INDEXED_TAGS, maxDormantSessions = None):
         self.eventManager = EventManager()
-        self.journaller = Journaler(journalfile)
-        self.sessions = {}
+        self.heartbeatManager = HeartbeatManager(self.eventManager)
+        self.journaller = Journaler(journalfile, indexedTags)
 
-        # We load all sessions from the journal and add to our list
-        for session in self.journaller.sessions():
-            self.sessions[session.key] = session
+        # sessions are loaded from the journal the first time they are used
+        self.sessions = FIXSessionRegistry(self.journaller, maxDormantSessions)
+
+        # a rate limit shared by every connection, on top of any per connection throttle
+        self.throttle = None
+        # when set, every new connection keeps the timings of its last 'traceCapacity' messages
+        self.traceCapacity = None
+        # see enableMetrics
+        self.metrics = None
+        self.metricsServer = None
+
+    def enableMetrics(self, port = None, path = None, host = "127.0.0.1", registry = None):
+        # only connections created after this are counted, the endpoint is optional (port or unix socket path)
+        if self.metrics is None:
+            self.metrics = EngineMetrics(self, registry)
+        if (port is not None or path is not None) and self.metricsServer is None:
+            self.metricsServer = MetricsServer(self, self.metrics.registry, host, port, path)
+            self.metricsServer.start()
+        return self.metrics
+
+    def setThrottle(self, rate, burst = None):
+        self.throttle = None if rate is None else TokenBucket(rate, burst)
 
     def validateSession(self, targetCompId, senderCompId):
         # this make any session we receive valid
@@ -21,23 +44,16 @@ class FIXEngine(object):
 
     def createSession(self, targetCompId, senderCompId):
         if self.findSessionByCompIds(targetCompId, senderCompId) is None:
-            session = self.journaller.createSession(targetCompId, senderCompId)
-            self.sessions[session.key] = session
+            session = self.sessions.create(targetCompId, senderCompId)
         else:
             raise RuntimeError("Failed to add session with duplicate key")
         return session
 
     def getSession(self, identifier):
-        try:
-            return self.sessions[identifier]
-        except KeyError:
-            return None
+        return self.sessions.get(identifier)
 
     def findSessionByCompIds(self, targetCompId, senderCompId):
-        sessions = [x for x in self.sessions.values() if x.targetCompId == targetCompId and x.senderCompId == senderCompId]
-        if sessions is not None and len(sessions) != 0:
-            return sessions[0]
-        return None
+        return self.sessions.findByCompIds(targetCompId, senderCompId)
 
     def getOrCreateSessionFromCompIds(self, targetCompId, senderCompId):
         session = self.findSessionByCompIds(targetCompId, senderCompId)
@@ -46,3 +62,10 @@ class FIXEngine(object):
                 session = self.createSession(targetCompId, senderCompId)
 
         return session
+
+    def acquireSession(self, session):
+        # sessions in use by a connection are never evicted
+        self.sessions.acquire(session)
+
+    def releaseSession(self, session):
+        self.sessions.release(session)
@@ -107,6 +107,10 @@ class EventManager(object):
     def __init__(self):
         self.eventLoop = SelectEventLoop()
         self.handlers = []
+        # the type of callback being run (None while we wait for events), and an optional
+        # pyfix.profiler.LoopProfiler which is told about each iteration of the loop
+        self.dispatching = None
+        self.profiler = None
 
     def waitForEvent(self):
         self.waitForEventWithTimeout(None)
@@ -115,9 +119,14 @@ class EventManager(object):
         if not self.handlers:
             raise RuntimeError("Failed to start event loop without any handlers")
 
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.beginIteration()
         timeout = self._setTimeout(timeout)
         events = self.eventLoop.run(timeout)
         self._serviceEvents(events)
+        if profiler is not None:
+            profiler.endIteration()
 
     def _setTimeout(self, timeout):
         nowTime = datetime.datetime.utcnow()
@@ -136,20 +145,27 @@ class EventManager(object):
 
     def _serviceEvents(self, events):
         nowTime = datetime.datetime.utcnow()
-        for handler in self.handlers:
+        # callbacks are free to (un)register handlers, so we iterate over a copy
+        for handler in list(self.handlers):
+            if not self.isRegistered(handler):
+                continue
             if isinstance(handler, FileDescriptorEventRegistration):
                 for event in events:
                     if event.fd == handler.fd:
                         type = handler.eventType.value & event.filter.value
-                        if type != EventType.NONE:
+                        if type != EventType.NONE.value:
+                            self.dispatching = handler.eventType
                             handler.callback(type, handler.closure)
+                            self.dispatching = None
             elif isinstance(handler, TimerEventRegistration):
                 if handler.timeoutState == TimerEventRegistration.TimeoutState.PROGRESS:
                     elapsedTime = nowTime - handler.lastTime
                     handler.timeLeft -= elapsedTime.total_seconds()
                     if handler.timeLeft <= 0.0:
                         handler.timeLeft = handler.timeout
+                        self.dispatching = EventType.TIMEOUT
                         handler.callback(EventType.TIMEOUT, handler.closure)
+                        self.dispatching = None
 
 
     def registerHandler(self, handler):
@@ -0,0 +1,191 @@
+from array import array
+import json
+import logging
+import os
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# column type -> (numpy dtype, array typecode), everything on disk is little endian
+_COLUMN_TYPES = {
+    "int64": ("<i8", "q"),
+    "int8": ("<i1", "b"),
+    "int32": ("<i4", "i"),
+    "float64": ("<f8", "d"),
+}
+
+_NAN = float("nan")
+
+def _writeArray(f, columnType, values):
+    dtype, typecode = _COLUMN_TYPES[columnType]
+    if numpy is not None:
+        numpy.asarray(values, dtype=dtype).tofile(f)
+    else:
+        a = array(typecode, values)
+        if sys.byteorder == "big":
+            a.byteswap()
+        a.tofile(f)
+
+def _readArray(filename, columnType):
+    dtype, typecode = _COLUMN_TYPES[columnType]
+    if numpy is not None:
+        return numpy.fromfile(filename, dtype=dtype)
+    a = array(typecode)
+    with open(filename, "rb") as f:
+        a.frombytes(f.read())
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+def _toFloat(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return _NAN
+
+class _ColumnarWriter(object):
+    def __init__(self, path, columns):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self.files = {}
+        self.dictionaries = {}
+        for (name, columnType) in columns:
+            self.files[name] = open(os.path.join(path, name + ".bin"), "wb")
+            if columnType == "string":
+                self.dictionaries[name] = {}
+
+    def _encode(self, dictionary, value):
+        if value is None:
+            return -1
+        try:
+            return dictionary[value]
+        except KeyError:
+            code = dictionary[value] = len(dictionary)
+            return code
+
+    def write(self, chunk):
+        for (name, columnType) in self.columns:
+            values = chunk[name]
+            if columnType == "string":
+                dictionary = self.dictionaries[name]
+                _writeArray(self.files[name], "int32", [self._encode(dictionary, value) for value in values])
+            else:
+                _writeArray(self.files[name], columnType, values)
+        self.rows += len(chunk["seqNo"])
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        manifest = {"rows": self.rows, "columns": []}
+        for (name, columnType) in self.columns:
+            column = {"name": name, "type": columnType}
+            if columnType == "string":
+                dictionary = self.dictionaries[name]
+                column["dictionary"] = sorted(dictionary, key=dictionary.get)
+            manifest["columns"].append(column)
+        with open(os.path.join(self.path, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+class _ParquetWriter(object):
+    def __init__(self, path, columns):
+        if pyarrow is None:
+            raise RuntimeError("Parquet export requires pyarrow")
+        self.columns = columns
+        self.rows = 0
+        fields = []
+        for (name, columnType) in columns:
+            fields.append(pyarrow.field(name, self._arrowType(columnType)))
+        self.schema = pyarrow.schema(fields)
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    @staticmethod
+    def _arrowType(columnType):
+        if columnType == "string":
+            return pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        return {"int64": pyarrow.int64(), "int8": pyarrow.int8(), "int32": pyarrow.int32(), "float64": pyarrow.float64()}[columnType]
+
+    def write(self, chunk):
+        arrays = []
+        for (name, columnType) in self.columns:
+            if columnType == "string":
+                arrays.append(pyarrow.array(chunk[name], type=pyarrow.string()).dictionary_encode())
+            else:
+                arrays.append(pyarrow.array(chunk[name], type=self._arrowType(columnType)))
+        self.writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        self.rows += len(chunk["seqNo"])
+
+    def close(self):
+        self.writer.close()
+
+class JournalExporter(object):
+    def __init__(self, journal, tags, numericTags=(), chunkSize=10000):
+        self.journal = journal
+        self.tags = list(tags)
+        self.numericTags = frozenset(numericTags)
+        self.chunkSize = chunkSize
+
+        self.columns = [("seqNo", "int64"), ("direction", "int8"), ("session", "string"), ("msgType", "string"), ("timestamp", "float64")]
+        for tag in self.tags:
+            self.columns.append((tag, "float64" if tag in self.numericTags else "string"))
+
+    def _chunkColumns(self, msgs):
+        chunk = {
+            "seqNo": [int(m[0]) for m in msgs],
+            "direction": [m[2] for m in msgs],
+            "session": [str(m[3]) for m in msgs],
+            "msgType": [m[1].msgType for m in msgs],
+            "timestamp": [_NAN if m[4] is None else m[4] for m in msgs],
+        }
+        for tag in self.tags:
+            # repeating groups aren't flattened, they are exported as missing
+            values = [m[1].tags.get(tag) for m in msgs]
+            values = [None if type(v) not in (str, int, float) else v for v in values]
+            if tag in self.numericTags:
+                chunk[tag] = [_toFloat(v) for v in values]
+            else:
+                chunk[tag] = [None if v is None else str(v) for v in values]
+        return chunk
+
+    def _export(self, writer, filters):
+        try:
+            for msgs in self.journal.iterMsgs(self.chunkSize, **filters):
+                writer.write(self._chunkColumns(msgs))
+                logging.debug("Exported %s messages" % (writer.rows, ))
+        finally:
+            writer.close()
+        return writer.rows
+
+    def exportColumnar(self, path, **filters):
+        return self._export(_ColumnarWriter(path, self.columns), filters)
+
+    def exportParquet(self, path, **filters):
+        return self._export(_ParquetWriter(path, self.columns), filters)
+
+def loadColumnar(path, decodeStrings=True):
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    columns = {}
+    for column in manifest["columns"]:
+        filename = os.path.join(path, column["name"] + ".bin")
+        if column["type"] == "string":
+            codes = _readArray(filename, "int32")
+            if decodeStrings:
+                dictionary = column["dictionary"]
+                columns[column["name"]] = [None if code == -1 else dictionary[code] for code in codes]
+            else:
+                columns[column["name"]] = codes
+        else:
+            columns[column["name"]] = _readArray(filename, column["type"])
+    return columns
@@ -0,0 +1,117 @@
+from array import array
+import logging
+import time
+from pyfix.event import TimerEventRegistration
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class HeartbeatManager(object):
+    def __init__(self, eventManager, resolution=1.0):
+        self.eventManager = eventManager
+        self.connections = []
+        self.freeSlots = []
+
+        # one entry per slot, the monotonic time of the last message sent / received, the
+        # heartbeat interval (0 for an unused slot) and when we sent a TestRequest (0 for none)
+        self.lastSent = array('d')
+        self.lastReceived = array('d')
+        self.heartbeatPeriod = array('d')
+        self.testRequestSent = array('d')
+
+        self.timer = TimerEventRegistration(lambda type, closure: self.tick(), resolution)
+
+    def __len__(self):
+        return len(self.connections) - len(self.freeSlots)
+
+    def register(self, connection, heartbeatPeriod):
+        now = time.monotonic()
+        if self.freeSlots:
+            slot = self.freeSlots.pop()
+            self.connections[slot] = connection
+            self.lastSent[slot] = now
+            self.lastReceived[slot] = now
+            self.heartbeatPeriod[slot] = heartbeatPeriod
+            self.testRequestSent[slot] = 0.0
+        else:
+            slot = len(self.connections)
+            self.connections.append(connection)
+            self.lastSent.append(now)
+            self.lastReceived.append(now)
+            self.heartbeatPeriod.append(heartbeatPeriod)
+            self.testRequestSent.append(0.0)
+
+        if not self.eventManager.isRegistered(self.timer):
+            self.eventManager.registerHandler(self.timer)
+        return slot
+
+    def unregister(self, slot):
+        self.connections[slot] = None
+        self.heartbeatPeriod[slot] = 0.0
+        self.freeSlots.append(slot)
+        if len(self) == 0:
+            self.eventManager.unregisterHandler(self.timer)
+
+    def touchSent(self, slot):
+        self.lastSent[slot] = time.monotonic()
+
+    def touchReceived(self, slot):
+        self.lastReceived[slot] = time.monotonic()
+        self.testRequestSent[slot] = 0.0
+
+    def _dueSlots(self, now):
+        # returns the slots which need a (heartbeat, test request, disconnect)
+        if numpy is not None:
+            period = numpy.frombuffer(self.heartbeatPeriod)
+            lastReceived = numpy.frombuffer(self.lastReceived)
+            testRequestSent = numpy.frombuffer(self.testRequestSent)
+            active = period > 0.0
+            idle = now - lastReceived
+            heartbeats = numpy.nonzero(active & (now - numpy.frombuffer(self.lastSent) >= period))[0]
+            # we allow the peer 10% more than the interval before we ask for a heartbeat
+            testRequests = numpy.nonzero(active & (testRequestSent == 0.0) & (idle >= period * 1.10))[0]
+            timeouts = numpy.nonzero(active & (testRequestSent != 0.0) & (now - testRequestSent >= period))[0]
+            return (heartbeats.tolist(), testRequests.tolist(), timeouts.tolist())
+
+        heartbeats = []
+        testRequests = []
+        timeouts = []
+        for slot in range(0, len(self.connections)):
+            period = self.heartbeatPeriod[slot]
+            if period == 0.0:
+                continue
+            if now - self.lastSent[slot] >= period:
+                heartbeats.append(slot)
+            if self.testRequestSent[slot] == 0.0:
+                if now - self.lastReceived[slot] >= period * 1.10:
+                    testRequests.append(slot)
+            elif now - self.testRequestSent[slot] >= period:
+                timeouts.append(slot)
+        return (heartbeats, testRequests, timeouts)
+
+    def tick(self):
+        now = time.monotonic()
+        (heartbeats, testRequests, timeouts) = self._dueSlots(now)
+
+        for slot in timeouts:
+            connection = self.connections[slot]
+            if connection is not None:
+                logging.warning("No response to TestRequest from peer %s, disconnecting" % (connection.address(), ))
+                connection.disconnect()
+
+        for slot in testRequests:
+            connection = self.connections[slot]
+            if connection is not None:
+                logging.warning("Expected heartbeat from peer %s" % (connection.address(), ))
+                self.testRequestSent[slot] = now
+                connection.heartbeatMisses += 1
+                connection.sendTestRequest()
+
+        # a TestRequest serves as our heartbeat as well
+        handled = set(testRequests + timeouts)
+        for slot in heartbeats:
+            connection = self.connections[slot]
+            if connection is not None and slot not in handled:
+                connection.sendHeartbeat()
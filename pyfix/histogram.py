@@ -0,0 +1,84 @@
+from array import array
+
+class Histogram(object):
+    # An HDR style histogram of integer values (e.g. latencies in ns). Values are recorded in
+    # log-linear buckets, so every value is tracked to 'significantFigures' digits of precision
+    # with a fixed, small amount of memory, and recording is just an index calculation.
+    def __init__(self, significantFigures=3):
+        largest = 2 * 10 ** significantFigures
+        self.subBucketBits = (largest - 1).bit_length()
+        self.subBucketCount = 1 << self.subBucketBits
+        self.subBucketHalfCount = self.subBucketCount >> 1
+        self.counts = array('Q')
+        self.reset()
+
+    def reset(self):
+        self.counts = array('Q', [0]) * len(self.counts)
+        self.totalCount = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        bucket = max(0, value.bit_length() - self.subBucketBits)
+        subBucket = value >> bucket
+        if bucket == 0:
+            return subBucket
+        return self.subBucketCount + (bucket - 1) * self.subBucketHalfCount + (subBucket - self.subBucketHalfCount)
+
+    def _valueRange(self, index):
+        # (lowest, highest) value which is recorded at this index
+        if index < self.subBucketCount:
+            return (index, index)
+        bucket = (index - self.subBucketCount) // self.subBucketHalfCount + 1
+        subBucket = (index - self.subBucketCount) % self.subBucketHalfCount + self.subBucketHalfCount
+        return (subBucket << bucket, ((subBucket + 1) << bucket) - 1)
+
+    def record(self, value, count=1):
+        value = int(value)
+        if value < 0:
+            raise ValueError("Histogram values must be positive")
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend(array('Q', [0]) * (index + 1 - len(self.counts)))
+        self.counts[index] += count
+        self.totalCount += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.subBucketBits != self.subBucketBits:
+            raise ValueError("Can only merge histograms with the same precision")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend(array('Q', [0]) * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.totalCount += other.totalCount
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def mean(self):
+        return 0.0 if self.totalCount == 0 else self.total / float(self.totalCount)
+
+    def valueAtPercentile(self, percentile):
+        if self.totalCount == 0:
+            return 0
+        target = max(1, int(round(percentile / 100.0 * self.totalCount)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._valueRange(index)[1], self.max)
+        return self.max
+
+    def percentiles(self, percentiles=(50.0, 90.0, 99.0, 99.9, 99.99)):
+        return [(p, self.valueAtPercentile(p)) for p in percentiles]
+
+    def buckets(self):
+        # (highest value, count) of every bucket which has a value recorded
+        return [(self._valueRange(index)[1], count) for index, count in enumerate(self.counts) if count]
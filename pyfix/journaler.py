@@ -1,26 +1,42 @@
 import sqlite3
 import pickle
-from pyfix.message import MessageDirection
+import time
+from pyfix.message import FIXMessage, MessageDirection
 from pyfix.session import FIXSession
 
 
 class DuplicateSeqNoError(Exception):
     pass
 
+# ClOrdID, OrigClOrdID, OrderID & ExecID
+DEFAULT_INDEXED_TAGS = ("11", "41", "37", "17")
+
 class Journaler(object):
-    def __init__(self, filename = None):
+    def __init__(self, filename = None, indexedTags = DEFAULT_INDEXED_TAGS):
         if filename is None:
             self.conn = sqlite3.connect(":memory:")
         else:
             self.conn = sqlite3.connect(filename)
 
+        self.filename = filename
+        self.inBatch = False
+        # called with the duration of each message commit, e.g. by EngineMetrics
+        self.commitObserver = None
+        # returns the archive segments (oldest first) messages may have been rolled over into, set by JournalRetention
+        self.archiveSegments = None
+        self.indexedTags = frozenset(indexedTags)
         self.cursor = self.conn.cursor()
-        self.cursor.execute("CREATE TABLE IF NOT EXISTS message("
-                               "seqNo INTEGER NOT NULL,"
-                               "session TEXT NOT NULL,"
-                               "direction INTEGER NOT NULL,"
-                               "msg TEXT,"
-                               "PRIMARY KEY (seqNo, session, direction))")
+        # only takes effect on a new store, but allows us to compact without a full VACUUM
+        self.cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._createMessageTable("main")
+
+        # stores created by older versions don't have the retention columns
+        columns = [column[1] for column in self.cursor.execute("PRAGMA table_info(message)")]
+        if "msgType" not in columns:
+            self.cursor.execute("ALTER TABLE message ADD COLUMN msgType TEXT")
+        if "timestamp" not in columns:
+            self.cursor.execute("ALTER TABLE message ADD COLUMN timestamp REAL")
+        self._createMessageIndexes("main")
 
         self.cursor.execute("CREATE TABLE IF NOT EXISTS session("
                                "sessionId INTEGER PRIMARY KEY AUTOINCREMENT,"
@@ -29,18 +45,74 @@ class Journaler(object):
                                "outboundSeqNo INTEGER DEFAULT 0,"
                                "inboundSeqNo INTEGER DEFAULT 0,"
                                "UNIQUE (targetCompId, senderCompId))")
+        # the last seq no rolled over into an archive segment, for each session & direction
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS archived("
+                               "session TEXT NOT NULL,"
+                               "direction INTEGER NOT NULL,"
+                               "lastSeqNo INTEGER NOT NULL,"
+                               "PRIMARY KEY (session, direction))")
+
+    def _createMessageTable(self, schema):
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS %s.message("
+                               "seqNo INTEGER NOT NULL,"
+                               "session TEXT NOT NULL,"
+                               "direction INTEGER NOT NULL,"
+                               "msg TEXT,"
+                               "msgType TEXT,"
+                               "timestamp REAL,"
+                               "PRIMARY KEY (seqNo, session, direction))" % (schema, ))
+        # values of the indexed tags, a message can have several (e.g. ClOrdIDs in a list order)
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS %s.message_index("
+                               "tag TEXT NOT NULL,"
+                               "value TEXT NOT NULL,"
+                               "seqNo INTEGER NOT NULL,"
+                               "session TEXT NOT NULL,"
+                               "direction INTEGER NOT NULL)" % (schema, ))
+
+    def _createMessageIndexes(self, schema):
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS %s.message_timestamp ON message(timestamp)" % (schema, ))
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS %s.message_msgtype ON message(msgType, timestamp)" % (schema, ))
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS %s.message_index_value ON message_index(tag, value)" % (schema, ))
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS %s.message_index_msg ON message_index(seqNo, session, direction)" % (schema, ))
+
+    def _indexValues(self, context, values):
+        for tag, value in context.tags.items():
+            if context.isRepeatingGroup(tag):
+                for group in context.getRepeatingGroup(tag)[1]:
+                    self._indexValues(group, values)
+            elif tag in self.indexedTags:
+                values.add((tag, str(value)))
+        return values
+
+    def _indexMsg(self, msg, seqNo, sessionKey, direction):
+        for (tag, value) in self._indexValues(msg, set()):
+            self.cursor.execute("INSERT INTO message_index VALUES(?, ?, ?, ?, ?)", (tag, value, seqNo, sessionKey, direction))
+
+    @staticmethod
+    def _sessionFromRow(sessionInfo):
+        session = FIXSession(sessionInfo[0], sessionInfo[1], sessionInfo[2])
+        session.sndSeqNum = sessionInfo[3]
+        session.nextExpectedMsgSeqNum = sessionInfo[4] + 1
+        return session
 
     def sessions(self):
         sessions = []
         self.cursor.execute("SELECT sessionId, targetCompId, senderCompId, outboundSeqNo, inboundSeqNo FROM session")
         for sessionInfo in self.cursor:
-            session = FIXSession(sessionInfo[0], sessionInfo[1], sessionInfo[2])
-            session.sndSeqNum = sessionInfo[3]
-            session.nextExpectedMsgSeqNum = sessionInfo[4] + 1
-            sessions.append(session)
+            sessions.append(self._sessionFromRow(sessionInfo))
 
         return sessions
 
+    def getSession(self, sessionId):
+        self.cursor.execute("SELECT sessionId, targetCompId, senderCompId, outboundSeqNo, inboundSeqNo FROM session WHERE sessionId = ?", (sessionId, ))
+        sessionInfo = self.cursor.fetchone()
+        return None if sessionInfo is None else self._sessionFromRow(sessionInfo)
+
+    def findSession(self, targetCompId, senderCompId):
+        self.cursor.execute("SELECT sessionId, targetCompId, senderCompId, outboundSeqNo, inboundSeqNo FROM session WHERE targetCompId = ? AND senderCompId = ?", (targetCompId, senderCompId))
+        sessionInfo = self.cursor.fetchone()
+        return None if sessionInfo is None else self._sessionFromRow(sessionInfo)
+
     def createSession(self, targetCompId, senderCompId):
         session = None
         try:
@@ -57,16 +129,63 @@ class Journaler(object):
         msgStr = pickle.dumps(msg)
         seqNo = msg["34"]
         try:
-            self.cursor.execute("INSERT INTO message VALUES(?, ?, ?, ?)", (seqNo, session.key, direction.value, msgStr))
+            self.cursor.execute("INSERT INTO message(seqNo, session, direction, msg, msgType, timestamp) VALUES(?, ?, ?, ?, ?, ?)", (seqNo, session.key, direction.value, msgStr, msg.msgType, time.time()))
+            self._indexMsg(msg, seqNo, session.key, direction.value)
             if direction == MessageDirection.OUTBOUND:
-                self.cursor.execute("UPDATE session SET outboundSeqNo=?", (seqNo,))
+                self.cursor.execute("UPDATE session SET outboundSeqNo=? WHERE sessionId=?", (seqNo, session.key))
             elif direction == MessageDirection.INBOUND:
-                self.cursor.execute("UPDATE session SET inboundSeqNo=?", (seqNo,))
+                self.cursor.execute("UPDATE session SET inboundSeqNo=? WHERE sessionId=?", (seqNo, session.key))
 
-            self.conn.commit()
+            if not self.inBatch:
+                self._commit()
+        except sqlite3.IntegrityError as e:
+            raise DuplicateSeqNoError("%s is a duplicate" % (seqNo, ))
+
+    def persistMarker(self, seqNo, msgType, session, direction):
+        # a cheap record of an admin message (e.g. a Heartbeat), we only keep its seq no & type
+        try:
+            self.cursor.execute("INSERT INTO message(seqNo, session, direction, msg, msgType, timestamp) VALUES(?, ?, ?, NULL, ?, ?)", (seqNo, session.key, direction.value, msgType, time.time()))
+            if direction == MessageDirection.OUTBOUND:
+                self.cursor.execute("UPDATE session SET outboundSeqNo=? WHERE sessionId=?", (seqNo, session.key))
+            elif direction == MessageDirection.INBOUND:
+                self.cursor.execute("UPDATE session SET inboundSeqNo=? WHERE sessionId=?", (seqNo, session.key))
+
+            if not self.inBatch:
+                self._commit()
         except sqlite3.IntegrityError as e:
             raise DuplicateSeqNoError("%s is a duplicate" % (seqNo, ))
 
+    @staticmethod
+    def _loadMsg(msg, seqNo, msgType):
+        if msg is None:
+            # a marker row, all we know is the type and seq no
+            marker = FIXMessage(msgType)
+            marker.setField("35", msgType)
+            marker.setField("34", str(seqNo))
+            return marker
+        return pickle.loads(msg)
+
+    def _commit(self):
+        if self.commitObserver is None:
+            self.conn.commit()
+        else:
+            start = time.perf_counter()
+            self.conn.commit()
+            self.commitObserver(time.perf_counter() - start)
+
+    def beginBatch(self):
+        # messages persisted until commitBatch/rollbackBatch are written in a single transaction
+        self.conn.commit()
+        self.inBatch = True
+
+    def commitBatch(self):
+        self.inBatch = False
+        self._commit()
+
+    def rollbackBatch(self):
+        self.inBatch = False
+        self.conn.rollback()
+
     def recoverMsg(self, session, direction, seqNo):
         try:
             msgs = self.recoverMsgs(session, direction, seqNo, seqNo)
@@ -75,31 +194,199 @@ class Journaler(object):
             return None
 
     def recoverMsgs(self, session, direction, startSeqNo, endSeqNo):
-        self.cursor.execute("SELECT msg FROM message WHERE session = ? AND direction = ? AND seqNo >= ? AND seqNo <= ? ORDER BY seqNo", (session.key, direction.value, startSeqNo, endSeqNo))
-        msgs = []
-        for msg in self.cursor:
-            msgs.append(pickle.loads(msg[0]))
-        return msgs
+        self.cursor.execute("SELECT msg, seqNo, msgType FROM message WHERE session = ? AND direction = ? AND seqNo >= ? AND seqNo <= ? ORDER BY seqNo", (session.key, direction.value, startSeqNo, endSeqNo))
+        rows = self.cursor.fetchall()
+        # older messages are rolled over before newer ones, so any archived ones come before the first we found.
+        # Anything else missing (e.g. pruned admin messages) is gap filled, so we don't go looking for it.
+        if self.archiveSegments is not None and (not rows or rows[0][1] > startSeqNo):
+            self.cursor.execute("SELECT lastSeqNo FROM archived WHERE session = ? AND direction = ?", (session.key, direction.value))
+            archived = self.cursor.fetchone()
+            if archived is not None and archived[0] >= startSeqNo:
+                lastSeqNo = min(archived[0], endSeqNo if not rows else rows[0][1] - 1)
+                rows = self._recoverArchivedRows(session, direction, startSeqNo, lastSeqNo) + rows
+        return [self._loadMsg(msg, seqNo, msgType) for (msg, seqNo, msgType) in rows]
+
+    def _recoverArchivedRows(self, session, direction, startSeqNo, endSeqNo):
+        # searches the segments newest first, until we have everything back to startSeqNo
+        rows = []
+        for filename in reversed(self.archiveSegments()):
+            conn = sqlite3.connect("file:%s?mode=ro" % (filename, ), uri=True)
+            try:
+                found = conn.execute("SELECT msg, seqNo, msgType FROM message WHERE session = ? AND direction = ? AND seqNo >= ? AND seqNo <= ? ORDER BY seqNo", (session.key, direction.value, startSeqNo, endSeqNo)).fetchall()
+                # once a segment goes back beyond startSeqNo the older ones can't have anything we need
+                older = conn.execute("SELECT 1 FROM message WHERE session = ? AND direction = ? AND seqNo < ? LIMIT 1", (session.key, direction.value, startSeqNo)).fetchone()
+            except sqlite3.Error:
+                found = []
+                older = None
+            finally:
+                conn.close()
+            if found:
+                rows = found + rows
+                endSeqNo = found[0][1] - 1
+            if endSeqNo < startSeqNo or older is not None:
+                break
+        return rows
 
     def getAllMsgs(self, sessions = [], direction = None):
-        sql = "SELECT seqNo, msg, direction, session FROM message"
+        return self.findMsgs(sessions, direction)
+
+    def _msgQuery(self, columns, sessions, direction, msgTypes, startTime, endTime, tags, afterRowId = None):
+        sql = "SELECT " + columns + " FROM message m"
         clauses = []
         args = []
+        if tags:
+            # each tag we filter on is matched against the side index
+            for i, (tag, value) in enumerate(tags.items()):
+                if tag not in self.indexedTags:
+                    raise RuntimeError("Tag %s is not indexed by the journal" % (tag, ))
+                sql = sql + (" JOIN message_index i{0} ON i{0}.seqNo = m.seqNo AND i{0}.session = m.session"
+                             " AND i{0}.direction = m.direction AND i{0}.tag = ? AND i{0}.value = ?".format(i))
+                args.extend([tag, str(value)])
         if sessions is not None and len(sessions) != 0:
-            clauses.append("session in (" + ','.join('?'*len(sessions)) + ")")
+            clauses.append("m.session in (" + ','.join('?'*len(sessions)) + ")")
             args.extend(sessions)
         if direction is not None:
-            clauses.append("direction = ?")
+            clauses.append("m.direction = ?")
             args.append(direction.value)
+        if msgTypes:
+            clauses.append("m.msgType in (" + ','.join('?'*len(msgTypes)) + ")")
+            args.extend(msgTypes)
+        if startTime is not None:
+            clauses.append("m.timestamp >= ?")
+            args.append(startTime)
+        if endTime is not None:
+            clauses.append("m.timestamp <= ?")
+            args.append(endTime)
+        if afterRowId is not None:
+            clauses.append("m.rowid > ?")
+            args.append(afterRowId)
 
         if clauses:
             sql = sql + " WHERE " + " AND ".join(clauses)
 
-        sql = sql + " ORDER BY rowid"
+        return (sql + " ORDER BY m.rowid", args)
+
+    def findMsgs(self, sessions = [], direction = None, msgTypes = None, startTime = None, endTime = None, tags = None):
+        sql, args = self._msgQuery("m.seqNo, m.msg, m.direction, m.session, m.msgType", sessions, direction, msgTypes, startTime, endTime, tags)
 
         self.cursor.execute(sql, tuple(args))
         msgs = []
         for msg in self.cursor:
-            msgs.append((msg[0], pickle.loads(msg[1]), msg[2], msg[3]))
+            msgs.append((msg[0], self._loadMsg(msg[1], msg[0], msg[4]), msg[2], msg[3]))
+
+        return msgs
+
+    def iterMsgs(self, chunkSize = 10000, sessions = [], direction = None, msgTypes = None, startTime = None, endTime = None, tags = None):
+        # streams the journal in chunks of (seqNo, msg, direction, session, timestamp), so we
+        # never hold more than chunkSize messages in memory
+        lastRowId = 0
+        while True:
+            sql, args = self._msgQuery("m.rowid, m.seqNo, m.msg, m.direction, m.session, m.timestamp, m.msgType", sessions, direction, msgTypes, startTime, endTime, tags, lastRowId)
+            rows = self.conn.execute(sql + " LIMIT ?", tuple(args) + (chunkSize, )).fetchall()
+            if not rows:
+                break
+            yield [(row[1], self._loadMsg(row[2], row[1], row[6]), row[3], row[4], row[5]) for row in rows]
+            lastRowId = rows[-1][0]
+
+    def reindex(self, batchSize = 1000):
+        # rebuild the side index, e.g. after changing the indexed tags on an existing store
+        self.cursor.execute("DELETE FROM message_index")
+        lastRowId = 0
+        while True:
+            rows = self.conn.execute("SELECT rowid, seqNo, session, direction, msg FROM message WHERE rowid > ? ORDER BY rowid LIMIT ?", (lastRowId, batchSize)).fetchall()
+            if not rows:
+                break
+            for (rowId, seqNo, session, direction, msg) in rows:
+                if msg is not None:
+                    self._indexMsg(pickle.loads(msg), seqNo, session, direction)
+            lastRowId = rows[-1][0]
+        self.conn.commit()
+
+    def size(self):
+        # the number of bytes in use, pages on the freelist are waiting to be compacted
+        pageSize = self.cursor.execute("PRAGMA page_size").fetchone()[0]
+        pageCount = self.cursor.execute("PRAGMA page_count").fetchone()[0]
+        freePages = self.cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pageCount - freePages) * pageSize
+
+    def _keepRecentClause(self, keepRecent):
+        # excludes each session's last 'keepRecent' messages in each direction, so recent resends never need an archive
+        return ("seqNo <= COALESCE((SELECT CASE message.direction WHEN %i THEN outboundSeqNo ELSE inboundSeqNo END FROM session WHERE sessionId = message.session) - ?, seqNo)"
+                % (MessageDirection.OUTBOUND.value, ), keepRecent)
+
+    def oldestMsgTimestamp(self, keepRecent=None):
+        if keepRecent is None:
+            self.cursor.execute("SELECT timestamp FROM message ORDER BY rowid LIMIT 1")
+        else:
+            clause, arg = self._keepRecentClause(keepRecent)
+            self.cursor.execute("SELECT timestamp FROM message WHERE " + clause + " ORDER BY rowid LIMIT 1", (arg, ))
+        row = self.cursor.fetchone()
+        return None if row is None else row[0]
+
+    def lastMsgRowId(self):
+        self.cursor.execute("SELECT max(rowid) FROM message")
+        return self.cursor.fetchone()[0]
+
+    def pruneMsgs(self, msgTypes, olderThan, limit):
+        self.cursor.execute("SELECT max(rowid), count(*) FROM (SELECT rowid FROM message WHERE msgType IN (" + ','.join('?'*len(msgTypes)) + ") "
+                            "AND timestamp < ? ORDER BY rowid LIMIT ?)", tuple(msgTypes) + (olderThan, limit))
+        lastRowId, count = self.cursor.fetchone()
+        if count != 0:
+            where = " WHERE msgType IN (" + ','.join('?'*len(msgTypes)) + ") AND timestamp < ? AND rowid <= ?"
+            args = tuple(msgTypes) + (olderThan, lastRowId)
+            self.cursor.execute("DELETE FROM message_index WHERE (seqNo, session, direction) IN (SELECT seqNo, session, direction FROM message" + where + ")", args)
+            self.cursor.execute("DELETE FROM message" + where, args)
+            self.conn.commit()
+        return count
+
+    def archiveMsgs(self, filename, limit, olderThan=None, maxRowId=None, keepRecent=None):
+        if self.filename is None:
+            raise RuntimeError("Can't archive messages from an in-memory journal")
+
+        clauses = []
+        args = []
+        if olderThan is not None:
+            # rows written before we recorded timestamps are always considered old
+            clauses.append("(timestamp IS NULL OR timestamp < ?)")
+            args.append(olderThan)
+        if maxRowId is not None:
+            clauses.append("rowid <= ?")
+            args.append(maxRowId)
+        if keepRecent is not None:
+            clause, arg = self._keepRecentClause(keepRecent)
+            clauses.append(clause)
+            args.append(arg)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+
+        self.cursor.execute("SELECT max(rowid), count(*) FROM (SELECT rowid FROM message" + where + " ORDER BY rowid LIMIT ?)", tuple(args) + (limit, ))
+        lastRowId, count = self.cursor.fetchone()
+        if count == 0:
+            return 0
+
+        self.cursor.execute("ATTACH DATABASE ? AS archive", (filename, ))
+        try:
+            self._createMessageTable("archive")
+            self._createMessageIndexes("archive")
+            where = (where + " AND" if where else " WHERE") + " rowid <= ?"
+            args = tuple(args) + (lastRowId, )
+            selected = "(seqNo, session, direction) IN (SELECT seqNo, session, direction FROM message" + where + ")"
+            self.cursor.execute("INSERT INTO archive.message_index SELECT * FROM message_index WHERE " + selected, args)
+            self.cursor.execute("DELETE FROM message_index WHERE " + selected, args)
+            for (session, direction, lastSeqNo) in self.cursor.execute("SELECT session, direction, max(seqNo) FROM message" + where + " GROUP BY session, direction", args).fetchall():
+                self.cursor.execute("INSERT OR IGNORE INTO archived(session, direction, lastSeqNo) VALUES(?, ?, ?)", (session, direction, lastSeqNo))
+                self.cursor.execute("UPDATE archived SET lastSeqNo = max(lastSeqNo, ?) WHERE session = ? AND direction = ?", (lastSeqNo, session, direction))
+            self.cursor.execute("INSERT OR IGNORE INTO archive.message(seqNo, session, direction, msg, msgType, timestamp) "
+                                "SELECT seqNo, session, direction, msg, msgType, timestamp FROM message" + where, args)
+            self.cursor.execute("DELETE FROM message" + where, args)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        finally:
+            self.cursor.execute("DETACH DATABASE archive")
+
+        return count
 
-        return msgs
\ No newline at end of file
+    def compact(self, pages):
+        self.cursor.execute("PRAGMA incremental_vacuum(%i)" % (pages, ))
+        self.cursor.fetchall()
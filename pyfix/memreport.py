@@ -0,0 +1,243 @@
+import argparse
+from enum import Enum
+import gc
+import importlib
+import logging
+import socket
+import sys
+import tracemalloc
+import types
+from pyfix.message import FIXMessage, MessageDirection
+
+# shared by everything, so never counted against the object which refers to them
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.CodeType, Enum)
+
+def deepSizeOf(obj, exclude=(), seen=None):
+    # sys.getsizeof of obj and everything it refers to (through containers, __dict__ and __slots__),
+    # each object is only counted once, objects in 'exclude' and their referents aren't counted at all
+    if seen is None:
+        seen = set([id(x) for x in exclude])
+    size = 0
+    pending = [obj]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+        if hasattr(obj, "__dict__"):
+            pending.append(obj.__dict__)
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if hasattr(obj, name):
+                    pending.append(getattr(obj, name))
+    return size
+
+def fieldCount(context):
+    # every field, including the fields of each repeating group
+    count = 0
+    for (tag, value) in context.tags.items():
+        count += 1
+        if context.isRepeatingGroup(tag):
+            for group in value.groups:
+                count += fieldCount(group)
+    return count
+
+class MessageSizes(object):
+    # the memory held by decoded messages, by msgType
+    def __init__(self):
+        # msgType -> [count, bytes, fields]
+        self.totals = {}
+
+    def add(self, msg):
+        size = deepSizeOf(msg)
+        try:
+            totals = self.totals[msg.msgType]
+        except KeyError:
+            totals = self.totals[msg.msgType] = [0, 0, 0]
+        totals[0] += 1
+        totals[1] += size
+        totals[2] += fieldCount(msg)
+        return size
+
+    def report(self):
+        lines = ["%-8s %8s %10s %8s %10s" % ("MsgType", "count", "bytes/msg", "fields", "bytes/field")]
+        for (msgType, (count, size, fields)) in sorted(self.totals.items()):
+            lines.append("%-8s %8s %10.0f %8.1f %10.1f" % (msgType, count, size / count, fields / count, size / float(max(fields, 1))))
+        return "\n".join(lines)
+
+def connectionSizes(connection):
+    # the memory held by a connection, broken down by what it's for. The engine, session, handlers and
+    # protocol are shared (or counted elsewhere) so are excluded.
+    exclude = [connection.engine, connection.session, connection.observer, connection.codec.protocol, connection.msgHandlers, connection.msgDispatch]
+    seen = set([id(x) for x in exclude])
+    seen.add(id(connection))
+    seen.add(id(connection.__dict__))
+    groups = [
+        ("buffers", ["msgBuffer", "writeBuffer"]),
+        ("sendQueue", ["sendQueue", "transaction", "transactionMsgs"]),
+        ("reorderBuffer", ["reorderBuffer"]),
+        ("timers", ["socketEvent", "writeEvent", "throttleTimer", "reorderTimerRegistration"]),
+        ("codec", ["codec"]),
+        ("tracing", ["tracer", "currentTrace"]),
+        ("resend", ["resendReplay"]),
+    ]
+    sizes = {"connection": sys.getsizeof(connection) + sys.getsizeof(connection.__dict__)}
+    grouped = set()
+    for (name, attributes) in groups:
+        sizes[name] = 0
+        for attribute in attributes:
+            grouped.add(attribute)
+            if hasattr(connection, attribute):
+                sizes[name] += deepSizeOf(getattr(connection, attribute), seen=seen)
+    for (attribute, value) in vars(connection).items():
+        if attribute not in grouped:
+            sizes["connection"] += deepSizeOf(value, seen=seen)
+    sizes["total"] = sum(sizes.values())
+    return sizes
+
+def sessionSizes(session):
+    outboundCache = deepSizeOf(session.outboundCache)
+    return {"session": deepSizeOf(session, exclude=[session.outboundCache]), "outboundCache": outboundCache, "outboundCacheMsgs": len(session.outboundCache)}
+
+def journalCacheSizes(engine):
+    # SQLite's page cache limit (a negative cache_size is in KiB) and the session caches held in memory
+    journaller = engine.journaller
+    pageSize = journaller.conn.execute("PRAGMA page_size").fetchone()[0]
+    cacheSize = journaller.conn.execute("PRAGMA cache_size").fetchone()[0]
+    registry = engine.sessions
+    sessions = list(registry.sessions.values())
+    return {
+        "sqlitePageCacheLimit": -cacheSize * 1024 if cacheSize < 0 else cacheSize * pageSize,
+        "sqlitePageSize": pageSize,
+        "sessionsLoaded": len(sessions),
+        "sessionsDormant": len(registry.dormantSessions),
+        "sessionRegistry": deepSizeOf(registry, exclude=[journaller]),
+        "outboundCaches": sum([deepSizeOf(session.outboundCache) for session in sessions]),
+    }
+
+class AllocationTracker(object):
+    # the top allocation sites between start() and snapshot(), from tracemalloc
+    def __init__(self, frames=1):
+        self.frames = frames
+        self.baseline = None
+        self.startedTracing = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.startedTracing = True
+        self.baseline = tracemalloc.take_snapshot()
+
+    def stop(self):
+        if self.startedTracing:
+            tracemalloc.stop()
+            self.startedTracing = False
+
+    def top(self, limit=20, keyType="lineno"):
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        stats = snapshot.compare_to(self.baseline, keyType)
+        return [stat for stat in stats if stat.size_diff > 0][:limit]
+
+    def report(self, limit=20, keyType="lineno"):
+        lines = ["%12s %10s  %s" % ("bytes", "blocks", "allocated at")]
+        for stat in self.top(limit, keyType):
+            frame = stat.traceback[0]
+            lines.append("%12s %10s  %s:%s" % (stat.size_diff, stat.count_diff, frame.filename, frame.lineno))
+        return "\n".join(lines)
+
+def _formatSizes(title, sizes):
+    return "\n".join([title] + ["  %-22s %12s" % (name, value) for (name, value) in sizes.items()])
+
+def _sampleMsgs(protocol):
+    # a few typical messages, each sent many times by the load in main()
+    fixtags = protocol.fixtags
+    order = FIXMessage(protocol.msgtype.NEWORDERSINGLE)
+    for (tag, value) in [(fixtags.ClOrdID, "1234567"), (fixtags.HandlInst, "1"), (fixtags.Symbol, "VOD.L"), (fixtags.Side, "1"), (fixtags.TransactTime, "20240102-10:00:00.000"),
+                         (fixtags.OrderQty, "1000"), (fixtags.OrdType, "2"), (fixtags.Price, "123.45"), (fixtags.Account, "ACCT1")]:
+        order.setField(tag, value)
+    report = FIXMessage(protocol.msgtype.EXECUTIONREPORT)
+    for (tag, value) in [(fixtags.OrderID, "OID1"), (fixtags.ClOrdID, "1234567"), (fixtags.ExecID, "EID1"), (fixtags.ExecType, "F"), (fixtags.OrdStatus, "1"),
+                         (fixtags.Symbol, "VOD.L"), (fixtags.Side, "1"), (fixtags.OrderQty, "1000"), (fixtags.LastQty, "100"), (fixtags.LastPx, "123.45"),
+                         (fixtags.LeavesQty, "900"), (fixtags.CumQty, "100"), (fixtags.AvgPx, "123.45"), (fixtags.TransactTime, "20240102-10:00:00.000")]:
+        report.setField(tag, value)
+    return [order, report]
+
+def main():
+    from pyfix.client_connection import FIXClientConnectionHandler
+    from pyfix.codec import Codec
+    from pyfix.engine import FIXEngine
+    from pyfix.session import FIXSession
+
+    parser = argparse.ArgumentParser(description='Report the memory used by messages, connections and sessions, under a synthetic load.')
+    parser.add_argument('-n', '--count', dest='count', type=int, action='store', default=10000, help='messages to send through a connection')
+    parser.add_argument('-c', '--connections', dest='connections', type=int, action='store', default=10, help='idle connections to measure')
+    parser.add_argument('-t', '--top', dest='top', type=int, action='store', default=20, help='allocation sites to list')
+    parser.add_argument('-f', '--frames', dest='frames', type=int, action='store', default=1, help='frames to keep for each allocation')
+    parser.add_argument('-p', '--protocol', dest='protocol', action='store', default='pyfix.FIX44', help='the protocol to use')
+    args = parser.parse_args()
+    logging.basicConfig(format='%(asctime)s %(message)s', level=logging.WARNING)
+
+    protocol = importlib.import_module(args.protocol)
+    engine = FIXEngine()
+    tracker = AllocationTracker(args.frames)
+    tracker.start()
+
+    peers = []
+    connections = []
+    for i in range(0, args.connections):
+        sock, peerSock = socket.socketpair()
+        peers.append(peerSock)
+        connections.append(FIXClientConnectionHandler(engine, protocol, "TARGET%s" % (i, ), "SENDER", sock))
+
+    # drive inbound messages through the first connection, as a counterparty would
+    connection = connections[0]
+    peerCodec = Codec(protocol)
+    peerSession = FIXSession(1, "SENDER", "TARGET0")
+    peers[0].send(peerCodec.encode(protocol.messages.Messages.logon(), peerSession).encode('utf-8'))
+    connection.handle_read(None, None)
+    received = []
+    connection.addMessageHandler(lambda connection, msg: received.append(msg), MessageDirection.INBOUND)
+    samples = _sampleMsgs(protocol)
+    for i in range(0, args.count):
+        peers[0].send(peerCodec.encode(samples[i % len(samples)], peerSession).encode('utf-8'))
+        connection.handle_read(None, None)
+        connection.sendMsg(samples[0])
+        peers[0].recv(65536)
+    gc.collect()
+    # before we walk anything, which allocates as well
+    allocations = tracker.report(args.top)
+    tracker.stop()
+
+    messages = MessageSizes()
+    for msg in received:
+        messages.add(msg)
+    print("Decoded messages:")
+    print(messages.report())
+    print()
+    print(_formatSizes("Connection (logged in, after load):", connectionSizes(connection)))
+    print()
+    print(_formatSizes("Connection (idle):", connectionSizes(connections[-1])))
+    print()
+    print(_formatSizes("Session:", sessionSizes(connection.session)))
+    print()
+    print(_formatSizes("Journal caches:", journalCacheSizes(engine)))
+    print()
+    print("Top allocation sites:")
+    print(allocations)
+
+    for connection in connections:
+        connection.disconnect()
+    for peer in peers:
+        peer.close()
+
+if __name__ == '__main__':
+    main()
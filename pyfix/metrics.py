@@ -0,0 +1,291 @@
+from bisect import bisect_left
+import logging
+import os
+import socket
+from pyfix.event import FileDescriptorEventRegistration, EventType
+from pyfix.message import MessageDirection
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _formatLabels(labelNames, key, extra=()):
+    labels = ['%s="%s"' % (name, _escape(value)) for (name, value) in list(zip(labelNames, key)) + list(extra)]
+    return "{%s}" % (",".join(labels), ) if labels else ""
+
+def _formatValue(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+class MetricFamily(object):
+    type = "untyped"
+
+    def __init__(self, name, help, labelNames=()):
+        self.name = name
+        self.help = help
+        self.labelNames = tuple(labelNames)
+        # label values (a tuple, in labelNames order) -> value
+        self.values = {}
+
+    def samples(self):
+        return [(self.name, key, (), value) for (key, value) in sorted(self.values.items())]
+
+    def render(self):
+        lines = ["# HELP %s %s" % (self.name, self.help), "# TYPE %s %s" % (self.name, self.type)]
+        for (name, key, extra, value) in self.samples():
+            lines.append("%s%s %s" % (name, _formatLabels(self.labelNames, key, extra), _formatValue(value)))
+        return "\n".join(lines)
+
+class Counter(MetricFamily):
+    type = "counter"
+
+    def inc(self, key=(), amount=1):
+        try:
+            self.values[key] += amount
+        except KeyError:
+            self.values[key] = amount
+
+class Gauge(MetricFamily):
+    type = "gauge"
+
+    def set(self, key, value):
+        self.values[key] = value
+
+class Histogram(MetricFamily):
+    type = "histogram"
+
+    def __init__(self, name, help, labelNames=(), buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)):
+        MetricFamily.__init__(self, name, help, labelNames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, key, value):
+        try:
+            counts = self.values[key]
+        except KeyError:
+            # a count per bucket (+Inf last), then the sum
+            counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self):
+        samples = []
+        for (key, counts) in sorted(self.values.items()):
+            cumulative = 0
+            for (bound, count) in zip(self.buckets + (float("inf"), ), counts):
+                cumulative += count
+                samples.append((self.name + "_bucket", key, (("le", _formatValue(float(bound))), ), cumulative))
+            samples.append((self.name + "_sum", key, (), counts[-1]))
+            samples.append((self.name + "_count", key, (), cumulative))
+        return samples
+
+class MetricsRegistry(object):
+    def __init__(self):
+        self.families = []
+        # called before rendering, so values which are cheaper to read than to track can be collected
+        self.collectors = []
+
+    def register(self, family):
+        self.families.append(family)
+        return family
+
+    def counter(self, name, help, labelNames=()):
+        return self.register(Counter(name, help, labelNames))
+
+    def gauge(self, name, help, labelNames=()):
+        return self.register(Gauge(name, help, labelNames))
+
+    def histogram(self, name, help, labelNames=(), **kwargs):
+        return self.register(Histogram(name, help, labelNames, **kwargs))
+
+    def addCollector(self, collector):
+        self.collectors.append(collector)
+
+    def render(self):
+        for collector in self.collectors:
+            collector()
+        return "\n".join([family.render() for family in self.families]) + "\n"
+
+class EngineMetrics(object):
+    # The standard engine metrics, connections report to this as they go. Per message updates are
+    # a dict increment or two, the rest is read from the connections when we are scraped.
+    def __init__(self, engine, registry=None):
+        self.engine = engine
+        self.registry = MetricsRegistry() if registry is None else registry
+        self.connections = []
+        self.sessionLabels = {}
+        # totals from connections which have gone away, so our counters never go backwards
+        self.retired = {}
+
+        registry = self.registry
+        self.messages = registry.counter("pyfix_messages_total", "FIX messages sent and received", ("session", "direction", "msgtype"))
+        self.bytes = registry.counter("pyfix_bytes_total", "Bytes of FIX messages sent and received", ("session", "direction", "msgtype"))
+        self.decodeFailures = registry.counter("pyfix_decode_failures_total", "Messages which could not be decoded", ("session", ))
+        self.checksumFailures = registry.counter("pyfix_checksum_failures_total", "Messages received with an invalid CheckSum", ("session", ))
+        self.resendRequests = registry.counter("pyfix_resend_requests_served_total", "ResendRequests received from the counterparty", ("session", ))
+        self.gapFills = registry.counter("pyfix_gap_fills_sent_total", "GapFills sent while serving resends", ("session", ))
+        self.heartbeatMisses = registry.counter("pyfix_heartbeat_misses_total", "Heartbeats we expected but didn't receive", ("session", ))
+        self.queueDepth = registry.gauge("pyfix_outbound_queue_depth", "Messages waiting to be sent", ("session", ))
+        self.connected = registry.gauge("pyfix_connections", "Open connections", ())
+        self.journalCommit = registry.histogram("pyfix_journal_commit_seconds", "Time taken to commit to the journal", ())
+
+        registry.addCollector(self.collect)
+        engine.journaller.commitObserver = lambda duration: self.journalCommit.observe((), duration)
+
+    def sessionLabel(self, session):
+        if session is None:
+            return ""
+        try:
+            return self.sessionLabels[session]
+        except KeyError:
+            label = self.sessionLabels[session] = "%s->%s" % (session.senderCompId, session.targetCompId)
+            return label
+
+    def addConnection(self, connection):
+        self.connections.append(connection)
+
+    def removeConnection(self, connection):
+        if connection in self.connections:
+            self.connections.remove(connection)
+            key = (self.sessionLabel(connection.session), )
+            for (family, value) in self._connectionCounters(connection):
+                self.retired[(family, key)] = self.retired.get((family, key), 0) + value
+
+    def _connectionCounters(self, connection):
+        return [(self.decodeFailures, connection.codec.decodeErrors),
+                (self.checksumFailures, connection.codec.checksumErrors),
+                (self.heartbeatMisses, connection.heartbeatMisses)]
+
+    def messageReceived(self, connection, msgType, length):
+        key = (self.sessionLabel(connection.session), "in", msgType)
+        self.messages.inc(key)
+        self.bytes.inc(key, length)
+
+    def messageSent(self, connection, msgType, length):
+        key = (self.sessionLabel(connection.session), "out", msgType)
+        self.messages.inc(key)
+        self.bytes.inc(key, length)
+
+    def resendRequestServed(self, connection):
+        self.resendRequests.inc((self.sessionLabel(connection.session), ))
+
+    def gapFillSent(self, connection):
+        self.gapFills.inc((self.sessionLabel(connection.session), ))
+
+    def collect(self):
+        for family in (self.decodeFailures, self.checksumFailures, self.heartbeatMisses):
+            family.values = {}
+        for ((family, key), value) in self.retired.items():
+            family.inc(key, value)
+
+        self.queueDepth.values = {}
+        for connection in self.connections:
+            key = (self.sessionLabel(connection.session), )
+            for (family, value) in self._connectionCounters(connection):
+                family.inc(key, value)
+            self.queueDepth.set(key, self.queueDepth.values.get(key, 0) + len(connection.sendQueue))
+        self.connected.set((), len(self.connections))
+
+class MetricsServer(object):
+    # Serves the registry in the Prometheus text format, over HTTP on a local port or a unix socket
+    def __init__(self, engine, registry, host="127.0.0.1", port=None, path=None):
+        if port is None and path is None:
+            raise RuntimeError("MetricsServer requires a port or a unix socket path")
+        self.engine = engine
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.path = path
+        self.socket = None
+        self.clients = {}
+
+    def start(self):
+        if self.path is not None:
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.bind(self.path)
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.socket.bind((self.host, self.port))
+        self.socket.listen(5)
+        self.socket.setblocking(False)
+        self.registration = FileDescriptorEventRegistration(self.handle_accept, self.socket, EventType.READ)
+        self.engine.eventManager.registerHandler(self.registration)
+
+    def address(self):
+        return self.socket.getsockname()
+
+    def stop(self):
+        for (sock, (registration, buffer)) in list(self.clients.items()):
+            self._close(sock)
+        self.engine.eventManager.unregisterHandler(self.registration)
+        self.socket.close()
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def handle_accept(self, type, closure):
+        try:
+            sock, addr = self.socket.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        registration = FileDescriptorEventRegistration(self.handle_read, sock, EventType.READ, sock)
+        self.clients[sock] = (registration, b'')
+        self.engine.eventManager.registerHandler(registration)
+
+    def _close(self, sock):
+        (registration, buffer) = self.clients.pop(sock)
+        self.engine.eventManager.unregisterHandler(registration)
+        sock.close()
+
+    def handle_read(self, type, sock):
+        try:
+            data = sock.recv(4096)
+        except BlockingIOError:
+            return
+        except ConnectionError:
+            data = b''
+        if not data:
+            self._close(sock)
+            return
+
+        (registration, buffer) = self.clients[sock]
+        buffer += data
+        self.clients[sock] = (registration, buffer)
+        if b'\r\n\r\n' not in buffer and b'\n\n' not in buffer:
+            if len(buffer) > 8192:
+                self._close(sock)
+            return
+
+        requestLine = buffer.split(b'\n', 1)[0].decode('latin-1').split()
+        if len(requestLine) >= 2 and requestLine[0] == "GET" and requestLine[1].split("?")[0] in ("/", "/metrics"):
+            status = "200 OK"
+            body = self.registry.render().encode('utf-8')
+        else:
+            status = "404 Not Found"
+            body = b'Not Found\n'
+        response = ("HTTP/1.0 %s\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\nContent-Length: %s\r\nConnection: close\r\n\r\n" % (status, len(body))).encode('utf-8') + body
+        # the socket is never blocked on, whatever the scraper doesn't take now is sent as it can
+        self.engine.eventManager.unregisterHandler(registration)
+        registration = FileDescriptorEventRegistration(self.handle_write, sock, EventType.WRITE, sock)
+        self.clients[sock] = (registration, bytearray(response))
+        self.engine.eventManager.registerHandler(registration)
+        self.handle_write(None, sock)
+
+    def handle_write(self, type, sock):
+        # while a response is being sent, the client's buffer is what is left of it
+        (registration, response) = self.clients[sock]
+        try:
+            sent = sock.send(response)
+        except BlockingIOError:
+            return
+        except OSError as why:
+            logging.warning("Failed to send metrics: %s" % (why, ))
+            self._close(sock)
+            return
+        del response[:sent]
+        if len(response) == 0:
+            self._close(sock)
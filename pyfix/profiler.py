@@ -0,0 +1,181 @@
+import cProfile
+from enum import Enum
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from pyfix.connection import FIXConnectionHandler, FIXEndPoint
+from pyfix.event import EventType
+from pyfix.journaler import Journaler
+from pyfix.trace import MessageTrace, MessageTracer
+
+class ProfileMode(Enum):
+    CPROFILE = 0
+    SAMPLING = 1
+
+# the frames which call message/connection handlers, anything they call which isn't
+# one of our own methods is the handler
+_DISPATCH_CODES = frozenset([FIXConnectionHandler._notifyMessageObservers.__code__,
+                             FIXConnectionHandler._handleAdminMsg.__code__,
+                             FIXConnectionHandler._sendAdminMsg.__code__,
+                             FIXEndPoint.notifyLoggedIn.__code__,
+                             FIXEndPoint.notifyDisconnect.__code__])
+
+def _classCodes(*classes):
+    codes = set()
+    for cls in classes:
+        for value in vars(cls).values():
+            function = getattr(value, "__func__", value)
+            if hasattr(function, "__code__"):
+                codes.add(function.__code__)
+    return frozenset(codes)
+
+_INTERNAL_CODES = _classCodes(FIXConnectionHandler, Journaler, MessageTrace, MessageTracer)
+
+_CALLBACK_TAGS = {
+    EventType.READ: "socket_read",
+    EventType.WRITE: "socket_write",
+    EventType.READWRITE: "socket_read",
+    EventType.TIMEOUT: "timer",
+}
+
+class LoopProfiler(object):
+    # Profiles the engine's event loop in place, either cProfile over the next 'iterations' of
+    # the loop, or a sampling profiler which looks at the loop thread every 'interval' seconds
+    # (for at most 'duration' seconds) and writes collapsed stacks tagged by the type of callback
+    def __init__(self, eventManager, directory=".", mode=ProfileMode.SAMPLING, iterations=1000, interval=0.001, duration=60.0):
+        self.eventManager = eventManager
+        self.directory = directory
+        self.mode = mode
+        self.iterations = iterations
+        self.interval = interval
+        self.duration = duration
+
+        self.running = False
+        self.toggleRequested = False
+        self.lock = threading.Lock()
+        self.loopThread = None
+        self.lastFilename = None
+        # cProfile
+        self.profile = None
+        self.remaining = 0
+        # sampling
+        self.samples = {}
+        self.sampleCount = 0
+        self.sampler = None
+        self.stopSampling = threading.Event()
+
+    def isRunning(self):
+        return self.running
+
+    def _filename(self):
+        extension = "pstats" if self.mode == ProfileMode.CPROFILE else "collapsed"
+        return os.path.join(self.directory, "pyfix-profile-%s-%s.%s" % (os.getpid(), time.strftime("%Y%m%d-%H%M%S"), extension))
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+            if self.mode == ProfileMode.CPROFILE:
+                self.profile = None
+                self.remaining = self.iterations
+            else:
+                self.samples = {}
+                self.sampleCount = 0
+                self.stopSampling.clear()
+                self.sampler = threading.Thread(target=self._sample, name="pyfix-profiler", daemon=True)
+                self.sampler.start()
+            self.eventManager.profiler = self
+        logging.info("Started %s profiling of the event loop" % (self.mode.name, ))
+
+    def stop(self):
+        # a cProfile run is finished by the loop (at the end of the current iteration), samples are written now
+        if self.mode == ProfileMode.CPROFILE:
+            self.remaining = 0
+        else:
+            self.stopSampling.set()
+            if self.sampler is not None and self.sampler is not threading.current_thread():
+                self.sampler.join()
+            self._finish()
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def requestToggle(self):
+        # safe from a signal handler, which may have interrupted the loop while it holds self.lock.
+        # The loop toggles at the start of its next iteration
+        self.toggleRequested = True
+        self.eventManager.profiler = self
+
+    def beginIteration(self):
+        self.loopThread = threading.get_ident()
+        if self.toggleRequested:
+            self.toggleRequested = False
+            self.toggle()
+        if self.mode == ProfileMode.CPROFILE and self.profile is None and self.running:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def endIteration(self):
+        if self.mode == ProfileMode.CPROFILE and self.running:
+            self.remaining -= 1
+            if self.remaining <= 0:
+                if self.profile is not None:
+                    self.profile.disable()
+                self._finish()
+
+    def _finish(self):
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+            self.eventManager.profiler = self if self.toggleRequested else None
+            filename = self._filename()
+            if self.mode == ProfileMode.CPROFILE:
+                if self.profile is None:
+                    return
+                self.profile.dump_stats(filename)
+                self.profile = None
+            else:
+                self.sampler = None
+                with open(filename, "w") as f:
+                    for (stack, count) in sorted(self.samples.items()):
+                        f.write("%s %s\n" % (stack, count))
+            self.lastFilename = filename
+        logging.info("Wrote event loop profile to %s" % (filename, ))
+
+    def _stack(self, frame):
+        tag = _CALLBACK_TAGS.get(self.eventManager.dispatching, "wait")
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            if frame.f_back is not None and frame.f_back.f_code in _DISPATCH_CODES and code not in _INTERNAL_CODES:
+                tag = "handler"
+            frames.append("%s:%s" % (os.path.basename(code.co_filename), code.co_name))
+            frame = frame.f_back
+        frames.append(tag)
+        frames.reverse()
+        return ";".join(frames)
+
+    def _sample(self):
+        endTime = None if self.duration is None else time.monotonic() + self.duration
+        while not self.stopSampling.wait(self.interval):
+            frame = None if self.loopThread is None else sys._current_frames().get(self.loopThread)
+            if frame is not None:
+                stack = self._stack(frame)
+                self.samples[stack] = self.samples.get(stack, 0) + 1
+                self.sampleCount += 1
+            del frame
+            if endTime is not None and time.monotonic() >= endTime:
+                self._finish()
+                break
+
+def installSignalHandler(profiler, signum=signal.SIGUSR2):
+    # e.g. kill -USR2 <pid> to start profiling, and again to stop (cProfile stops by itself after its iterations)
+    signal.signal(signum, lambda signum, frame: profiler.requestToggle())
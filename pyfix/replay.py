@@ -0,0 +1,177 @@
+import calendar
+from datetime import datetime
+import logging
+import time
+from pyfix.codec import Codec
+from pyfix.connection import ConnectionState, MessageDispatcher
+from pyfix.journaler import Journaler
+from pyfix.message import MessageDirection
+from pyfix.session import FIXSession
+
+def _sendingTime(msg, protocol):
+    # seconds since the epoch, from the message's SendingTime
+    try:
+        value = msg[protocol.fixtags.SendingTime]
+    except KeyError:
+        return None
+    for format in ("%Y%m%d-%H:%M:%S.%f", "%Y%m%d-%H:%M:%S"):
+        try:
+            return calendar.timegm(datetime.strptime(value, format).timetuple()) + (float(value[value.index(".") :]) if "." in value else 0.0)
+        except ValueError:
+            pass
+    return None
+
+class JournalReplaySource(object):
+    # streams messages out of a journal store, chunkSize rows at a time, as (timestamp, session, msg)
+    def __init__(self, journal, protocol, direction=MessageDirection.INBOUND, sessions=[], msgTypes=None, chunkSize=1000):
+        self.journal = journal if isinstance(journal, Journaler) else Journaler(journal)
+        self.protocol = protocol
+        self.direction = direction
+        self.sessionKeys = [session.key if isinstance(session, FIXSession) else session for session in sessions]
+        self.msgTypes = msgTypes
+        self.chunkSize = chunkSize
+        self.sessions = {}
+
+    def _session(self, key):
+        try:
+            return self.sessions[key]
+        except KeyError:
+            session = self.sessions[key] = self.journal.getSession(key)
+            return session
+
+    def __iter__(self):
+        for rows in self.journal.iterMsgs(self.chunkSize, self.sessionKeys, self.direction, self.msgTypes):
+            chunk = []
+            for (seqNo, msg, direction, sessionKey, timestamp) in rows:
+                if msg.msgType in self.protocol.msgtype.sessionMessageTypes and self.msgTypes is None:
+                    # admin messages (and the markers standing in for them) aren't replayed unless asked for
+                    continue
+                chunk.append((timestamp if timestamp is not None else _sendingTime(msg, self.protocol), self._session(sessionKey), msg))
+            yield chunk
+
+class FIXLogReplaySource(object):
+    # streams messages out of a FIX log, one message per line (anything before the BeginString,
+    # e.g. a timestamp, is ignored) separated by SOH or '|'. Lines are decoded chunkSize at a time.
+    # With targetCompId only the messages sent to it are replayed.
+    def __init__(self, filename, protocol, targetCompId=None, msgTypes=None, chunkSize=1000):
+        self.filename = filename
+        self.protocol = protocol
+        self.codec = Codec(protocol)
+        self.targetCompId = targetCompId
+        self.msgTypes = None if msgTypes is None else frozenset(msgTypes)
+        self.chunkSize = chunkSize
+        self.sessions = {}
+        self.decodeErrors = 0
+        self.beginString = ("%s=%s" % (protocol.fixtags.BeginString, protocol.beginstring)).encode('utf-8')
+
+    def _session(self, msg):
+        fixtags = self.protocol.fixtags
+        key = (msg.tags.get(fixtags.TargetCompID), msg.tags.get(fixtags.SenderCompID))
+        try:
+            return self.sessions[key]
+        except KeyError:
+            # from the point of view of whoever the message was sent to
+            session = self.sessions[key] = FIXSession(len(self.sessions) + 1, key[1], key[0])
+            return session
+
+    def _decodeChunk(self, lines):
+        fixtags = self.protocol.fixtags
+        chunk = []
+        for line in lines:
+            start = line.find(self.beginString)
+            if start == -1:
+                continue
+            encoded = line[start:].rstrip(b'\r\n')
+            if b'\x01' not in encoded:
+                encoded = encoded.replace(b'|', b'\x01')
+            if not encoded.endswith(b'\x01'):
+                encoded += b'\x01'
+            try:
+                (msg, length) = self.codec.decode(encoded)
+            except ValueError:
+                msg = None
+            if msg is None:
+                self.decodeErrors += 1
+                logging.warning("Failed to decode %s" % (encoded, ))
+                continue
+            if self.targetCompId is not None and msg.tags.get(fixtags.TargetCompID) != self.targetCompId:
+                continue
+            if self.msgTypes is None:
+                if msg.msgType in self.protocol.msgtype.sessionMessageTypes:
+                    continue
+            elif msg.msgType not in self.msgTypes:
+                continue
+            chunk.append((_sendingTime(msg, self.protocol), self._session(msg), msg))
+        return chunk
+
+    def __iter__(self):
+        with open(self.filename, "rb") as f:
+            lines = []
+            for line in f:
+                lines.append(line)
+                if len(lines) == self.chunkSize:
+                    yield self._decodeChunk(lines)
+                    lines = []
+            if lines:
+                yield self._decodeChunk(lines)
+
+class ReplayConnection(MessageDispatcher):
+    # stands in for a FIXConnectionHandler, so handlers written for a live session can be driven from a
+    # recording. Anything they send is captured in 'sent' as (replay time, session, msg).
+    def __init__(self, protocol):
+        MessageDispatcher.__init__(self)
+        self.codec = Codec(protocol)
+        self.connectionState = ConnectionState.LOGGED_IN
+        self.session = None
+        self.replayTime = None
+        self.sent = []
+
+    def address(self):
+        return None
+
+    def sendMsg(self, msg, priority=None):
+        self.sent.append((self.replayTime, self.session, msg))
+        for handler in self.handlersFor(MessageDirection.OUTBOUND, msg.msgType):
+            handler(self, msg)
+
+    def deliver(self, msg):
+        for handler in self.handlersFor(MessageDirection.INBOUND, msg.msgType):
+            handler(self, msg)
+
+class ReplayDriver(object):
+    # Feeds the messages from a replay source to the handlers on 'connection', as fast as possible or,
+    # with a speed, at the recorded pace divided by speed (2.0 replays an hour in 30 minutes)
+    def __init__(self, source, connection, speed=None):
+        self.source = source
+        self.connection = connection
+        self.speed = speed
+        self.delivered = 0
+        self.elapsed = None
+
+    def _wait(self, timestamp, firstTimestamp, startTime):
+        if timestamp is None or firstTimestamp is None:
+            return
+        delay = (timestamp - firstTimestamp) / self.speed - (time.perf_counter() - startTime)
+        if delay > 0.0:
+            time.sleep(delay)
+
+    def run(self, limit=None):
+        connection = self.connection
+        startTime = time.perf_counter()
+        firstTimestamp = None
+        for chunk in self.source:
+            for (timestamp, session, msg) in chunk:
+                if limit is not None and self.delivered >= limit:
+                    self.elapsed = time.perf_counter() - startTime
+                    return self.delivered
+                if firstTimestamp is None:
+                    firstTimestamp = timestamp
+                if self.speed is not None:
+                    self._wait(timestamp, firstTimestamp, startTime)
+                connection.session = session
+                connection.replayTime = timestamp
+                connection.deliver(msg)
+                self.delivered += 1
+        self.elapsed = time.perf_counter() - startTime
+        logging.info("Replayed %s messages in %0.2fs" % (self.delivered, self.elapsed))
+        return self.delivered
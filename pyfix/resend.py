@@ -0,0 +1,104 @@
+import logging
+from pyfix.event import TimerEventRegistration
+from pyfix.message import FIXMessage, MessageDirection
+from pyfix.transaction import MessagePriority
+
+class ResendReplay(object):
+    def __init__(self, connection, beginSeqNo, endSeqNo, batchSize=100, rate=None):
+        self.connection = connection
+        self.engine = connection.engine
+        self.session = connection.session
+        self.protocol = connection.codec.protocol
+        self.batchSize = batchSize
+
+        self.nextSeqNo = int(beginSeqNo)
+        self.gapFillBegin = self.nextSeqNo
+        # we never replay beyond the last message sent before the request arrived
+        self.endSeqNo = min(int(endSeqNo), self.session.sndSeqNum)
+
+        # with a rate cap each batch is spaced out so we average 'rate' msgs/sec,
+        # otherwise we emit a batch on every iteration of the event loop
+        interval = 0.0 if rate is None else float(batchSize) / rate
+        self.timer = TimerEventRegistration(lambda type, closure: self._replayBatch(), interval)
+
+    def start(self):
+        logging.info("Starting resend replay from %s to %s" % (self.nextSeqNo, self.endSeqNo))
+        self.engine.eventManager.registerHandler(self.timer)
+
+    def cancel(self):
+        self.engine.eventManager.unregisterHandler(self.timer)
+
+    def isComplete(self):
+        return self.nextSeqNo > self.endSeqNo
+
+    def _sendGapFill(self, newSeqNo):
+        if self.gapFillBegin < newSeqNo:
+            protocol = self.protocol
+            gapFillMsg = FIXMessage(protocol.msgtype.SEQUENCERESET)
+            gapFillMsg.setField(protocol.fixtags.GapFillFlag, 'Y')
+            gapFillMsg.setField(protocol.fixtags.PossDupFlag, 'Y')
+            gapFillMsg.setField(protocol.fixtags.MsgSeqNum, self.gapFillBegin)
+            gapFillMsg.setField(protocol.fixtags.NewSeqNo, str(newSeqNo))
+            self.connection.sendMsg(gapFillMsg, MessagePriority.BULK)
+            if self.engine.metrics is not None:
+                self.engine.metrics.gapFillSent(self.connection)
+            self.gapFillBegin = newSeqNo
+
+    def _replayCachedBatch(self, cachedMsgs):
+        protocol = self.protocol
+        codec = self.connection.codec
+        for (msgSeqNum, msgType, encodedMsg) in cachedMsgs:
+            if msgType in protocol.msgtype.sessionMessageTypes:
+                continue
+            replayMsg, length = codec.decode(encodedMsg)
+            if not self.engine.shouldResendMessage(self.session, replayMsg):
+                continue
+
+            self._sendGapFill(msgSeqNum)
+            self.connection.sendEncodedMsg(codec.encodeResend(encodedMsg), MessagePriority.BULK)
+            self.gapFillBegin = msgSeqNum + 1
+
+    def _replayJournalBatch(self, beginSeqNo, endSeqNo):
+        protocol = self.protocol
+        replayMsgs = self.engine.journaller.recoverMsgs(self.session, MessageDirection.OUTBOUND, beginSeqNo, endSeqNo)
+        for replayMsg in replayMsgs:
+            msgSeqNum = int(replayMsg[protocol.fixtags.MsgSeqNum])
+            if replayMsg[protocol.fixtags.MsgType] in protocol.msgtype.sessionMessageTypes:
+                # admin messages are never resent, they will be covered by the next gap fill
+                continue
+            if not self.engine.shouldResendMessage(self.session, replayMsg):
+                continue
+
+            self._sendGapFill(msgSeqNum)
+
+            replayMsg.removeField(protocol.fixtags.BeginString)
+            replayMsg.removeField(protocol.fixtags.BodyLength)
+            replayMsg.removeField(protocol.fixtags.SendingTime)
+            replayMsg.removeField(protocol.fixtags.SenderCompID)
+            replayMsg.removeField(protocol.fixtags.TargetCompID)
+            replayMsg.removeField(protocol.fixtags.CheckSum)
+            replayMsg.setField(protocol.fixtags.PossDupFlag, "Y")
+            self.connection.sendMsg(replayMsg, MessagePriority.BULK)
+
+            self.gapFillBegin = msgSeqNum + 1
+
+    def _replayBatch(self):
+        if self.connection.isCongested():
+            # let the socket drain before we queue any more, everything else goes out ahead of us
+            return
+
+        lastSeqNo = min(self.nextSeqNo + self.batchSize - 1, self.endSeqNo)
+
+        # recent messages are resent from the already encoded copies, only
+        # older ones need to be recovered from the journal and re-encoded
+        cachedMsgs = self.session.outboundCache.getRange(self.nextSeqNo, lastSeqNo)
+        if cachedMsgs is not None:
+            self._replayCachedBatch(cachedMsgs)
+        else:
+            self._replayJournalBatch(self.nextSeqNo, lastSeqNo)
+
+        self.nextSeqNo = lastSeqNo + 1
+        if self.isComplete():
+            self._sendGapFill(self.endSeqNo + 1)
+            self.cancel()
+            logging.info("Resend replay complete")
@@ -0,0 +1,130 @@
+from enum import Enum
+import datetime
+import glob
+import logging
+import os
+import time
+from pyfix.event import TimerEventRegistration
+
+class RolloverPolicy(Enum):
+    NONE = 0
+    DAILY = 1
+    SIZE = 2
+
+class JournalRetention(object):
+    def __init__(self, engine, rollover=RolloverPolicy.NONE, maxSegmentSize=None, adminMessageAge=None, maxDiskUsage=None,
+                 archiveDirectory=None, adminMsgTypes=("0", "1"), interval=5.0, batchSize=1000, compactPages=100, keepRecentMsgs=1000):
+        self.engine = engine
+        self.journaller = engine.journaller
+        self.rollover = rollover
+        self.maxSegmentSize = maxSegmentSize
+        self.adminMessageAge = adminMessageAge
+        self.maxDiskUsage = maxDiskUsage
+        # by default Heartbeat & TestRequest are the admin messages we prune
+        self.adminMsgTypes = adminMsgTypes
+        self.batchSize = batchSize
+        self.compactPages = compactPages
+        # each session's most recent messages stay in the journal through a rollover
+        self.keepRecentMsgs = keepRecentMsgs
+
+        if self.rollover == RolloverPolicy.SIZE and self.maxSegmentSize is None:
+            raise RuntimeError("Size based rollover requires maxSegmentSize")
+        if (self.rollover != RolloverPolicy.NONE or self.maxDiskUsage is not None) and self.journaller.filename is None:
+            raise RuntimeError("Journal rollover requires a journal file")
+
+        if self.journaller.filename is not None:
+            if archiveDirectory is None:
+                archiveDirectory = os.path.dirname(os.path.abspath(self.journaller.filename))
+            self.archivePrefix = os.path.join(archiveDirectory, os.path.basename(self.journaller.filename))
+            # resends of anything older are recovered from the archive
+            self.journaller.archiveSegments = self.segments
+
+        # (segment filename, last rowid to move) of a size based rollover in progress
+        self.pendingRollover = None
+        self.timer = TimerEventRegistration(lambda type, closure: self.runOnce(), interval)
+
+    def start(self):
+        self.engine.eventManager.registerHandler(self.timer)
+
+    def stop(self):
+        self.engine.eventManager.unregisterHandler(self.timer)
+
+    def segments(self):
+        # segment names sort chronologically
+        return sorted(glob.glob(self.archivePrefix + ".*.archive"))
+
+    def _segmentFilename(self, stamp):
+        return "%s.%s.archive" % (self.archivePrefix, stamp)
+
+    def runOnce(self):
+        # each pass does a bounded amount of work, so we never hold up the engine for long
+        moreWork = False
+        if self.adminMessageAge is not None:
+            pruned = self.journaller.pruneMsgs(self.adminMsgTypes, time.time() - self.adminMessageAge, self.batchSize)
+            moreWork = moreWork or pruned == self.batchSize
+
+        if self.rollover == RolloverPolicy.DAILY:
+            moreWork = self._rolloverDaily() or moreWork
+        elif self.rollover == RolloverPolicy.SIZE:
+            moreWork = self._rolloverSize() or moreWork
+
+        self.journaller.compact(self.compactPages)
+
+        if self.maxDiskUsage is not None:
+            self._enforceDiskUsage()
+
+        if moreWork:
+            # run again on the next iteration of the event loop
+            self.timer.timeLeft = 0.0
+        return moreWork
+
+    def _rolloverDaily(self):
+        oldest = self.journaller.oldestMsgTimestamp(self.keepRecentMsgs)
+        today = datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        if oldest is None:
+            day = None
+        else:
+            day = datetime.datetime.utcfromtimestamp(oldest).replace(hour=0, minute=0, second=0, microsecond=0)
+        if day is not None and day >= today:
+            return False
+
+        # messages from before we started recording timestamps go into yesterday's segment
+        if day is None:
+            day = today - datetime.timedelta(days=1)
+        endOfDay = (day + datetime.timedelta(days=1) - datetime.datetime(1970, 1, 1)).total_seconds()
+        moved = self.journaller.archiveMsgs(self._segmentFilename(day.strftime("%Y%m%d")), self.batchSize, olderThan=endOfDay, keepRecent=self.keepRecentMsgs)
+        logging.debug("Archived %s messages from %s" % (moved, day.strftime("%Y%m%d")))
+        return moved != 0
+
+    def _rolloverSize(self):
+        if self.pendingRollover is None:
+            if self.journaller.size() < self.maxSegmentSize:
+                return False
+            # everything currently in the journal (apart from the most recent messages) is moved to the new segment
+            stamp = datetime.datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+            self.pendingRollover = (self._segmentFilename(stamp), self.journaller.lastMsgRowId())
+            starting = True
+        else:
+            starting = False
+
+        filename, maxRowId = self.pendingRollover
+        moved = self.journaller.archiveMsgs(filename, self.batchSize, maxRowId=maxRowId, keepRecent=self.keepRecentMsgs)
+        if starting and moved != 0:
+            # nothing is logged when only the recent messages remain, as there is nothing to roll over
+            logging.info("Journal exceeds %s bytes, rolling over to %s" % (self.maxSegmentSize, filename))
+        if moved < self.batchSize:
+            self.pendingRollover = None
+        return moved != 0
+
+    def _enforceDiskUsage(self):
+        segments = self.segments()
+        usage = sum([os.path.getsize(segment) for segment in segments]) + os.path.getsize(self.journaller.filename)
+        while usage > self.maxDiskUsage and segments:
+            segment = segments.pop(0)
+            if self.pendingRollover is not None and self.pendingRollover[0] == segment:
+                break
+            usage -= os.path.getsize(segment)
+            logging.info("Journal disk usage exceeds %s bytes, removing archive %s" % (self.maxDiskUsage, segment))
+            os.remove(segment)
+        if usage > self.maxDiskUsage:
+            logging.warning("Journal disk usage %s bytes exceeds the limit of %s bytes" % (usage, self.maxDiskUsage))
@@ -0,0 +1,97 @@
+from enum import Enum
+import logging
+import random
+import time
+from pyfix.connection import ConnectionState
+from pyfix.event import TimerEventRegistration
+
+class SessionReadiness(Enum):
+    PENDING = 0
+    HANDSHAKING = 1
+    READY = 2
+    DISCONNECTED = 3
+    TIMED_OUT = 4
+
+class _ScheduledClient(object):
+    def __init__(self, client, host, port):
+        self.client = client
+        self.host = host
+        self.port = port
+        self.state = SessionReadiness.PENDING
+        self.handshakeStarted = None
+        self.handshakeTime = None
+
+class ConnectionScheduler(object):
+    # Brings up a large number of FIXClients without a thundering herd, a client is started every
+    # 'interval' seconds (+/- jitter) with at most maxConcurrentHandshakes waiting for a Logon
+    def __init__(self, engine, interval=0.05, jitter=0.5, maxConcurrentHandshakes=10, handshakeTimeout=30.0):
+        self.engine = engine
+        self.interval = interval
+        self.jitter = jitter
+        self.maxConcurrentHandshakes = maxConcurrentHandshakes
+        self.handshakeTimeout = handshakeTimeout
+
+        self.clients = []
+        self.pending = []
+        self.timer = TimerEventRegistration(lambda type, closure: self.runOnce(), interval)
+
+    def add(self, client, host, port):
+        scheduled = _ScheduledClient(client, host, port)
+        client.addConnectionListener(lambda connection: self._onLoggedIn(scheduled), ConnectionState.LOGGED_IN)
+        client.addConnectionListener(lambda connection: self._onDisconnect(scheduled), ConnectionState.DISCONNECTED)
+        self.clients.append(scheduled)
+        self.pending.append(scheduled)
+        return scheduled
+
+    def start(self):
+        self._resetTimer()
+        self.engine.eventManager.registerHandler(self.timer)
+
+    def stop(self):
+        self.engine.eventManager.unregisterHandler(self.timer)
+
+    def _resetTimer(self):
+        self.timer.timeLeft = self.interval * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def handshakesInProgress(self):
+        return len([x for x in self.clients if x.state == SessionReadiness.HANDSHAKING])
+
+    def readiness(self):
+        return dict([((x.client.targetCompId, x.client.senderCompId), x.state) for x in self.clients])
+
+    def isComplete(self):
+        # every client has been started, and none of them are still waiting on their Logon
+        return len(self.pending) == 0 and self.handshakesInProgress() == 0
+
+    def isReady(self):
+        return all([x.state == SessionReadiness.READY for x in self.clients])
+
+    def runOnce(self):
+        now = time.monotonic()
+        for scheduled in self.clients:
+            if scheduled.state == SessionReadiness.HANDSHAKING and now - scheduled.handshakeStarted > self.handshakeTimeout:
+                # the client keeps trying by itself, we just stop waiting on it
+                logging.warning("No Logon from %s:%s within %ss" % (scheduled.host, scheduled.port, self.handshakeTimeout))
+                scheduled.state = SessionReadiness.TIMED_OUT
+
+        if self.pending and self.handshakesInProgress() < self.maxConcurrentHandshakes:
+            scheduled = self.pending.pop(0)
+            scheduled.state = SessionReadiness.HANDSHAKING
+            scheduled.handshakeStarted = now
+            logging.debug("Starting session %s->%s (%s remaining)" % (scheduled.client.senderCompId, scheduled.client.targetCompId, len(self.pending)))
+            scheduled.client.start(scheduled.host, scheduled.port)
+
+        if self.pending:
+            self._resetTimer()
+        elif self.isComplete():
+            logging.info("Session startup complete, %s of %s ready" % (len([x for x in self.clients if x.state == SessionReadiness.READY]), len(self.clients)))
+            self.stop()
+
+    def _onLoggedIn(self, scheduled):
+        if scheduled.handshakeStarted is not None:
+            scheduled.handshakeTime = time.monotonic() - scheduled.handshakeStarted
+        scheduled.state = SessionReadiness.READY
+
+    def _onDisconnect(self, scheduled):
+        if scheduled.state != SessionReadiness.PENDING:
+            scheduled.state = SessionReadiness.DISCONNECTED
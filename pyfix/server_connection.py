@@ -26,6 +26,7 @@ class FIXServerConnectionHandler(FIXConnectionHandler):
                 # compids are reversed here...
                 self.session = self.engine.getOrCreateSessionFromCompIds(senderCompId, targetCompId)
                 if self.session is not None:
+                    self.engine.acquireSession(self.session)
                     try:
                         self.connectionState = ConnectionState.LOGGED_IN
                         self.heartbeatPeriod = float(msg[protocol.fixtags.HeartBtInt])
@@ -53,11 +54,12 @@ class FIXServerConnectionHandler(FIXConnectionHandler):
             elif msgType == protocol.msgtype.TESTREQUEST:
                 responses.append(protocol.messages.Messages.heartbeat())
             elif msgType == protocol.msgtype.RESENDREQUEST:
-                responses.extend(self._handleResendRequest(msg))
+                self._handleResendRequest(msg)
             elif msgType == protocol.msgtype.SEQUENCERESET:
                 newSeqNo = msg[protocol.fixtags.NewSeqNo]
                 self.session.setRecvSeqNo(int(newSeqNo) - 1)
-                recvSeqNo = newSeqNo
+                # the next message we expect is NewSeqNo
+                recvSeqNo = int(newSeqNo) - 1
         else:
             logging.warning("Can't process message, counterparty is not logged in")
 
@@ -1,4 +1,36 @@
+from collections import OrderedDict
 import logging
+import sys
+
+class OutboundMessageCache(object):
+    def __init__(self, maxSize = 1000):
+        self.maxSize = maxSize
+        # seqNo -> (msgType, encoded bytes), oldest first
+        self.msgs = OrderedDict()
+
+    def __len__(self):
+        return len(self.msgs)
+
+    def add(self, seqNo, msgType, encodedMsg):
+        self.msgs[seqNo] = (msgType, encodedMsg)
+        while len(self.msgs) > self.maxSize:
+            self.msgs.popitem(last=False)
+
+    def get(self, seqNo):
+        return self.msgs.get(seqNo)
+
+    def getRange(self, beginSeqNo, endSeqNo):
+        # returns [(seqNo, msgType, encodedMsg)], or None unless we hold every message in the range
+        msgs = []
+        for seqNo in range(beginSeqNo, endSeqNo + 1):
+            entry = self.msgs.get(seqNo)
+            if entry is None:
+                return None
+            msgs.append((seqNo, entry[0], entry[1]))
+        return msgs
+
+    def clear(self):
+        self.msgs.clear()
 
 class FIXSession:
     def __init__(self, key, targetCompId, senderCompId):
@@ -9,6 +41,8 @@ class FIXSession:
         self.sndSeqNum = 0
         self.nextExpectedMsgSeqNum = 1
 
+        self.outboundCache = OutboundMessageCache()
+
     def validateCompIds(self, targetCompId, senderCompId):
         return self.senderCompId == senderCompId and self.targetCompId == targetCompId
 
@@ -28,3 +62,119 @@ class FIXSession:
         #     logging.warning("SeqNum from client unexpected (Rcvd: %s Expected: %s)" % (seqNo, self.nextExpectedMsgSeqNum))
         self.nextExpectedMsgSeqNum = int(seqNo) + 1
 
+
+class InboundReorderBuffer(object):
+    def __init__(self, maxSize = 1000, timeout = 10.0):
+        self.maxSize = maxSize
+        self.timeout = timeout
+        self.msgs = {}
+        # the highest seq no we have either queued or asked to be resent
+        self.highestSeqNo = 0
+
+    def __len__(self):
+        return len(self.msgs)
+
+    def add(self, seqNo, msg, handled, nextExpectedSeqNo):
+        # returns the (begin, end) range we still need to request, if any
+        missing = None
+        lastKnownSeqNo = max(nextExpectedSeqNo - 1, self.highestSeqNo)
+        if seqNo > lastKnownSeqNo + 1:
+            missing = (lastKnownSeqNo + 1, seqNo - 1)
+        self.highestSeqNo = max(self.highestSeqNo, seqNo)
+        if seqNo not in self.msgs:
+            self.msgs[seqNo] = (msg, handled)
+        return missing
+
+    def pop(self, seqNo):
+        return self.msgs.pop(seqNo, None)
+
+    def discardBefore(self, seqNo):
+        for s in [s for s in self.msgs if s < seqNo]:
+            del self.msgs[s]
+
+    def requestedAll(self):
+        # an open ended resend is outstanding, so there is no need to ask for anything else
+        self.msgs.clear()
+        self.highestSeqNo = sys.maxsize
+
+    def clear(self):
+        self.msgs.clear()
+        self.highestSeqNo = 0
+
+class FIXSessionRegistry(object):
+    def __init__(self, journaller, maxDormantSessions = None):
+        self.journaller = journaller
+        self.maxDormantSessions = maxDormantSessions
+
+        # every session we currently have loaded, indexed both ways
+        self.sessions = {}
+        self.sessionsByCompIds = {}
+        # reference counts of sessions with a live connection, these are never evicted
+        self.activeSessions = {}
+        # sessions without a connection, least recently used first
+        self.dormantSessions = OrderedDict()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, key):
+        return key in self.sessions
+
+    def _cache(self, session):
+        self.sessions[session.key] = session
+        self.sessionsByCompIds[(session.targetCompId, session.senderCompId)] = session
+
+    def _touch(self, session):
+        if session.key not in self.activeSessions:
+            self.dormantSessions[session.key] = session
+            self.dormantSessions.move_to_end(session.key)
+            self._evict()
+
+    def _evict(self):
+        if self.maxDormantSessions is not None:
+            while len(self.dormantSessions) > self.maxDormantSessions:
+                key, session = self.dormantSessions.popitem(last=False)
+                logging.debug("Evicting dormant session %s (TargetCompId: %s SenderCompId: %s)" % (key, session.targetCompId, session.senderCompId))
+                del self.sessions[key]
+                del self.sessionsByCompIds[(session.targetCompId, session.senderCompId)]
+
+    def get(self, key):
+        session = self.sessions.get(key)
+        if session is None:
+            session = self.journaller.getSession(key)
+            if session is None:
+                return None
+            self._cache(session)
+        self._touch(session)
+        return session
+
+    def findByCompIds(self, targetCompId, senderCompId):
+        session = self.sessionsByCompIds.get((targetCompId, senderCompId))
+        if session is None:
+            # not seen since we started (or evicted), so load it from the journal
+            session = self.journaller.findSession(targetCompId, senderCompId)
+            if session is None:
+                return None
+            self._cache(session)
+        self._touch(session)
+        return session
+
+    def create(self, targetCompId, senderCompId):
+        session = self.journaller.createSession(targetCompId, senderCompId)
+        self._cache(session)
+        self._touch(session)
+        return session
+
+    def acquire(self, session):
+        self._cache(session)
+        self.dormantSessions.pop(session.key, None)
+        self.activeSessions[session.key] = self.activeSessions.get(session.key, 0) + 1
+
+    def release(self, session):
+        count = self.activeSessions.get(session.key, 0) - 1
+        if count > 0:
+            self.activeSessions[session.key] = count
+        else:
+            self.activeSessions.pop(session.key, None)
+            if session.key in self.sessions:
+                self._touch(session)
@@ -0,0 +1,36 @@
+import time
+
+class TokenBucket(object):
+    # 'rate' messages per second on average, with bursts of up to 'burst' messages
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(rate if burst is None else burst)
+        self.tokens = self.burst
+        self.lastTime = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.lastTime) * self.rate)
+        self.lastTime = now
+
+    def ready(self):
+        self._refill()
+        return self.tokens >= 1.0
+
+    def consume(self, count=1):
+        # a batch larger than one token is allowed through once a token is available,
+        # the bucket goes into debt and the following messages wait for it to be repaid
+        self.tokens -= count
+
+    def tryAcquire(self, count=1):
+        if self.ready():
+            self.consume(count)
+            return True
+        return False
+
+    def waitTime(self):
+        # seconds until the next message may be sent
+        self._refill()
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
@@ -0,0 +1,85 @@
+from enum import Enum
+import time
+from pyfix.histogram import Histogram
+
+class TraceStage(Enum):
+    READ = 0
+    FRAMED = 1
+    DECODED = 2
+    PERSISTED = 3
+    HANDLER_START = 4
+    HANDLER_END = 5
+    SENDING = 6
+    ENCODED = 7
+    SENT = 8
+
+class MessageTrace(object):
+    __slots__ = ("direction", "msgType", "seqNo", "stamps")
+
+    def __init__(self, direction, msgType=None, seqNo=None):
+        self.direction = direction
+        self.msgType = msgType
+        self.seqNo = seqNo
+        # (stage, perf_counter_ns, detail) in the order they happened
+        self.stamps = []
+
+    def stamp(self, stage, detail=None, when=None):
+        self.stamps.append((stage, time.perf_counter_ns() if when is None else when, detail))
+
+    def total(self):
+        return 0 if len(self.stamps) < 2 else self.stamps[-1][1] - self.stamps[0][1]
+
+    def durations(self):
+        # the time between each stage and the one after it
+        return [("%s->%s" % (a[0].name, b[0].name), b[1] - a[1], b[2] if b[2] is not None else a[2]) for a, b in zip(self.stamps, self.stamps[1:])]
+
+    def __str__(self):
+        return "%s %s(%s): %s" % (self.direction.name, self.msgType, self.seqNo, ", ".join(["%s %0.1fus" % (name, ns / 1000.0) for (name, ns, detail) in self.durations()]))
+
+class MessageTracer(object):
+    # keeps the traces of the last 'capacity' messages sent or received on a connection
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self.ring = [None] * self.capacity
+        self.next = 0
+        self.count = 0
+
+    def begin(self, direction, msgType=None, seqNo=None):
+        trace = MessageTrace(direction, msgType, seqNo)
+        self.ring[self.next] = trace
+        self.next = (self.next + 1) % self.capacity
+        self.count += 1
+        return trace
+
+    def traces(self):
+        # oldest first
+        if self.count < self.capacity:
+            return self.ring[:self.next]
+        return self.ring[self.next:] + self.ring[:self.next]
+
+    def breakdown(self, direction=None, msgType=None):
+        # a histogram of the time (ns) spent between each pair of stages, across the traces we hold
+        stages = {}
+        for trace in self.traces():
+            if (direction is not None and trace.direction != direction) or (msgType is not None and trace.msgType != msgType):
+                continue
+            for (name, ns, detail) in trace.durations():
+                try:
+                    histogram = stages[name]
+                except KeyError:
+                    histogram = stages[name] = Histogram(3)
+                histogram.record(max(0, ns))
+        return stages
+
+    def report(self, direction=None, msgType=None):
+        row_format = "{:<32}{:>10}{:>12}{:>12}{:>12}{:>12}"
+        lines = [row_format.format("Stage", "count", "mean(us)", "p50(us)", "p99(us)", "max(us)")]
+        for (name, histogram) in sorted(self.breakdown(direction, msgType).items()):
+            lines.append(row_format.format(name, histogram.totalCount, "%0.1f" % (histogram.mean() / 1000.0, ),
+                                           "%0.1f" % (histogram.valueAtPercentile(50.0) / 1000.0, ),
+                                           "%0.1f" % (histogram.valueAtPercentile(99.0) / 1000.0, ),
+                                           "%0.1f" % (histogram.max / 1000.0, )))
+        return "\n".join(lines)
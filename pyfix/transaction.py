@@ -1,3 +1,11 @@
+from collections import deque
+from enum import Enum
+
+class MessagePriority(Enum):
+    BULK = 0
+    NORMAL = 1
+    URGENT = 2
+    SESSION = 3
 
 class TransactionResource(object):
     def __init__(self, action):
@@ -30,7 +38,47 @@ class PriorityTransaction(TransactionResource):
         self.resources.append((priority, resource))
 
     def commit(self):
-        # TODO: sort the resources...
-        # High --> Low (so you can always make something higher priority)
-        for resource in self.resources:
+        # High --> Low (so you can always make something higher priority), resources
+        # of the same priority are committed in the order they were added
+        for priority, resource in sorted(self.resources, key=lambda x: x[0], reverse=True):
             resource.commit()
+
+class PriorityResourceQueue(object):
+    # A PriorityTransaction which is committed one resource at a time, so it
+    # can be drained gradually (e.g. as a socket becomes writable)
+    def __init__(self):
+        self.lanes = dict([(priority.value, deque()) for priority in MessagePriority])
+        self.priorities = sorted(self.lanes.keys(), reverse=True)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def depth(self, priority):
+        return len(self.lanes[priority.value])
+
+    def addResource(self, resource, priority):
+        self.lanes[priority.value].append(resource)
+        self.size += 1
+
+    def commitNext(self):
+        for priority in self.priorities:
+            lane = self.lanes[priority]
+            if lane:
+                self.size -= 1
+                lane.popleft().commit()
+                return True
+        return False
+
+    def peek(self):
+        for priority in self.priorities:
+            lane = self.lanes[priority]
+            if lane:
+                return lane[0]
+        return None
+
+    def clear(self):
+        for lane in self.lanes.values():
+            lane.clear()
+        self.size = 0
+
@@ -12,6 +12,7 @@ config = {
     'version': '0.1',
     'install_requires': [''],
     'packages': ['pyfix', 'pyfix/FIX44'],
+    'package_data': {'pyfix': ['FIX44.json']},
     'scripts': [],
     'name': 'pyfix'
 }
@@ -0,0 +1,69 @@
+import socket
+import unittest
+from pyfix.client_connection import FIXClient
+from pyfix.connection import ConnectionState
+from pyfix.engine import FIXEngine
+from pyfix.server_connection import FIXServer
+
+
+class FIXClientTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = FIXEngine()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.stop()
+
+    def _client(self, senderCompId, **kwargs):
+        client = FIXClient(self.engine, "pyfix.FIX44", "TARGET", senderCompId, **kwargs)
+        self.clients.append(client)
+        return client
+
+    def _unusedPort(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        return port
+
+    def testRetryBackoff(self):
+        client = self._client("SENDER", reconnectInterval=0.01, maxReconnectInterval=0.04)
+        client.start("127.0.0.1", self._unusedPort())
+        for i in range(0, 100):
+            if client.connectAttempts >= 4:
+                break
+            self.engine.eventManager.waitForEventWithTimeout(1.0)
+        self.assertTrue(client.connectAttempts >= 4)
+        self.assertEqual([], client.connections)
+        self.assertTrue(self.engine.eventManager.isRegistered(client.connectionRetryTimer))
+
+        # the delay doubles each time, up to the cap, with some jitter
+        client.connectAttempts = 0
+        self.assertTrue(0.005 <= client.retryDelay() <= 0.01)
+        client.connectAttempts = 10
+        self.assertTrue(0.02 <= client.retryDelay() <= 0.04)
+
+        client.stop()
+        self.assertFalse(self.engine.eventManager.isRegistered(client.connectionRetryTimer))
+
+    def testSeveralClients(self):
+        server = FIXServer(self.engine, "pyfix.FIX44")
+        server.start("127.0.0.1", 0)
+        port = server.socket.getsockname()[1]
+
+        loggedIn = []
+        for senderCompId in ["SENDER1", "SENDER2", "SENDER3"]:
+            client = self._client(senderCompId)
+            client.addConnectionListener(lambda connection: loggedIn.append(connection.session.senderCompId), ConnectionState.LOGGED_IN)
+            client.start("127.0.0.1", port)
+
+        for i in range(0, 100):
+            if len(loggedIn) == 3:
+                break
+            self.engine.eventManager.waitForEventWithTimeout(1.0)
+        self.assertEqual(["SENDER1", "SENDER2", "SENDER3"], sorted(loggedIn))
+        server.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -67,6 +67,27 @@ class FIXCodecTests(unittest.TestCase):
         expected = '8=FIX.4.4\x019=201\x0135=D\x0149=sender\x0156=target\x0134=1\x0152=20150619-11:08:54.000\x0144=123.45\x0138=9876\x0155=VOD.L\x0148=GB00BH4HKS39\x0122=4\x011=TEST\x0121=1\x01100=XLON\x0154=1\x0111=abcdefg\x0115=GBP\x01444=2\x01611=aaa\x01612=bbb\x01613=ccc\x01611=zzz\x01612=yyy\x01613=xxx\x0110=255\x01'
         self.assertEqual(expected, result)
 
+    @mock.patch("pyfix.codec.datetime", FakeDate)
+    def testEncodeResend(self):
+        mock_session = mock.Mock()
+        mock_session.senderCompId = "sender"
+        mock_session.targetCompId = "target"
+        mock_session.allocateSndSeqNo.return_value = 1
+
+        protocol = importlib.import_module("pyfix.FIX44")
+        codec = Codec(protocol)
+
+        msg = FIXMessage(codec.protocol.msgtype.NEWORDERSINGLE)
+        msg.setField(codec.protocol.fixtags.ClOrdID, "abcdefg")
+        msg.setField(codec.protocol.fixtags.Symbol, "VOD.L")
+        encoded = codec.encode(msg, mock_session).encode('utf-8')
+
+        result = codec.encodeResend(encoded)
+        self.assertEqual(b'8=FIX.4.4\x019=106\x0135=D\x0149=sender\x0156=target\x0134=1\x0143=Y\x0152=20150619-11:08:54.000\x01122=20150619-11:08:54.000\x0111=abcdefg\x0155=VOD.L\x0110=124\x01', result)
+
+        decoded, length = codec.decode(result)
+        self.assertEqual(len(result), length)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,208 @@
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pyfix import dictionary
+from pyfix.client_connection import FIXClient
+from pyfix.codec import Codec
+from pyfix.compiler import DictionaryError, XMLDictionary, generate
+from pyfix.connection import ConnectionState
+from pyfix.engine import FIXEngine
+from pyfix.message import FIXContext, FIXMessage
+from pyfix.server_connection import FIXServer
+from pyfix.session import FIXSession
+
+SESSION_FIELDS = '''
+  <field number="7" name="BeginSeqNo" type="SEQNUM"/>
+  <field number="8" name="BeginString" type="STRING"/>
+  <field number="9" name="BodyLength" type="LENGTH"/>
+  <field number="10" name="CheckSum" type="STRING"/>
+  <field number="16" name="EndSeqNo" type="SEQNUM"/>
+  <field number="34" name="MsgSeqNum" type="SEQNUM"/>
+  <field number="35" name="MsgType" type="STRING">
+   <value enum="0" description="HEARTBEAT"/>
+   <value enum="D" description="ORDER_SINGLE"/>
+   <value enum="8" description="EXECUTION_REPORT"/>
+  </field>
+  <field number="36" name="NewSeqNo" type="SEQNUM"/>
+  <field number="43" name="PossDupFlag" type="BOOLEAN"/>
+  <field number="49" name="SenderCompID" type="STRING"/>
+  <field number="52" name="SendingTime" type="UTCTIMESTAMP"/>
+  <field number="56" name="TargetCompID" type="STRING"/>
+  <field number="98" name="EncryptMethod" type="INT"/>
+  <field number="108" name="HeartBtInt" type="INT"/>
+  <field number="112" name="TestReqID" type="STRING"/>
+  <field number="122" name="OrigSendingTime" type="UTCTIMESTAMP"/>
+  <field number="123" name="GapFillFlag" type="BOOLEAN"/>
+'''
+
+SESSION_MESSAGES = '''
+  <message name="Heartbeat" msgtype="0" msgcat="admin"><field name="TestReqID" required="N"/></message>
+  <message name="TestRequest" msgtype="1" msgcat="admin"><field name="TestReqID" required="Y"/></message>
+  <message name="ResendRequest" msgtype="2" msgcat="admin"><field name="BeginSeqNo" required="Y"/><field name="EndSeqNo" required="Y"/></message>
+  <message name="SequenceReset" msgtype="4" msgcat="admin"><field name="GapFillFlag" required="N"/><field name="NewSeqNo" required="Y"/></message>
+  <message name="Logout" msgtype="5" msgcat="admin"/>
+  <message name="Logon" msgtype="A" msgcat="admin"><field name="EncryptMethod" required="Y"/><field name="HeartBtInt" required="Y"/>%s</message>
+'''
+
+HEADER = '''
+ <header>
+  <field name="BeginString" required="Y"/><field name="BodyLength" required="Y"/><field name="MsgType" required="Y"/>
+  <field name="SenderCompID" required="Y"/><field name="TargetCompID" required="Y"/><field name="MsgSeqNum" required="Y"/>
+  <field name="PossDupFlag" required="N"/><field name="SendingTime" required="Y"/><field name="OrigSendingTime" required="N"/>
+ </header>
+ <trailer><field name="CheckSum" required="Y"/></trailer>
+'''
+
+FIX42 = '''<fix type="FIX" major="4" minor="2" servicepack="0">''' + HEADER + '''
+ <messages>''' + (SESSION_MESSAGES % ("", )) + '''
+  <message name="NewOrderSingle" msgtype="D" msgcat="app">
+   <field name="ClOrdID" required="Y"/>
+   <component name="Parties" required="N"/>
+   <field name="Symbol" required="Y"/>
+   <field name="Side" required="Y"/>
+   <field name="DeskID" required="N"/>
+  </message>
+ </messages>
+ <components>
+  <component name="Parties">
+   <group name="NoPartyIDs" required="N">
+    <field name="PartyID" required="N"/>
+    <field name="PartyRole" required="N"/>
+    <group name="NoPartySubIDs" required="N"><field name="PartySubID" required="N"/></group>
+   </group>
+  </component>
+ </components>
+ <fields>''' + SESSION_FIELDS + '''
+  <field number="11" name="ClOrdID" type="STRING"/>
+  <field number="54" name="Side" type="CHAR"/>
+  <field number="55" name="Symbol" type="STRING"/>
+  <field number="448" name="PartyID" type="STRING"/>
+  <field number="452" name="PartyRole" type="INT"/>
+  <field number="453" name="NoPartyIDs" type="NUMINGROUP"/>
+  <field number="523" name="PartySubID" type="STRING"/>
+  <field number="802" name="NoPartySubIDs" type="NUMINGROUP"/>
+  <field number="5001" name="DeskID" type="STRING"/>
+ </fields>
+</fix>
+'''
+
+FIXT11 = '''<fix type="FIXT" major="1" minor="1" servicepack="0">''' + HEADER + '''
+ <messages>''' + (SESSION_MESSAGES % ('<field name="DefaultApplVerID" required="Y"/>', )) + '''
+ </messages>
+ <components/>
+ <fields>''' + SESSION_FIELDS + '''
+  <field number="1128" name="ApplVerID" type="STRING"><value enum="7" description="FIX50"/><value enum="9" description="FIX50SP2"/></field>
+  <field number="1137" name="DefaultApplVerID" type="STRING"/>
+ </fields>
+</fix>
+'''
+
+FIX50SP2 = '''<fix type="FIX" major="5" minor="0" servicepack="2">
+ <header/><trailer/>
+ <messages>
+  <message name="NewOrderSingle" msgtype="D" msgcat="app"><field name="ClOrdID" required="Y"/></message>
+ </messages>
+ <components/>
+ <fields><field number="11" name="ClOrdID" type="STRING"/><field number="35" name="MsgType" type="STRING"/></fields>
+</fix>
+'''
+
+class CompilerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.modules = []
+        dictionary._dictionaries.clear()
+
+    def tearDown(self):
+        for name in self.modules:
+            for module in [module for module in sys.modules if module == name or module.startswith(name + ".")]:
+                del sys.modules[module]
+        if self.directory in sys.path:
+            sys.path.remove(self.directory)
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, content):
+        filename = os.path.join(self.directory, name)
+        with open(filename, "w") as f:
+            f.write(content)
+        return filename
+
+    def _import(self, filenames, name):
+        generate(filenames, self.directory, name)
+        if self.directory not in sys.path:
+            sys.path.insert(0, self.directory)
+        self.modules.append(name)
+        return importlib.import_module(name)
+
+    def testFIX42(self):
+        protocol = self._import([self._write("FIX42.xml", FIX42)], "TESTFIX42")
+        self.assertEqual("FIX.4.2", protocol.beginstring)
+        self.assertEqual(("11", "5001", "DeskID"), (protocol.fixtags.ClOrdID, protocol.fixtags.DeskID, protocol.fixtags.tagToName("5001")))
+        self.assertEqual(("D", "A", "EXECUTIONREPORT"), (protocol.msgtype.NEWORDERSINGLE, protocol.msgtype.LOGON, protocol.msgtype.msgTypeToName("8")))
+        self.assertEqual(frozenset(["0", "1", "2", "4", "5", "A"]), protocol.msgtype.sessionMessageTypes)
+        self.assertEqual(("448", "452", "802"), protocol.fixtags.repeatingGroupIdentifiers()["453"])
+
+        layout = protocol.dictionary.messages["D"]
+        self.assertEqual(("11", "55", "54"), layout["required"])
+        self.assertEqual({"453": ("448", "452", "802"), "802": ("523", )}, dict(layout["groups"]))
+        self.assertEqual("NUMINGROUP", protocol.dictionary.fieldTypes["453"])
+        self.assertEqual(1, len(os.listdir(os.path.join(self.directory, "__pycache__"))))
+
+        # the generated package works with the codec
+        codec = Codec(protocol)
+        msg = FIXMessage(protocol.msgtype.NEWORDERSINGLE)
+        msg.setField(protocol.fixtags.ClOrdID, "1")
+        party = FIXContext()
+        party.setField(protocol.fixtags.PartyID, "ABC")
+        party.setField(protocol.fixtags.PartyRole, "1")
+        msg.addRepeatingGroup(protocol.fixtags.NoPartyIDs, party, 0)
+        msg.setField(protocol.fixtags.DeskID, "X")
+        encoded = codec.encode(msg, FIXSession(1, "S", "T")).encode('utf-8')
+        self.assertTrue(encoded.startswith(b"8=FIX.4.2\x01"))
+        (decoded, length) = codec.decode(encoded)
+        self.assertEqual(len(encoded), length)
+        self.assertEqual("ABC", decoded.getRepeatingGroupByTag(protocol.fixtags.NoPartyIDs, protocol.fixtags.PartyID, "ABC")[protocol.fixtags.PartyID])
+        self.assertEqual("X", decoded[protocol.fixtags.DeskID])
+
+        self.assertTrue(protocol.messages.Messages.logon().msgType == "A")
+
+    def testFIX42Session(self):
+        # FIX 4.2 has no OrderMassCancelRequest, or anything else the session layer doesn't need
+        self._import([self._write("FIX42.xml", FIX42)], "TESTFIX42")
+        engine = FIXEngine()
+        server = FIXServer(engine, "TESTFIX42")
+        server.start("127.0.0.1", 0)
+        client = FIXClient(engine, "TESTFIX42", "TARGET", "SENDER")
+        loggedIn = []
+        client.addConnectionListener(lambda connection: loggedIn.append(connection), ConnectionState.LOGGED_IN)
+        client.start("127.0.0.1", server.socket.getsockname()[1])
+        try:
+            for i in range(0, 100):
+                if loggedIn:
+                    break
+                engine.eventManager.waitForEventWithTimeout(1.0)
+            self.assertEqual(1, len(loggedIn))
+            self.assertEqual("FIX.4.2", loggedIn[0].codec.protocol.beginstring)
+            self.assertEqual(frozenset(), loggedIn[0].urgentMsgTypes)
+        finally:
+            client.stop()
+            server.stop()
+
+    def testFIXT(self):
+        protocol = self._import([self._write("FIXT11.xml", FIXT11), self._write("FIX50SP2.xml", FIX50SP2)], "TESTFIX50SP2")
+        self.assertEqual("FIXT.1.1", protocol.beginstring)
+        self.assertEqual("9", protocol.messages.Messages.logon()[protocol.fixtags.DefaultApplVerID])
+        self.assertEqual("D", protocol.msgtype.NEWORDERSINGLE)
+        self.assertEqual("FIX50SP2", XMLDictionary([os.path.join(self.directory, "FIXT11.xml"), os.path.join(self.directory, "FIX50SP2.xml")]).versionName())
+
+    def testMissingSessionFields(self):
+        with self.assertRaises(DictionaryError):
+            XMLDictionary([self._write("FIX50SP2.xml", FIX50SP2)]).compile()
+        with self.assertRaises(DictionaryError):
+            XMLDictionary([self._write("BAD.xml", FIX42.replace('<component name="Parties" required="N"/>', '<component name="Missing" required="N"/>'))]).compile()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,328 @@
+import importlib
+import socket
+import unittest
+from pyfix.client_connection import FIXClientConnectionHandler
+from pyfix.codec import Codec
+from pyfix.connection import ConnectionState
+from pyfix.engine import FIXEngine
+from pyfix.journaler import DuplicateSeqNoError
+from pyfix.message import FIXMessage, MessageDirection
+from pyfix.session import FIXSession
+from pyfix.trace import TraceStage
+from pyfix.transaction import MessagePriority
+
+
+class FIXConnectionHandlerTests(unittest.TestCase):
+    def setUp(self):
+        self.protocol = importlib.import_module("pyfix.FIX44")
+        self.engine = FIXEngine()
+        self.sock, self.peerSock = socket.socketpair()
+        self.connection = FIXClientConnectionHandler(self.engine, self.protocol, "TARGET", "SENDER", self.sock)
+
+        # the counterparty, which we drive by hand
+        self.peerCodec = Codec(self.protocol)
+        self.peerSession = FIXSession(1, "SENDER", "TARGET")
+        self.received = []
+        self.connection.addMessageHandler(lambda connection, msg: self.received.append(int(msg[self.protocol.fixtags.MsgSeqNum])), MessageDirection.INBOUND)
+
+        self._peerSend(1, self.protocol.messages.Messages.logon())
+        self.assertEqual(ConnectionState.LOGGED_IN, self.connection.connectionState)
+        self._peerRecv()
+
+    def tearDown(self):
+        self.connection.disconnect()
+        self.peerSock.close()
+
+    def _peerSend(self, seqNo, msg):
+        self.peerSession.sndSeqNum = seqNo - 1
+        encoded = self.peerCodec.encode(msg, self.peerSession).encode('utf-8')
+        decoded, length = self.connection.codec.decode(encoded)
+        self.connection.processMessage(decoded)
+
+    def _peerRecvBytes(self):
+        self.peerSock.setblocking(False)
+        data = b''
+        try:
+            while True:
+                data += self.peerSock.recv(8192)
+        except BlockingIOError:
+            pass
+        return data
+
+    def _peerRecv(self, data=b''):
+        data += self._peerRecvBytes()
+        msgs = []
+        msg, length = self.peerCodec.decode(data)
+        while msg is not None:
+            msgs.append(msg)
+            data = data[length:]
+            msg, length = self.peerCodec.decode(data)
+        return msgs
+
+    def _executionReport(self, possDup=False):
+        msg = FIXMessage(self.protocol.msgtype.EXECUTIONREPORT)
+        if possDup:
+            msg.setField(self.protocol.fixtags.PossDupFlag, "Y")
+        return msg
+
+    def testQueueOutOfSequenceMessages(self):
+        self._peerSend(2, self._executionReport())
+        self._peerSend(5, self._executionReport())
+        self._peerSend(6, self._executionReport())
+        self.assertEqual([1, 2], self.received)
+
+        # we only ask for the messages we are missing, and only once
+        requests = self._peerRecv()
+        self.assertEqual(1, len(requests))
+        self.assertEqual(self.protocol.msgtype.RESENDREQUEST, requests[0].msgType)
+        self.assertEqual(("3", "4"), (requests[0][self.protocol.fixtags.BeginSeqNo], requests[0][self.protocol.fixtags.EndSeqNo]))
+
+        msg = self._executionReport(True)
+        msg.setField(self.protocol.fixtags.MsgSeqNum, "3")
+        self._peerSend(3, msg)
+        gapFill = FIXMessage(self.protocol.msgtype.SEQUENCERESET)
+        gapFill.setField(self.protocol.fixtags.GapFillFlag, "Y")
+        gapFill.setField(self.protocol.fixtags.PossDupFlag, "Y")
+        gapFill.setField(self.protocol.fixtags.MsgSeqNum, "4")
+        gapFill.setField(self.protocol.fixtags.NewSeqNo, "5")
+        self._peerSend(4, gapFill)
+
+        self.assertEqual([1, 2, 3, 4, 5, 6], self.received)
+        self.assertEqual(7, self.connection.session.nextExpectedMsgSeqNum)
+        self.assertEqual(0, len(self.connection.reorderBuffer))
+        self.assertEqual([], self._peerRecv())
+
+        # a resent message we have already seen is ignored
+        msg = self._executionReport(True)
+        msg.setField(self.protocol.fixtags.MsgSeqNum, "5")
+        self._peerSend(5, msg)
+        self.assertEqual(ConnectionState.LOGGED_IN, self.connection.connectionState)
+        self.assertEqual([1, 2, 3, 4, 5, 6], self.received)
+
+    def testHeldBackGapFillWithBadCompIds(self):
+        # the GapFill's comp ids are only checked once the message before it arrives
+        gapFill = FIXMessage(self.protocol.msgtype.SEQUENCERESET)
+        gapFill.setField(self.protocol.fixtags.GapFillFlag, "Y")
+        gapFill.setField(self.protocol.fixtags.MsgSeqNum, "3")
+        gapFill.setField(self.protocol.fixtags.NewSeqNo, "5")
+        badSession = FIXSession(1, "OTHER", "TARGET")
+        badSession.sndSeqNum = 2
+        decoded, length = self.connection.codec.decode(self.peerCodec.encode(gapFill, badSession).encode('utf-8'))
+        self.connection.processMessage(decoded)
+        self.assertEqual(1, len(self.connection.reorderBuffer))
+        self.assertEqual(ConnectionState.LOGGED_IN, self.connection.connectionState)
+
+        self._peerSend(2, self._executionReport())
+        self.assertEqual(ConnectionState.DISCONNECTED, self.connection.connectionState)
+        self.assertEqual([1, 2], self.received)
+        self.assertEqual(3, self.connection.session.nextExpectedMsgSeqNum)
+
+    def testReorderBufferOverflow(self):
+        self.connection.reorderBuffer.maxSize = 2
+        for seqNo in [4, 5, 6]:
+            self._peerSend(seqNo, self._executionReport())
+        requests = self._peerRecv()
+        self.assertEqual([("2", "3"), ("2", "0")], [(r[self.protocol.fixtags.BeginSeqNo], r[self.protocol.fixtags.EndSeqNo]) for r in requests])
+        self.assertEqual(0, len(self.connection.reorderBuffer))
+
+    def testMessageHandlerDispatch(self):
+        calls = []
+        anyMsg = lambda connection, msg: calls.append("any")
+        inbound = lambda connection, msg: calls.append("in")
+        execReport = lambda connection, msg: calls.append("8")
+        outboundExecReport = lambda connection, msg: calls.append("out8")
+        self.connection.addMessageHandler(anyMsg)
+        self.connection.addMessageHandler(execReport, MessageDirection.INBOUND, self.protocol.msgtype.EXECUTIONREPORT)
+        self.connection.addMessageHandler(inbound, MessageDirection.INBOUND)
+        self.connection.addMessageHandler(outboundExecReport, MessageDirection.OUTBOUND, self.protocol.msgtype.EXECUTIONREPORT)
+
+        self._peerSend(2, self._executionReport())
+        self.assertEqual(["any", "8", "in"], calls)
+        del calls[:]
+        self._peerSend(3, self.protocol.messages.Messages.heartbeat())
+        self.assertEqual(["any", "in"], calls)
+
+        del calls[:]
+        self.connection.removeMessageHandler(anyMsg)
+        self.connection.removeMessageHandler(execReport, MessageDirection.INBOUND)
+        self._peerSend(4, self._executionReport())
+        self.assertEqual(["in"], calls)
+        self.assertEqual((outboundExecReport, ), self.connection.handlersFor(MessageDirection.OUTBOUND, self.protocol.msgtype.EXECUTIONREPORT))
+        self.assertEqual((), self.connection.handlersFor(MessageDirection.OUTBOUND, self.protocol.msgtype.HEARTBEAT))
+
+    def testPriorityLanesWhenCongested(self):
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        order = lambda: FIXMessage(self.protocol.msgtype.NEWORDERSINGLE)
+        while not self.connection.isCongested():
+            self.connection.sendMsg(order(), MessagePriority.BULK)
+        for i in range(0, 5):
+            self.connection.sendMsg(order(), MessagePriority.BULK)
+        self.assertEqual(5, self.connection.sendQueue.depth(MessagePriority.BULK))
+
+        # the queued orders haven't been given a seq no yet
+        queuedSeqNo = self.connection.session.sndSeqNum
+        self.connection.sendHeartbeat()
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.ORDERCANCELREQUEST))
+        self.assertEqual(1, self.connection.sendQueue.depth(MessagePriority.SESSION))
+        self.assertEqual(1, self.connection.sendQueue.depth(MessagePriority.URGENT))
+
+        data = b''
+        for i in range(0, 1000):
+            data += self._peerRecvBytes()
+            if not self.connection.isCongested():
+                break
+            self.connection.handle_write(None, None)
+        msgs = self._peerRecv(data)
+        self.assertFalse(self.connection.isCongested())
+        self.assertFalse(self.engine.eventManager.isRegistered(self.connection.writeEvent))
+
+        seqNos = [int(msg[self.protocol.fixtags.MsgSeqNum]) for msg in msgs]
+        self.assertEqual(list(range(seqNos[0], seqNos[0] + len(msgs))), seqNos)
+        msgTypes = [msg.msgType for msg in msgs]
+        heartbeat = msgTypes.index(self.protocol.msgtype.HEARTBEAT)
+        self.assertEqual(queuedSeqNo + 1, seqNos[heartbeat])
+        self.assertEqual(self.protocol.msgtype.ORDERCANCELREQUEST, msgTypes[heartbeat + 1])
+        self.assertEqual([self.protocol.msgtype.NEWORDERSINGLE] * 5, msgTypes[heartbeat + 2:])
+
+    def testWriteEventRegisteredOnce(self):
+        # draining the queue after a write can fill the socket again
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        while not self.connection.isCongested():
+            self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE), MessagePriority.BULK)
+        for i in range(0, 200):
+            self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE), MessagePriority.BULK)
+
+        self.peerSock.setblocking(False)
+        for i in range(0, 1000):
+            if not self.connection.isCongested():
+                break
+            try:
+                while True:
+                    self.peerSock.recv(65536)
+            except BlockingIOError:
+                pass
+            self.connection.handle_write(None, None)
+            self.assertTrue(self.engine.eventManager.handlers.count(self.connection.writeEvent) <= 1)
+        self.assertFalse(self.connection.isCongested())
+        self.assertFalse(self.engine.eventManager.isRegistered(self.connection.writeEvent))
+
+    def _journaledSeqNos(self):
+        msgs = self.engine.journaller.recoverMsgs(self.connection.session, MessageDirection.OUTBOUND, 1, 1000)
+        return [int(msg[self.protocol.fixtags.MsgSeqNum]) for msg in msgs]
+
+    def testTransactionCommit(self):
+        sent = []
+        self.connection.addMessageHandler(lambda connection, msg: sent.append(msg.msgType), MessageDirection.OUTBOUND)
+        self.connection.beginTransaction()
+        for msgType in [self.protocol.msgtype.NEWORDERSINGLE, self.protocol.msgtype.NEWORDERSINGLE, self.protocol.msgtype.ORDERCANCELREQUEST]:
+            self.connection.sendMsg(FIXMessage(msgType))
+        self.assertEqual([], self._peerRecv())
+        self.assertEqual([1], self._journaledSeqNos())
+
+        self.connection.commitTransaction()
+        msgs = self._peerRecv()
+        self.assertEqual([2, 3, 4], [int(msg[self.protocol.fixtags.MsgSeqNum]) for msg in msgs])
+        self.assertEqual([1, 2, 3, 4], self._journaledSeqNos())
+        self.assertEqual(["D", "D", "F"], sent)
+
+    def testTransactionRollback(self):
+        self.connection.beginTransaction()
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+        self.connection.abortTransaction()
+        self.assertEqual(1, self.connection.session.sndSeqNum)
+
+        # the second message collides with one already in the journal, so none of the batch is kept
+        clash = FIXMessage(self.protocol.msgtype.NEWORDERSINGLE)
+        clash.setField(self.protocol.fixtags.MsgSeqNum, "3")
+        self.engine.journaller.persistMsg(clash, self.connection.session, MessageDirection.OUTBOUND)
+        self.connection.beginTransaction()
+        for i in range(0, 3):
+            self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+        self.assertRaises(DuplicateSeqNoError, self.connection.commitTransaction)
+        self.assertEqual(1, self.connection.session.sndSeqNum)
+        self.assertEqual([1, 3], self._journaledSeqNos())
+        self.assertEqual([], self._peerRecv())
+
+    def _sendUntilDrained(self):
+        data = b''
+        for i in range(0, 100):
+            data += self._peerRecvBytes()
+            if not self.connection.isCongested():
+                break
+            self.engine.eventManager.waitForEventWithTimeout(1.0)
+        return [msg.msgType for msg in self._peerRecv(data)]
+
+    def testThrottle(self):
+        self.connection.setThrottle(50, 2)
+        for i in range(0, 4):
+            self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+        self.assertEqual(2, self.connection.sendQueue.depth(MessagePriority.NORMAL))
+
+        # heartbeats aren't throttled, cancels jump the queue
+        self.connection.sendHeartbeat()
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.ORDERCANCELREQUEST))
+        self.assertEqual(["D", "D", "0"], [msg.msgType for msg in self._peerRecv()])
+        self.assertEqual(["F", "D", "D"], self._sendUntilDrained())
+
+        stats = self.connection.sendQueueStats()
+        self.assertEqual(4, stats["queued"])
+        self.assertEqual(0, stats["depth"])
+        self.assertTrue(stats["waitMax"] > 0.0)
+
+    def testEngineThrottle(self):
+        self.connection.throttleBypass = frozenset([MessagePriority.SESSION, MessagePriority.URGENT])
+        self.engine.setThrottle(50, 1)
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.ORDERCANCELREQUEST))
+        self.assertEqual(["D", "F"], [msg.msgType for msg in self._peerRecv()])
+        self.assertEqual(["D"], self._sendUntilDrained())
+
+    def testAdminFastPath(self):
+        testRequest = self.protocol.messages.Messages.test_request()
+        testRequest.setField(self.protocol.fixtags.TestReqID, "T1")
+        self._peerSend(2, testRequest)
+        self._peerSend(3, self.protocol.messages.Messages.heartbeat())
+        self.assertEqual(4, self.connection.session.nextExpectedMsgSeqNum)
+        # handlers still see them
+        self.assertEqual([1, 2, 3], self.received)
+
+        responses = self._peerRecv()
+        self.assertEqual([self.protocol.msgtype.HEARTBEAT], [msg.msgType for msg in responses])
+        self.assertEqual("T1", responses[0][self.protocol.fixtags.TestReqID])
+
+        # neither direction is pickled
+        rows = self.engine.journaller.conn.execute("SELECT seqNo, direction, msgType FROM message WHERE msg IS NULL ORDER BY direction, seqNo").fetchall()
+        self.assertEqual([(2, MessageDirection.INBOUND.value, "1"), (3, MessageDirection.INBOUND.value, "0"), (2, MessageDirection.OUTBOUND.value, "0")], rows)
+        self.assertEqual([1, 2], self._journaledSeqNos())
+
+        # the resend of a range of admin messages is a single gap fill
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+        self.connection.sendHeartbeat()
+        self.connection.session.outboundCache.clear()
+        self._peerRecv()
+        self._peerSend(4, self.protocol.messages.Messages.resend_request(1, 0))
+        self.engine.eventManager.waitForEventWithTimeout(0.0)
+        resent = self._peerRecv()
+        summary = [(msg.msgType, msg[self.protocol.fixtags.MsgSeqNum], msg.tags.get(self.protocol.fixtags.NewSeqNo)) for msg in resent]
+        self.assertEqual([("4", "1", "3"), ("D", "3", None), ("4", "4", "5")], summary)
+
+    def testTracing(self):
+        self.assertIsNone(self.connection.tracer)
+        self.connection.enableTracing(8)
+
+        self.peerSession.sndSeqNum = 1
+        self.peerSock.send(self.peerCodec.encode(self._executionReport(), self.peerSession).encode('utf-8'))
+        self.connection.handle_read(None, None)
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+
+        (inbound, outbound) = self.connection.tracer.traces()
+        self.assertEqual((MessageDirection.INBOUND, "8", "2"), (inbound.direction, inbound.msgType, inbound.seqNo))
+        self.assertEqual([TraceStage.READ, TraceStage.FRAMED, TraceStage.DECODED, TraceStage.PERSISTED, TraceStage.HANDLER_START, TraceStage.HANDLER_END], [stamp[0] for stamp in inbound.stamps])
+        self.assertEqual((MessageDirection.OUTBOUND, "D", "2"), (outbound.direction, outbound.msgType, outbound.seqNo))
+        self.assertEqual([TraceStage.SENDING, TraceStage.ENCODED, TraceStage.SENT, TraceStage.PERSISTED], [stamp[0] for stamp in outbound.stamps])
+        self.assertTrue(inbound.total() > 0)
+        self.assertTrue("DECODED->PERSISTED" in self.connection.tracer.breakdown(MessageDirection.INBOUND))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pyfix import dictionary
+from pyfix.dictionary import loadDictionary
+
+
+SOURCE = {
+    "beginstring": "FIX.4.4",
+    "sessionMessageTypes": ["HEARTBEAT"],
+    "tags": {
+        "ClOrdID": "11",
+        "MsgType": {"tag": "35", "values": {"HEARTBEAT": "0", "NEWORDERSINGLE": "D"}},
+        "NoPartyIDs": "453",
+        "PartyID": "448",
+        "PartyRole": "452",
+    },
+    "repeatingGroupIdentifiers": {"NoPartyIDs": ["PartyID", "PartyRole"]},
+    "fieldTypes": {"ClOrdID": "STRING", "NoPartyIDs": "NUMINGROUP"},
+    "messages": {"NEWORDERSINGLE": {"required": ["ClOrdID"], "groups": {"NoPartyIDs": ["PartyID", "PartyRole"]}}},
+}
+
+class ProtocolDictionaryTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "TEST.json")
+        self._write(SOURCE)
+        # loaded instances are shared by content, so an earlier test's would be returned
+        dictionary._dictionaries.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, source):
+        with open(self.path, "w") as f:
+            json.dump(source, f)
+
+    def _cached(self):
+        return os.listdir(os.path.join(self.directory, "__pycache__"))
+
+    def testLoad(self):
+        d = loadDictionary(self.path)
+        self.assertEqual("FIX.4.4", d.beginstring)
+        self.assertEqual("11", d.tags["ClOrdID"])
+        self.assertEqual("ClOrdID", d.tagNames["11"])
+        self.assertEqual(("D", "NEWORDERSINGLE"), (d.msgTypes["NEWORDERSINGLE"], d.msgTypeNames["D"]))
+        self.assertEqual(frozenset(["0"]), d.sessionMessageTypes)
+        self.assertEqual(("448", "452"), d.repeatingGroups["453"])
+        self.assertEqual("NUMINGROUP", d.fieldTypes["453"])
+        self.assertEqual(("11", ), d.messages["D"]["required"])
+        self.assertEqual(("448", "452"), d.messages["D"]["groups"]["453"])
+        with self.assertRaises(TypeError):
+            d.tags["ClOrdID"] = "12"
+
+        # every caller shares the same tables
+        self.assertTrue(loadDictionary(self.path) is d)
+
+    def testCache(self):
+        d = loadDictionary(self.path)
+        self.assertEqual(["TEST.%s.dict" % (d.contentHash, )], self._cached())
+
+        # loaded from the cache, without being compiled again
+        dictionary._dictionaries.clear()
+        compileTables = dictionary.compileTables
+        dictionary.compileTables = None
+        try:
+            cached = loadDictionary(self.path)
+        finally:
+            dictionary.compileTables = compileTables
+        self.assertFalse(cached is d)
+        self.assertEqual(dict(d.tags), dict(cached.tags))
+        self.assertEqual(dict(d.messages["D"]["groups"]), dict(cached.messages["D"]["groups"]))
+
+    def testChangedContent(self):
+        d = loadDictionary(self.path)
+        source = json.loads(json.dumps(SOURCE))
+        source["tags"]["ClOrdID"] = "1011"
+        self._write(source)
+        changed = loadDictionary(self.path)
+        self.assertNotEqual(d.contentHash, changed.contentHash)
+        self.assertEqual("1011", changed.tags["ClOrdID"])
+        self.assertEqual(2, len(self._cached()))
+
+        # an edit which doesn't change the length
+        source["tags"]["ClOrdID"] = "1019"
+        self._write(source)
+        self.assertEqual("1019", loadDictionary(self.path).tags["ClOrdID"])
+        self.assertEqual(3, len(self._cached()))
+
+    def testFIX44(self):
+        protocol = importlib.import_module("pyfix.FIX44")
+        self.assertEqual("FIX.4.4", protocol.beginstring)
+        self.assertEqual(("11", "35", "ClOrdID"), (protocol.fixtags.ClOrdID, protocol.fixtags.MsgType, protocol.fixtags.tagToName("11")))
+        self.assertEqual(("D", "NEWORDERSINGLE"), (protocol.msgtype.NEWORDERSINGLE, protocol.msgtype.msgTypeToName("D")))
+        self.assertTrue(protocol.msgtype.LOGON in protocol.msgtype.sessionMessageTypes)
+        self.assertEqual([protocol.fixtags.PartyID, protocol.fixtags.PartyIDSource, protocol.fixtags.PartyRole, protocol.fixtags.NoPartySubIDs],
+                         list(protocol.fixtags.repeatingGroupIdentifiers()[protocol.fixtags.NoPartyIDs]))
+        self.assertTrue(protocol.fixtags.repeatingGroupIdentifiers() is protocol.dictionary.repeatingGroups)
+
+if __name__ == '__main__':
+    unittest.main()
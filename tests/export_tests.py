@@ -0,0 +1,44 @@
+import math
+import shutil
+import tempfile
+import unittest
+from pyfix.export import JournalExporter, loadColumnar
+from pyfix.journaler import Journaler
+from pyfix.message import FIXMessage, MessageDirection
+from pyfix.session import FIXSession
+
+
+class JournalExporterTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testExportColumnar(self):
+        journal = Journaler()
+        session = FIXSession(1, "S1", "T1")
+        for i in range(1, 8):
+            msg = FIXMessage("D" if i % 2 else "8")
+            msg.setField("34", str(i))
+            msg.setField("55", "VOD.L" if i < 4 else "BARC.L")
+            if i != 5:
+                msg.setField("44", "%0.2f" % (100 + i))
+            journal.persistMsg(msg, session, MessageDirection.OUTBOUND)
+
+        exporter = JournalExporter(journal, ["55", "44"], numericTags=["44"], chunkSize=3)
+        self.assertEqual(7, exporter.exportColumnar(self.directory))
+
+        columns = loadColumnar(self.directory)
+        self.assertEqual(list(range(1, 8)), list(columns["seqNo"]))
+        self.assertEqual(["D", "8", "D", "8", "D", "8", "D"], columns["msgType"])
+        self.assertEqual(["VOD.L"] * 3 + ["BARC.L"] * 4, columns["55"])
+        prices = list(columns["44"])
+        self.assertTrue(math.isnan(prices[4]))
+        self.assertEqual([101.0, 102.0, 103.0, 104.0, 106.0, 107.0], prices[:4] + prices[5:])
+
+        codes = loadColumnar(self.directory, decodeStrings=False)["55"]
+        self.assertEqual([0, 0, 0, 1, 1, 1, 1], list(codes))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from pyfix.event import EventManager
+from pyfix.heartbeat import HeartbeatManager
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.calls = []
+        self.heartbeatMisses = 0
+
+    def address(self):
+        return None
+
+    def sendHeartbeat(self):
+        self.calls.append("heartbeat")
+
+    def sendTestRequest(self):
+        self.calls.append("testRequest")
+
+    def disconnect(self):
+        self.calls.append("disconnect")
+
+
+class HeartbeatManagerTests(unittest.TestCase):
+    def testSweep(self):
+        eventManager = EventManager()
+        mgr = HeartbeatManager(eventManager)
+        quiet = FakeConnection()
+        busy = FakeConnection()
+        quietSlot = mgr.register(quiet, 30.0)
+        busySlot = mgr.register(busy, 30.0)
+        self.assertTrue(eventManager.isRegistered(mgr.timer))
+
+        # nothing sent or received on the quiet connection for 40s
+        mgr.lastSent[quietSlot] -= 40.0
+        mgr.lastReceived[quietSlot] -= 40.0
+        mgr.tick()
+        self.assertEqual(["testRequest"], quiet.calls)
+        self.assertEqual([], busy.calls)
+
+        # still nothing received a whole interval after the TestRequest
+        mgr.testRequestSent[quietSlot] -= 30.0
+        mgr.tick()
+        self.assertEqual(["testRequest", "disconnect"], quiet.calls)
+
+        mgr.lastSent[busySlot] -= 31.0
+        mgr.tick()
+        self.assertEqual(["heartbeat"], busy.calls)
+
+        mgr.unregister(quietSlot)
+        self.assertEqual(quietSlot, mgr.register(FakeConnection(), 10.0))
+        mgr.unregister(quietSlot)
+        mgr.unregister(busySlot)
+        self.assertEqual(0, len(mgr))
+        self.assertFalse(eventManager.isRegistered(mgr.timer))
+
+    def testTouchReceivedClearsTestRequest(self):
+        mgr = HeartbeatManager(EventManager())
+        connection = FakeConnection()
+        slot = mgr.register(connection, 30.0)
+        mgr.lastReceived[slot] -= 40.0
+        mgr.tick()
+        self.assertNotEqual(0.0, mgr.testRequestSent[slot])
+        mgr.touchReceived(slot)
+        self.assertEqual(0.0, mgr.testRequestSent[slot])
+        mgr.tick()
+        self.assertEqual(["testRequest"], connection.calls)
+
+if __name__ == '__main__':
+    unittest.main()
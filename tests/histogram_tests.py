@@ -0,0 +1,44 @@
+import random
+import unittest
+from pyfix.histogram import Histogram
+
+
+class HistogramTests(unittest.TestCase):
+    def testPercentiles(self):
+        histogram = Histogram(3)
+        values = [random.randint(1, 10 ** 9) for i in range(0, 10000)]
+        for value in values:
+            histogram.record(value)
+        values.sort()
+
+        self.assertEqual(10000, histogram.totalCount)
+        self.assertEqual((values[0], values[-1]), (histogram.min, histogram.max))
+        for percentile in (50.0, 99.0, 99.9):
+            exact = values[int(percentile / 100.0 * len(values)) - 1]
+            self.assertAlmostEqual(1.0, histogram.valueAtPercentile(percentile) / float(exact), places=2)
+        self.assertEqual(values[-1], histogram.valueAtPercentile(100.0))
+        self.assertAlmostEqual(sum(values) / 10000.0, histogram.mean())
+
+    def testSmallValuesAreExact(self):
+        histogram = Histogram(2)
+        for value in range(0, 100):
+            histogram.record(value, 2)
+        self.assertEqual(49, histogram.valueAtPercentile(50.0))
+        self.assertEqual([(v, 2) for v in range(0, 100)], histogram.buckets())
+
+    def testMerge(self):
+        a = Histogram()
+        b = Histogram()
+        a.record(10)
+        b.record(10 ** 6)
+        b.record(10 ** 7)
+        a.merge(b)
+        self.assertEqual((3, 10, 10 ** 7), (a.totalCount, a.min, a.max))
+        self.assertAlmostEqual(10 ** 6, a.valueAtPercentile(66.0), delta=10 ** 3)
+
+        a.reset()
+        self.assertEqual(0, a.totalCount)
+        self.assertEqual(0, a.valueAtPercentile(99.0))
+
+if __name__ == '__main__':
+    unittest.main()
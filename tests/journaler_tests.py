@@ -50,3 +50,52 @@ class JournalerTests(unittest.TestCase):
         for i in range(0, len(msgs)):
             msg.setField("34", str(i))
             self.assertEqual(msg, msgs[i])
+
+    def testFindMsgs(self):
+        journal = Journaler()
+        session = FIXSession(1, "S1", "T1")
+        for i, (msgType, clOrdID) in enumerate([("D", "A1"), ("8", "A1"), ("D", "B1"), ("3", None), ("8", "B1")], 1):
+            msg = FIXMessage(msgType)
+            msg.setField("34", str(i))
+            if clOrdID is not None:
+                msg.setField("11", clOrdID)
+            journal.persistMsg(msg, session, MessageDirection.OUTBOUND)
+
+        self.assertEqual([1, 2], [m[0] for m in journal.findMsgs(tags={"11": "A1"})])
+        self.assertEqual([5], [m[0] for m in journal.findMsgs(msgTypes=["8"], tags={"11": "B1"})])
+        self.assertEqual([4], [m[0] for m in journal.findMsgs(msgTypes=["3"])])
+        self.assertEqual([], journal.findMsgs(msgTypes=["8"], endTime=0))
+        self.assertRaises(RuntimeError, journal.findMsgs, tags={"55": "VOD.L"})
+
+    def testIndexRepeatingGroups(self):
+        journal = Journaler()
+        session = FIXSession(1, "S1", "T1")
+        msg = FIXMessage("E")
+        msg.setField("34", "1")
+        for clOrdID in ["L1", "L2"]:
+            order = FIXContext()
+            order.setField("11", clOrdID)
+            msg.addRepeatingGroup("73", order)
+        journal.persistMsg(msg, session, MessageDirection.OUTBOUND)
+
+        self.assertEqual(1, len(journal.findMsgs(tags={"11": "L2"})))
+        journal.reindex()
+        self.assertEqual(1, len(journal.findMsgs(tags={"11": "L1"})))
+
+    def testMarkers(self):
+        journal = Journaler()
+        session = journal.createSession("S1", "T1")
+        msg = FIXMessage("D")
+        msg.setField("34", "1")
+        msg.setField("11", "A")
+        journal.persistMsg(msg, session, MessageDirection.OUTBOUND)
+        journal.persistMarker(2, "0", session, MessageDirection.OUTBOUND)
+
+        self.assertEqual(1, journal.conn.execute("SELECT COUNT(*) FROM message WHERE msg IS NULL").fetchone()[0])
+        msgs = journal.recoverMsgs(session, MessageDirection.OUTBOUND, 1, 2)
+        self.assertEqual(["D", "0"], [m.msgType for m in msgs])
+        self.assertEqual(("0", "2"), (msgs[1]["35"], msgs[1]["34"]))
+        self.assertEqual(2, len(journal.findMsgs()))
+        self.assertEqual(2, journal.getSession(session.key).sndSeqNum)
+        journal.reindex()
+        self.assertEqual(1, len(journal.findMsgs(tags={"11": "A"})))
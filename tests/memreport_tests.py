@@ -0,0 +1,73 @@
+import importlib
+import socket
+import sys
+import unittest
+from pyfix.client_connection import FIXClientConnectionHandler
+from pyfix.engine import FIXEngine
+from pyfix.memreport import AllocationTracker, MessageSizes, connectionSizes, deepSizeOf, fieldCount, journalCacheSizes, sessionSizes
+from pyfix.message import FIXContext, FIXMessage
+
+
+class MemoryReportTests(unittest.TestCase):
+    def setUp(self):
+        self.protocol = importlib.import_module("pyfix.FIX44")
+
+    def testDeepSizeOf(self):
+        shared = "x" * 1000
+        self.assertEqual(sys.getsizeof([]) + 0, deepSizeOf([]))
+        self.assertEqual(sys.getsizeof([shared, shared]) + sys.getsizeof(shared), deepSizeOf([shared, shared]))
+        self.assertEqual(sys.getsizeof([shared]), deepSizeOf([shared], exclude=[shared]))
+        # classes, functions and enums are shared by everyone
+        self.assertEqual(sys.getsizeof([FIXMessage]), deepSizeOf([FIXMessage]))
+
+    def testMessageSizes(self):
+        msg = FIXMessage(self.protocol.msgtype.NEWORDERSINGLE)
+        msg.setField(self.protocol.fixtags.ClOrdID, "1")
+        for i in range(0, 2):
+            group = FIXContext()
+            group.setField(self.protocol.fixtags.PartyID, str(i))
+            group.setField(self.protocol.fixtags.PartyRole, "1")
+            msg.addRepeatingGroup(self.protocol.fixtags.NoPartyIDs, group)
+        self.assertEqual(6, fieldCount(msg))
+
+        sizes = MessageSizes()
+        size = sizes.add(msg)
+        self.assertTrue(size > deepSizeOf(msg.tags[self.protocol.fixtags.NoPartyIDs]))
+        sizes.add(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+        (count, total, fields) = sizes.totals["D"]
+        self.assertEqual((2, 6), (count, fields))
+        self.assertTrue(total > size)
+        self.assertTrue("D" in sizes.report())
+
+    def testConnectionSizes(self):
+        engine = FIXEngine()
+        sock, peerSock = socket.socketpair()
+        connection = FIXClientConnectionHandler(engine, self.protocol, "TARGET", "SENDER", sock)
+        try:
+            sizes = connectionSizes(connection)
+            self.assertEqual(sum([value for (name, value) in sizes.items() if name != "total"]), sizes["total"])
+            # the engine's journal and sessions are shared, they aren't part of the connection
+            connection.session.outboundCache.add(1, "D", b'x' * 1000)
+            self.assertEqual(sizes, connectionSizes(connection))
+            connection.msgBuffer = b'x' * 10000
+            self.assertTrue(connectionSizes(connection)["buffers"] >= sizes["buffers"] + 10000)
+
+            self.assertTrue(sessionSizes(connection.session)["outboundCache"] > 1000)
+            self.assertEqual(1, journalCacheSizes(engine)["sessionsLoaded"])
+        finally:
+            connection.disconnect()
+            peerSock.close()
+
+    def testAllocationTracker(self):
+        tracker = AllocationTracker()
+        tracker.start()
+        try:
+            retained = [bytearray(1000) for i in range(0, 100)]
+            top = tracker.top(5)
+        finally:
+            tracker.stop()
+        self.assertEqual(__file__, top[0].traceback[0].filename)
+        self.assertTrue(top[0].size_diff >= 100000)
+
+if __name__ == '__main__':
+    unittest.main()
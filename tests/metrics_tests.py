@@ -0,0 +1,135 @@
+import importlib
+import re
+import socket
+import time
+import unittest
+from pyfix.client_connection import FIXClientConnectionHandler
+from pyfix.codec import Codec
+from pyfix.engine import FIXEngine
+from pyfix.message import FIXMessage
+from pyfix.metrics import MetricsRegistry
+from pyfix.session import FIXSession
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def testRender(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "A counter", ("session", "msgtype"))
+        counter.inc(("A->B", "D"))
+        counter.inc(("A->B", "D"), 2)
+        counter.inc(('quote"d', "8"))
+        gauge = registry.gauge("test_depth", "A gauge")
+        gauge.set((), 1.5)
+        histogram = registry.histogram("test_seconds", "A histogram", buckets=(0.1, 1.0))
+        histogram.observe((), 0.05)
+        histogram.observe((), 0.5)
+        histogram.observe((), 5.0)
+
+        lines = registry.render().splitlines()
+        self.assertTrue("# TYPE test_total counter" in lines)
+        self.assertTrue('test_total{session="A->B",msgtype="D"} 3' in lines)
+        self.assertTrue('test_total{session="quote\\"d",msgtype="8"} 1' in lines)
+        self.assertTrue("test_depth 1.5" in lines)
+        self.assertEqual(['test_seconds_bucket{le="0.1"} 1', 'test_seconds_bucket{le="1"} 2', 'test_seconds_bucket{le="+Inf"} 3', "test_seconds_sum 5.55", "test_seconds_count 3"],
+                         [line for line in lines if line.startswith("test_seconds")])
+
+
+class EngineMetricsTests(unittest.TestCase):
+    def setUp(self):
+        self.protocol = importlib.import_module("pyfix.FIX44")
+        self.engine = FIXEngine()
+        self.metrics = self.engine.enableMetrics(port=0)
+        self.sock, self.peerSock = socket.socketpair()
+        self.connection = FIXClientConnectionHandler(self.engine, self.protocol, "TARGET", "SENDER", self.sock)
+        self.peerCodec = Codec(self.protocol)
+        self.peerSession = FIXSession(1, "SENDER", "TARGET")
+
+    def tearDown(self):
+        self.connection.disconnect()
+        self.peerSock.close()
+        self.engine.metricsServer.stop()
+
+    def _peerSend(self, msg, badChecksum=False):
+        encoded = self.peerCodec.encode(msg, self.peerSession).encode('utf-8')
+        if badChecksum:
+            encoded = re.sub(b'\x0110=\\d{3}\x01$', b'\x0110=999\x01', encoded)
+        self.peerSock.send(encoded)
+        self.connection.handle_read(None, None)
+
+    def _scrape(self, path="/metrics"):
+        client = socket.create_connection(self.engine.metricsServer.address())
+        client.send(("GET %s HTTP/1.0\r\n\r\n" % (path, )).encode('utf-8'))
+        client.setblocking(False)
+        response = b''
+        for i in range(0, 100):
+            self.engine.eventManager.waitForEventWithTimeout(0.1)
+            try:
+                data = client.recv(65536)
+            except BlockingIOError:
+                continue
+            if not data:
+                break
+            response += data
+        client.close()
+        return response.decode('utf-8')
+
+    def testScrape(self):
+        self._peerSend(self.protocol.messages.Messages.logon())
+        self._peerSend(FIXMessage(self.protocol.msgtype.EXECUTIONREPORT), badChecksum=True)
+        self.connection.sendMsg(FIXMessage(self.protocol.msgtype.NEWORDERSINGLE))
+
+        response = self._scrape()
+        self.assertTrue(response.startswith("HTTP/1.0 200 OK"))
+        self.assertTrue("Content-Type: text/plain; version=0.0.4" in response)
+        self.assertTrue('pyfix_messages_total{session="SENDER->TARGET",direction="in",msgtype="A"} 1' in response)
+        self.assertTrue('pyfix_messages_total{session="SENDER->TARGET",direction="in",msgtype="8"} 1' in response)
+        self.assertTrue('pyfix_messages_total{session="SENDER->TARGET",direction="out",msgtype="D"} 1' in response)
+        self.assertTrue('pyfix_checksum_failures_total{session="SENDER->TARGET"} 1' in response)
+        self.assertTrue('pyfix_outbound_queue_depth{session="SENDER->TARGET"} 0' in response)
+        self.assertTrue(re.search(r'pyfix_journal_commit_seconds_count [1-9]', response))
+
+        # counters survive the connection going away
+        self.connection.disconnect()
+        response = self._scrape()
+        self.assertTrue('pyfix_checksum_failures_total{session="SENDER->TARGET"} 1' in response)
+        self.assertTrue("pyfix_connections 0" in response)
+
+        self.assertTrue(self._scrape("/other").startswith("HTTP/1.0 404"))
+
+    def testSlowScraper(self):
+        # a response bigger than the socket buffers, from a scraper which doesn't read it yet
+        counter = self.engine.metrics.registry.counter("test_total", "A counter", ("id", ))
+        for i in range(0, 20000):
+            counter.inc(("%08i" % (i, ), ))
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        client.connect(self.engine.metricsServer.address())
+        self.engine.eventManager.waitForEventWithTimeout(0.1)
+        for sock in self.engine.metricsServer.clients:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        client.send(b"GET /metrics HTTP/1.0\r\n\r\n")
+        startTime = time.perf_counter()
+        for i in range(0, 5):
+            self.engine.eventManager.waitForEventWithTimeout(0.01)
+        self.assertTrue(time.perf_counter() - startTime < 0.5)
+        self.assertEqual(1, len(self.engine.metricsServer.clients))
+
+        client.setblocking(False)
+        response = b''
+        for i in range(0, 1000):
+            self.engine.eventManager.waitForEventWithTimeout(0.01)
+            try:
+                data = client.recv(65536)
+            except BlockingIOError:
+                continue
+            if not data:
+                break
+            response += data
+        client.close()
+        (header, body) = response.split(b'\r\n\r\n', 1)
+        self.assertEqual(int(re.search(b'Content-Length: (\\d+)', header).group(1)), len(body))
+        self.assertTrue(b'test_total{id="00019999"} 1' in body)
+        self.assertEqual({}, self.engine.metricsServer.clients)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import pstats
+import shutil
+import signal
+import tempfile
+import time
+import unittest
+from pyfix.event import EventManager, TimerEventRegistration
+from pyfix.profiler import LoopProfiler, ProfileMode, installSignalHandler
+
+
+def busyTimer(type, closure):
+    endTime = time.monotonic() + 0.02
+    while time.monotonic() < endTime:
+        pass
+
+
+class LoopProfilerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.eventManager = EventManager()
+        self.eventManager.registerHandler(TimerEventRegistration(busyTimer, 0.0))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testCProfile(self):
+        profiler = LoopProfiler(self.eventManager, self.directory, ProfileMode.CPROFILE, iterations=3)
+        profiler.start()
+        for i in range(0, 5):
+            self.eventManager.waitForEventWithTimeout(0.1)
+        self.assertFalse(profiler.isRunning())
+        self.assertIsNone(self.eventManager.profiler)
+        self.assertTrue(profiler.lastFilename.endswith(".pstats"))
+        functions = [function for (filename, line, function) in pstats.Stats(profiler.lastFilename).stats.keys()]
+        self.assertTrue("busyTimer" in functions)
+
+    def testSampling(self):
+        profiler = LoopProfiler(self.eventManager, self.directory, ProfileMode.SAMPLING, interval=0.001)
+        profiler.toggle()
+        for i in range(0, 10):
+            self.eventManager.waitForEventWithTimeout(0.1)
+        profiler.toggle()
+        self.assertFalse(profiler.isRunning())
+        self.assertTrue(profiler.sampleCount > 0)
+
+        with open(profiler.lastFilename) as f:
+            stacks = [line.rsplit(" ", 1)[0] for line in f]
+        timerStacks = [stack for stack in stacks if stack.startswith("timer;")]
+        self.assertTrue(timerStacks)
+        self.assertTrue(all([stack.endswith("busyTimer") for stack in timerStacks]))
+
+    def testSamplingDuration(self):
+        profiler = LoopProfiler(self.eventManager, self.directory, ProfileMode.SAMPLING, interval=0.001, duration=0.05)
+        profiler.start()
+        for i in range(0, 20):
+            if not profiler.isRunning():
+                break
+            self.eventManager.waitForEventWithTimeout(0.1)
+        self.assertFalse(profiler.isRunning())
+        self.assertTrue(os.path.exists(profiler.lastFilename))
+
+    def testSignalWhileLocked(self):
+        # the signal can interrupt the loop while it holds the profiler's lock
+        profiler = LoopProfiler(self.eventManager, self.directory, ProfileMode.SAMPLING, interval=0.001)
+        previous = signal.getsignal(signal.SIGUSR2)
+        installSignalHandler(profiler)
+        try:
+            handler = signal.getsignal(signal.SIGUSR2)
+            with profiler.lock:
+                handler(signal.SIGUSR2, None)
+            self.assertFalse(profiler.isRunning())
+            self.eventManager.waitForEventWithTimeout(0.1)
+            self.assertTrue(profiler.isRunning())
+
+            with profiler.lock:
+                handler(signal.SIGUSR2, None)
+            self.eventManager.waitForEventWithTimeout(0.1)
+            self.assertFalse(profiler.isRunning())
+            self.assertIsNone(self.eventManager.profiler)
+            self.assertTrue(os.path.exists(profiler.lastFilename))
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+
+if __name__ == '__main__':
+    unittest.main()
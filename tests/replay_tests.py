@@ -0,0 +1,78 @@
+import importlib
+import os
+import tempfile
+import unittest
+from pyfix.codec import Codec
+from pyfix.journaler import Journaler
+from pyfix.message import FIXMessage, MessageDirection
+from pyfix.replay import FIXLogReplaySource, JournalReplaySource, ReplayConnection, ReplayDriver
+from pyfix.session import FIXSession
+
+SOH = '\x01'
+
+
+class ReplayTests(unittest.TestCase):
+    def setUp(self):
+        self.protocol = importlib.import_module("pyfix.FIX44")
+        self.connection = ReplayConnection(self.protocol)
+        self.received = []
+        self.connection.addMessageHandler(self.onOrder, MessageDirection.INBOUND, self.protocol.msgtype.NEWORDERSINGLE)
+
+    def onOrder(self, connection, msg):
+        self.received.append((connection.session.targetCompId, msg[self.protocol.fixtags.ClOrdID]))
+        ack = FIXMessage(self.protocol.msgtype.EXECUTIONREPORT)
+        ack.setField(self.protocol.fixtags.ClOrdID, msg[self.protocol.fixtags.ClOrdID])
+        connection.sendMsg(ack)
+
+    def _order(self, seqNo, clOrdID):
+        msg = FIXMessage(self.protocol.msgtype.NEWORDERSINGLE)
+        msg.setField(self.protocol.fixtags.MsgType, self.protocol.msgtype.NEWORDERSINGLE)
+        msg.setField(self.protocol.fixtags.MsgSeqNum, str(seqNo))
+        msg.setField(self.protocol.fixtags.ClOrdID, clOrdID)
+        return msg
+
+    def testJournal(self):
+        journal = Journaler()
+        session = journal.createSession("CLIENT", "SERVER")
+        journal.persistMsg(self._order(1, "A"), session, MessageDirection.INBOUND)
+        journal.persistMarker(2, self.protocol.msgtype.HEARTBEAT, session, MessageDirection.INBOUND)
+        journal.persistMsg(self._order(3, "B"), session, MessageDirection.INBOUND)
+        journal.persistMsg(self._order(1, "X"), session, MessageDirection.OUTBOUND)
+        journal.persistMsg(self._order(4, "C"), session, MessageDirection.INBOUND)
+
+        driver = ReplayDriver(JournalReplaySource(journal, self.protocol, chunkSize=2), self.connection)
+        self.assertEqual(3, driver.run())
+        self.assertEqual([("CLIENT", "A"), ("CLIENT", "B"), ("CLIENT", "C")], self.received)
+        self.assertEqual(["A", "B", "C"], [msg[self.protocol.fixtags.ClOrdID] for (replayTime, session, msg) in self.connection.sent])
+        self.assertTrue(all([replayTime is not None for (replayTime, session, msg) in self.connection.sent]))
+
+        self.received = []
+        self.assertEqual(1, ReplayDriver(JournalReplaySource(journal, self.protocol), self.connection).run(limit=1))
+        self.assertEqual([("CLIENT", "A")], self.received)
+
+    def testFIXLog(self):
+        codec = Codec(self.protocol)
+        toUs = FIXSession(1, "SERVER", "CLIENT")
+        fromUs = FIXSession(2, "CLIENT", "SERVER")
+        lines = []
+        for (session, clOrdID) in [(toUs, "A"), (fromUs, "X"), (toUs, "B")]:
+            encoded = codec.encode(self._order(0, clOrdID), session)
+            lines.append("2024-01-02 10:00:00,000 INFO %s\n" % (encoded.replace(SOH, "|"), ))
+        lines.insert(1, "not a message\n")
+        lines.append("8=FIX.4.4|9=500|35=D|\n")
+
+        fd, filename = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.writelines(lines)
+            source = FIXLogReplaySource(filename, self.protocol, targetCompId="SERVER", chunkSize=2)
+            driver = ReplayDriver(source, self.connection, speed=1000.0)
+            self.assertEqual(2, driver.run())
+        finally:
+            os.unlink(filename)
+        self.assertEqual([("CLIENT", "A"), ("CLIENT", "B")], self.received)
+        self.assertEqual(2, len(self.connection.sent))
+        self.assertEqual(1, source.decodeErrors)
+
+if __name__ == '__main__':
+    unittest.main()
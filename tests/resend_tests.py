@@ -0,0 +1,87 @@
+import importlib
+import unittest
+from pyfix.codec import Codec
+from pyfix.engine import FIXEngine
+from pyfix.message import FIXMessage, MessageDirection
+from pyfix.resend import ResendReplay
+
+
+class FakeConnection(object):
+    def __init__(self, engine, session):
+        self.engine = engine
+        self.session = session
+        self.codec = Codec(importlib.import_module("pyfix.FIX44"))
+        self.sent = []
+
+    def isCongested(self):
+        return False
+
+    def sendMsg(self, msg, priority=None):
+        self.sent.append(msg)
+
+    def sendEncodedMsg(self, encodedMsg, priority=None):
+        msg, length = self.codec.decode(encodedMsg)
+        self.sent.append(msg)
+
+
+class ResendReplayTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = FIXEngine()
+        self.session = self.engine.createSession("TARGET", "SENDER")
+        self.connection = FakeConnection(self.engine, self.session)
+        self.protocol = self.connection.codec.protocol
+
+        # 1: Logon, 2-3: orders, 4-6: heartbeats, 7: order, 8: heartbeat
+        msgTypes = ["A", "D", "D", "0", "0", "0", "D", "0"]
+        for seqNo, msgType in enumerate(msgTypes, 1):
+            msg = FIXMessage(msgType)
+            msg.setField(self.protocol.fixtags.MsgType, msgType)
+            msg.setField(self.protocol.fixtags.MsgSeqNum, str(seqNo))
+            self.engine.journaller.persistMsg(msg, self.session, MessageDirection.OUTBOUND)
+        self.session.sndSeqNum = len(msgTypes)
+        self.msgTypes = msgTypes
+
+    def _runReplay(self, replay):
+        replay.start()
+        for i in range(0, 20):
+            if not self.engine.eventManager.isRegistered(replay.timer):
+                break
+            self.engine.eventManager.waitForEventWithTimeout(1.0)
+        self.assertTrue(replay.isComplete())
+        self.assertFalse(self.engine.eventManager.isRegistered(replay.timer))
+
+    def _summary(self):
+        result = []
+        for msg in self.connection.sent:
+            if msg.msgType == self.protocol.msgtype.SEQUENCERESET:
+                result.append(("GAPFILL", int(msg[self.protocol.fixtags.MsgSeqNum]), int(msg[self.protocol.fixtags.NewSeqNo])))
+            else:
+                self.assertEqual("Y", msg[self.protocol.fixtags.PossDupFlag])
+                result.append((msg.msgType, int(msg[self.protocol.fixtags.MsgSeqNum])))
+        return result
+
+    def testReplayMergesAdminMessages(self):
+        self._runReplay(ResendReplay(self.connection, 1, 0x7fffffff, batchSize=2))
+        self.assertEqual([("GAPFILL", 1, 2), ("D", 2), ("D", 3), ("GAPFILL", 4, 7), ("D", 7), ("GAPFILL", 8, 9)], self._summary())
+
+    def testReplayRange(self):
+        self._runReplay(ResendReplay(self.connection, 3, 5, batchSize=10))
+        self.assertEqual([("D", 3), ("GAPFILL", 4, 6)], self._summary())
+
+    def testReplayFromCache(self):
+        # the cache holds the encoded messages, the journal is never consulted
+        cacheSession = self.engine.createSession("TARGET2", "SENDER")
+        for msgType in self.msgTypes:
+            msg = FIXMessage(msgType)
+            msg.setField(self.protocol.fixtags.ClOrdID, "X")
+            cacheSession.outboundCache.add(cacheSession.sndSeqNum + 1, msgType, self.connection.codec.encode(msg, cacheSession).encode('utf-8'))
+        self.connection.session = cacheSession
+
+        self._runReplay(ResendReplay(self.connection, 1, 0x7fffffff, batchSize=3))
+        self.assertEqual([("GAPFILL", 1, 2), ("D", 2), ("D", 3), ("GAPFILL", 4, 7), ("D", 7), ("GAPFILL", 8, 9)], self._summary())
+        resent = self.connection.sent[1]
+        self.assertEqual("X", resent[self.protocol.fixtags.ClOrdID])
+        self.assertTrue(self.protocol.fixtags.OrigSendingTime in resent)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pyfix.engine import FIXEngine
+from pyfix.journaler import Journaler
+from pyfix.message import FIXMessage, MessageDirection
+from pyfix.resend import ResendReplay
+from pyfix.retention import JournalRetention, RolloverPolicy
+from tests.resend_tests import FakeConnection
+
+
+class JournalRetentionTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "test.store")
+        self.engine = FIXEngine(self.filename)
+        self.session = self.engine.createSession("TARGET", "SENDER")
+
+    def tearDown(self):
+        self.engine.journaller.conn.close()
+        shutil.rmtree(self.directory)
+
+    def _persist(self, msgTypes, age):
+        journal = self.engine.journaller
+        for msgType in msgTypes:
+            self.session.sndSeqNum += 1
+            msg = FIXMessage(msgType)
+            msg.setField("35", msgType)
+            msg.setField("34", str(self.session.sndSeqNum))
+            journal.persistMsg(msg, self.session, MessageDirection.OUTBOUND)
+        journal.cursor.execute("UPDATE message SET timestamp = ? WHERE seqNo > ?", (time.time() - age, self.session.sndSeqNum - len(msgTypes)))
+        journal.conn.commit()
+
+    def _seqNos(self, journal):
+        return [seqNo for (seqNo, msg, direction, session) in journal.getAllMsgs()]
+
+    def testPruneAdminMessages(self):
+        self._persist(["D", "0", "1", "D"], 3600)
+        self._persist(["0", "D"], 0)
+        retention = JournalRetention(self.engine, adminMessageAge=60)
+        retention.runOnce()
+        self.assertEqual([1, 4, 5, 6], self._seqNos(self.engine.journaller))
+
+    def testDailyRollover(self):
+        self._persist(["D", "D", "D"], 3 * 86400)
+        self._persist(["D", "D"], 2 * 86400)
+        self._persist(["D"], 0)
+        retention = JournalRetention(self.engine, rollover=RolloverPolicy.DAILY, batchSize=2, keepRecentMsgs=0)
+        while retention.runOnce():
+            pass
+
+        self.assertEqual([6], self._seqNos(self.engine.journaller))
+        segments = retention.segments()
+        self.assertEqual(2, len(segments))
+        self.assertEqual([1, 2, 3], self._seqNos(Journaler(segments[0])))
+        self.assertEqual([4, 5], self._seqNos(Journaler(segments[1])))
+
+    def testSizeRollover(self):
+        self._persist(["D"] * 50, 0)
+        retention = JournalRetention(self.engine, rollover=RolloverPolicy.SIZE, maxSegmentSize=1, batchSize=20, keepRecentMsgs=0)
+        while retention.runOnce():
+            pass
+
+        self.assertEqual([], self._seqNos(self.engine.journaller))
+        segments = retention.segments()
+        self.assertEqual(1, len(segments))
+        self.assertEqual(list(range(1, 51)), self._seqNos(Journaler(segments[0])))
+
+    def testRolloverKeepsRecentMessages(self):
+        self._persist(["D"] * 50, 86400)
+        retention = JournalRetention(self.engine, rollover=RolloverPolicy.SIZE, maxSegmentSize=1, batchSize=20, keepRecentMsgs=10)
+        while retention.runOnce():
+            pass
+
+        self.assertEqual(list(range(41, 51)), self._seqNos(self.engine.journaller))
+        self.assertEqual(list(range(1, 41)), self._seqNos(Journaler(retention.segments()[0])))
+
+        retention = JournalRetention(self.engine, rollover=RolloverPolicy.DAILY, keepRecentMsgs=10)
+        self.assertFalse(retention.runOnce())
+        self.assertEqual(list(range(41, 51)), self._seqNos(self.engine.journaller))
+
+    def testResendAfterRollover(self):
+        # a resend spanning the journal and two archive segments resends every order, nothing is gap filled
+        self._persist(["D", "0", "D"], 3 * 86400)
+        self._persist(["D"] * 4, 2 * 86400)
+        self._persist(["D", "D"], 0)
+        retention = JournalRetention(self.engine, rollover=RolloverPolicy.DAILY, keepRecentMsgs=1)
+        while retention.runOnce():
+            pass
+        self.assertEqual(2, len(retention.segments()))
+        self.assertEqual([8, 9], self._seqNos(self.engine.journaller))
+
+        connection = FakeConnection(self.engine, self.session)
+        replay = ResendReplay(connection, 2, 0x7fffffff, batchSize=3)
+        replay.start()
+        while self.engine.eventManager.isRegistered(replay.timer):
+            self.engine.eventManager.waitForEventWithTimeout(1.0)
+        self.assertEqual([("4", 2, 3)] + [("D", seqNo) for seqNo in range(3, 10)],
+                         [(msg.msgType, int(msg["34"]), int(msg["36"])) if msg.msgType == "4" else (msg.msgType, int(msg["34"])) for msg in connection.sent])
+
+    def testResendOfPrunedMessagesSkipsArchive(self):
+        self._persist(["D"] * 5, 2 * 86400)
+        self._persist(["0", "0"], 3600)
+        self._persist(["D"], 0)
+        retention = JournalRetention(self.engine, rollover=RolloverPolicy.DAILY, adminMessageAge=60, keepRecentMsgs=0)
+        while retention.runOnce():
+            pass
+        journal = self.engine.journaller
+        self.assertEqual([8], self._seqNos(journal))
+
+        # the missing messages were pruned, not rolled over, so no segment is opened
+        searched = []
+        segments = journal.archiveSegments
+        journal.archiveSegments = lambda: searched.append(True) or segments()
+        self.assertEqual([8], [int(msg["34"]) for msg in journal.recoverMsgs(self.session, MessageDirection.OUTBOUND, 6, 8)])
+        self.assertEqual([], searched)
+        self.assertEqual([4, 5, 8], [int(msg["34"]) for msg in journal.recoverMsgs(self.session, MessageDirection.OUTBOUND, 4, 8)])
+        self.assertEqual([True], searched)
+
+    def testDiskUsageCap(self):
+        self._persist(["D"] * 10, 2 * 86400)
+        self._persist(["D"] * 10, 86400)
+        retention = JournalRetention(self.engine, rollover=RolloverPolicy.DAILY, maxDiskUsage=1, keepRecentMsgs=0)
+        while retention.runOnce():
+            pass
+        self.assertEqual([], retention.segments())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from pyfix.client_connection import FIXClient
+from pyfix.engine import FIXEngine
+from pyfix.scheduler import ConnectionScheduler, SessionReadiness
+from pyfix.server_connection import FIXServer
+
+
+class ConnectionSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = FIXEngine()
+        self.server = FIXServer(self.engine, "pyfix.FIX44")
+        self.server.start("127.0.0.1", 0)
+        self.port = self.server.socket.getsockname()[1]
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.stop()
+        self.server.stop()
+
+    def testStaggeredStartup(self):
+        scheduler = ConnectionScheduler(self.engine, interval=0.01, jitter=0.5, maxConcurrentHandshakes=2, handshakeTimeout=5.0)
+        for i in range(0, 5):
+            client = FIXClient(self.engine, "pyfix.FIX44", "TARGET", "SENDER%s" % (i, ))
+            self.clients.append(client)
+            scheduler.add(client, "127.0.0.1", self.port)
+        self.assertEqual(set([SessionReadiness.PENDING]), set(scheduler.readiness().values()))
+
+        scheduler.start()
+        maxHandshakes = 0
+        for i in range(0, 500):
+            if not self.engine.eventManager.isRegistered(scheduler.timer):
+                break
+            self.engine.eventManager.waitForEventWithTimeout(1.0)
+            maxHandshakes = max(maxHandshakes, scheduler.handshakesInProgress())
+
+        self.assertTrue(scheduler.isComplete())
+        self.assertTrue(scheduler.isReady())
+        self.assertTrue(1 <= maxHandshakes <= 2)
+        self.assertEqual(5, len(scheduler.readiness()))
+        self.assertEqual(5, len(self.server.connections))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from pyfix.journaler import Journaler
+from pyfix.message import FIXMessage, MessageDirection
+from pyfix.session import FIXSessionRegistry
+
+
+class FIXSessionRegistryTests(unittest.TestCase):
+    def testLazyLoad(self):
+        journal = Journaler()
+        session = journal.createSession("TARGET1", "SENDER")
+        journal.createSession("TARGET2", "SENDER")
+        msg = FIXMessage("D")
+        msg.setField("34", "5")
+        journal.persistMsg(msg, session, MessageDirection.OUTBOUND)
+
+        registry = FIXSessionRegistry(journal)
+        self.assertEqual(0, len(registry))
+        loaded = registry.findByCompIds("TARGET1", "SENDER")
+        self.assertEqual(session.key, loaded.key)
+        self.assertEqual(5, loaded.sndSeqNum)
+        self.assertIs(loaded, registry.get(session.key))
+        self.assertEqual(1, len(registry))
+
+        # the seq no update only applies to the session the message belongs to
+        self.assertEqual(0, registry.findByCompIds("TARGET2", "SENDER").sndSeqNum)
+        self.assertIsNone(registry.findByCompIds("TARGET3", "SENDER"))
+
+    def testEvictDormantSessions(self):
+        journal = Journaler()
+        registry = FIXSessionRegistry(journal, maxDormantSessions=2)
+        s1 = registry.create("T1", "S")
+        registry.acquire(s1)
+        s2 = registry.create("T2", "S")
+        s3 = registry.create("T3", "S")
+        registry.findByCompIds("T2", "S")
+        s4 = registry.create("T4", "S")
+
+        # s1 is in use so it stays, s3 was the least recently used dormant session
+        self.assertEqual(set([s1.key, s2.key, s4.key]), set(registry.sessions.keys()))
+
+        registry.release(s1)
+        self.assertFalse(s2.key in registry)
+        self.assertTrue(s1.key in registry)
+
+        reloaded = registry.findByCompIds("T3", "S")
+        self.assertEqual(s3.key, reloaded.key)
+        self.assertIsNot(s3, reloaded)
+
+if __name__ == '__main__':
+    unittest.main()
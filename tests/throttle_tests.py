@@ -0,0 +1,26 @@
+import unittest
+from pyfix.throttle import TokenBucket
+
+
+class TokenBucketTests(unittest.TestCase):
+    def testBurstThenRate(self):
+        bucket = TokenBucket(10, 3)
+        self.assertEqual([True, True, True, False], [bucket.tryAcquire() for i in range(0, 4)])
+        self.assertTrue(0.0 < bucket.waitTime() <= 0.1)
+
+        bucket.lastTime -= 0.1
+        self.assertTrue(bucket.tryAcquire())
+        self.assertFalse(bucket.tryAcquire())
+
+        # we never accumulate more than the burst
+        bucket.lastTime -= 10.0
+        self.assertEqual(3, sum([bucket.tryAcquire() for i in range(0, 10)]))
+
+    def testBatchGoesIntoDebt(self):
+        bucket = TokenBucket(10, 2)
+        self.assertTrue(bucket.tryAcquire(5))
+        self.assertFalse(bucket.ready())
+        self.assertAlmostEqual(0.4, bucket.waitTime(), places=2)
+
+if __name__ == '__main__':
+    unittest.main()
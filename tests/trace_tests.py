@@ -0,0 +1,26 @@
+import unittest
+from pyfix.message import MessageDirection
+from pyfix.trace import MessageTracer, TraceStage
+
+
+class MessageTracerTests(unittest.TestCase):
+    def testRingBuffer(self):
+        tracer = MessageTracer(3)
+        for seqNo in range(1, 6):
+            trace = tracer.begin(MessageDirection.INBOUND, "D", str(seqNo))
+            trace.stamp(TraceStage.READ, when=1000)
+            trace.stamp(TraceStage.DECODED, when=1000 + seqNo * 1000)
+        self.assertEqual(["3", "4", "5"], [trace.seqNo for trace in tracer.traces()])
+        self.assertEqual(5, tracer.count)
+
+        breakdown = tracer.breakdown()
+        self.assertEqual(["READ->DECODED"], list(breakdown.keys()))
+        self.assertEqual((3, 3000, 5000), (breakdown["READ->DECODED"].totalCount, breakdown["READ->DECODED"].min, breakdown["READ->DECODED"].max))
+        self.assertEqual({}, tracer.breakdown(MessageDirection.OUTBOUND))
+        self.assertTrue("READ->DECODED" in tracer.report())
+
+        tracer.clear()
+        self.assertEqual([], tracer.traces())
+
+if __name__ == '__main__':
+    unittest.main()